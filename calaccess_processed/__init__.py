@@ -8,11 +8,13 @@ default_app_config = 'calaccess_processed.apps.CalAccessProcessedConfig'
 
 def archive_directory_path(instance, filename):
     """
-    Returns a path to an archived processed data file or ZIP.
+    Returns a path to an archived processed data file, partition, diff or ZIP.
     """
     from calaccess_processed.models.tracking import (
         ProcessedDataVersion,
         ProcessedDataFile,
+        ProcessedDataFilePartition,
+        ProcessedDataFileDiff,
     )
 
     if isinstance(instance, ProcessedDataVersion):
@@ -26,8 +28,21 @@ def archive_directory_path(instance, filename):
     elif isinstance(instance, ProcessedDataFile):
         release_datetime = instance.version.raw_version.release_datetime
         path = '{dt:%Y-%m-%d_%H-%M-%S}/{f}'.format(dt=release_datetime, f=filename)
+    elif isinstance(instance, ProcessedDataFilePartition):
+        path = '{dt:%Y-%m-%d_%H-%M-%S}/partitions/{fn}/{f}'.format(
+            dt=instance.processed_file.version.raw_version.release_datetime,
+            fn=instance.processed_file.file_name,
+            f=filename,
+        )
+    elif isinstance(instance, ProcessedDataFileDiff):
+        path = '{to_dt:%Y-%m-%d_%H-%M-%S}/diffs/{from_dt:%Y-%m-%d_%H-%M-%S}/{f}'.format(
+            to_dt=instance.to_version.raw_version.release_datetime,
+            from_dt=instance.from_version.raw_version.release_datetime,
+            f=filename,
+        )
     else:
         raise TypeError(
-            "Must be ProcessedDataVersion or ProcessedDataFile instance."
+            "Must be ProcessedDataVersion, ProcessedDataFile, ProcessedDataFilePartition "
+            "or ProcessedDataFileDiff instance."
         )
     return path
@@ -66,6 +66,8 @@ from calaccess_processed.admin.scraper.propositions import (
 from calaccess_processed.admin.tracking import (
     ProcessedDataVersionAdmin,
     ProcessedDataFileAdmin,
+    ProcessedDataFilePartitionAdmin,
+    ProcessedDataFileDiffAdmin,
 )
 
 __all__ = (
@@ -109,6 +111,8 @@ __all__ = (
     'FilerIDValueAdmin',
     'ProcessedDataVersionAdmin',
     'ProcessedDataFileAdmin',
+    'ProcessedDataFilePartitionAdmin',
+    'ProcessedDataFileDiffAdmin',
     'CandidateScrapedElectionAdmin',
     'ScrapedCandidateAdmin',
     'ScrapedCandidateCommitteeAdmin',
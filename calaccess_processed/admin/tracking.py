@@ -38,3 +38,38 @@ class ProcessedDataFileAdmin(BaseAdmin):
     )
     list_display_links = ('id', 'file_name',)
     list_filter = ("version__process_start_datetime",)
+
+
+@admin.register(models.ProcessedDataFilePartition)
+class ProcessedDataFilePartitionAdmin(BaseAdmin):
+    """
+    Custom admin for the ProcessedDataFilePartition model.
+    """
+    list_display = (
+        "id",
+        "processed_file",
+        "election_cycle",
+        "filer_bucket",
+        "records_count",
+        "pretty_file_size",
+    )
+    list_display_links = ('id', 'processed_file',)
+    list_filter = ("election_cycle",)
+
+
+@admin.register(models.ProcessedDataFileDiff)
+class ProcessedDataFileDiffAdmin(BaseAdmin):
+    """
+    Custom admin for the ProcessedDataFileDiff model.
+    """
+    list_display = (
+        "id",
+        "from_version",
+        "to_version",
+        "file_name",
+        "added_count",
+        "changed_count",
+        "removed_count",
+    )
+    list_display_links = ('id', 'file_name',)
+    list_filter = ("to_version__process_start_datetime",)
@@ -6,22 +6,29 @@ Base classes for custom management commands.
 import os
 import re
 import logging
+from collections import OrderedDict
+from time import sleep, time
+from multiprocessing.pool import ThreadPool
 from six.moves.urllib.parse import urljoin
-from six.moves.urllib.request import url2pathname
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 from datetime import date
+from django.apps import apps
 from django.conf import settings
 from django.core.management import call_command, CommandError
 from django.core.management.base import BaseCommand
 from django.core.exceptions import MultipleObjectsReturned
+from django.db import connection, transaction, IntegrityError
 from django.utils import timezone
 from django.utils.termcolors import colorize
+from hurry.filesize import size as sizeformat
 from calaccess_raw import get_download_directory
 from calaccess_raw.models import RawDataVersion, FilerToFilerTypeCd
 from calaccess_processed.models import ProcessedDataVersion
 from calaccess_processed.candidate_party_corrections import corrections
-from calaccess_processed.decorators import retry
+from calaccess_processed.scraper.cache import CACHE_BACKENDS, get_cache
+from calaccess_processed.scraper.ratelimit import RateLimiter
+from calaccess_processed.scraper.session import RETRY_STATUSES, get_session
 from opencivicdata.core.management.commands.loaddivisions import load_divisions
 from opencivicdata.core.models import (
     Division,
@@ -35,6 +42,28 @@ from opencivicdata.merge import merge
 logger = logging.getLogger(__name__)
 
 
+def archive_model(model_label):
+    """
+    Archive a .csv file for the model with the given label.
+
+    Returns the label and the number of seconds archiving took.
+    """
+    app_label, model_name = model_label.split('.')
+    start = time()
+    call_command('archivecalaccessprocessedfile', app_label, model_name)
+    return model_label, time() - start
+
+
+def _archive_model_on_own_connection(model_label):
+    """
+    Archive the model on the current thread's own database connection.
+    """
+    try:
+        return archive_model(model_label)
+    finally:
+        connection.close()
+
+
 class CalAccessCommand(BaseCommand):
     """
     Base class for all custom CalAccess-related management commands.
@@ -95,6 +124,45 @@ class CalAccessCommand(BaseCommand):
             raw_version=latest_raw_version,
         )
 
+    def archive_models(self, model_list, workers=1, on_archived=None):
+        """
+        Archive a .csv file for each model in the list, up to `workers` at once.
+
+        Each archive is exported on its own database connection. If provided,
+        on_archived is called with each model as soon as it is archived.
+        """
+        labels = [m._meta.label for m in model_list]
+        if workers > 1 and len(labels) > 1:
+            if self.verbosity > 2:
+                self.log(" Archiving %s models with %s workers" % (len(labels), workers))
+            pool = ThreadPool(processes=min(workers, len(labels)))
+            results = pool.imap_unordered(_archive_model_on_own_connection, labels)
+        else:
+            pool = None
+            results = (archive_model(label) for label in labels)
+
+        try:
+            for label, seconds in results:
+                model = apps.get_model(label)
+                if self.verbosity > 2:
+                    file_size = self.processed_version.files.get(
+                        file_name=model._meta.object_name,
+                    ).file_size
+                    self.log(
+                        " Archived {0} ({1} in {2:.1f}s, {3}/s)".format(
+                            model._meta.object_name,
+                            sizeformat(file_size),
+                            seconds,
+                            sizeformat(int(file_size / max(seconds, 0.001))),
+                        )
+                    )
+                if on_archived:
+                    on_archived(model)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
     def header(self, string):
         """
         Writes out a string to stdout formatted to look like a header.
@@ -187,6 +255,82 @@ class ScrapeCommand(CalAccessCommand):
             default=True,
             help="Skip the scraper's update checks. Use only cached files.",
         )
+        parser.add_argument(
+            '--workers',
+            action='store',
+            type=int,
+            dest='workers',
+            default=getattr(settings, 'CALACCESS_SCRAPER_WORKERS', 4),
+            help='Number of pages to request at once (default: 4).',
+        )
+        parser.add_argument(
+            '--rate',
+            action='store',
+            type=float,
+            dest='rate',
+            default=getattr(settings, 'CALACCESS_SCRAPER_RATE', 2.0),
+            help='Maximum number of requests per second to each host, '
+                 'retries included (default: 2).',
+        )
+        parser.add_argument(
+            '--cache-ttl',
+            action='store',
+            type=int,
+            dest='cache_ttl',
+            default=getattr(settings, 'CALACCESS_SCRAPER_CACHE_TTL', 0),
+            help='Use cached pages fetched within this many seconds without '
+                 'checking for updates (default: 0).',
+        )
+        parser.add_argument(
+            '--cache-backend',
+            action='store',
+            dest='cache_backend',
+            choices=sorted(CACHE_BACKENDS),
+            default=getattr(settings, 'CALACCESS_SCRAPER_CACHE_BACKEND', 'files'),
+            help='Store cached pages as loose files or compressed in a single '
+                 'SQLite file (default: files).',
+        )
+        parser.add_argument(
+            '--pool-size',
+            action='store',
+            type=int,
+            dest='pool_size',
+            default=getattr(settings, 'CALACCESS_SCRAPER_POOL_SIZE', 10),
+            help='Number of keep-alive connections to keep open to each host (default: 10).',
+        )
+        parser.add_argument(
+            '--retries',
+            action='store',
+            type=int,
+            dest='retries',
+            default=getattr(settings, 'CALACCESS_SCRAPER_RETRIES', 3),
+            help='Number of times to retry a request after a connection or '
+                 'server error (default: 3).',
+        )
+        parser.add_argument(
+            '--backoff',
+            action='store',
+            type=float,
+            dest='backoff',
+            default=getattr(settings, 'CALACCESS_SCRAPER_BACKOFF', 0.5),
+            help='Backoff factor between retries, in seconds (default: 0.5).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            type=int,
+            dest='batch_size',
+            default=getattr(settings, 'CALACCESS_SCRAPER_BATCH_SIZE', 20),
+            help='Number of scraped pages to save at once (default: 20).',
+        )
+        parser.add_argument(
+            '--parser',
+            action='store',
+            dest='parser',
+            default=getattr(settings, 'CALACCESS_SCRAPER_PARSER', 'html.parser'),
+            help='HTML parser for BeautifulSoup to use, e.g. "lxml", which is '
+                 'faster but must be installed (default: html.parser).',
+        )
 
     def handle(self, *args, **options):
         """
@@ -194,99 +338,255 @@ class ScrapeCommand(CalAccessCommand):
         """
         super(ScrapeCommand, self).handle(*args, **options)
 
+        # check the options, rather than fail in the workers' threads later
+        if options.get("rate") is None or options.get("rate") <= 0:
+            raise CommandError('--rate must be greater than zero.')
+        for option in ("workers", "pool_size"):
+            if options.get(option) is None or options.get(option) < 1:
+                raise CommandError('--%s must be at least one.' % option.replace('_', '-'))
+
         self.force_flush = options.get("force_flush")
         self.force_download = options.get("force_download")
         self.update_cache = options.get("update_cache")
+        self.workers = options.get("workers")
+        self.rate_limiter = RateLimiter(options.get("rate"))
+        self.cache_ttl = options.get("cache_ttl")
+        self.batch_size = max(options.get("batch_size") or 1, 1)
+        self.parser = options.get("parser")
+        try:
+            BeautifulSoup('', self.parser)
+        except FeatureNotFound:
+            raise CommandError(
+                'HTML parser "%s" is not installed.' % self.parser
+            )
+        self.retries = max(options.get("retries") or 0, 0)
+        self.backoff = options.get("backoff") or 0
+        self.session = get_session(
+            pool_size=max(options.get("pool_size"), self.workers),
+        )
 
         os.path.exists(self.cache_dir) or os.mkdir(self.cache_dir)
+        self.cache = get_cache(options.get("cache_backend"), self.cache_dir)
 
         if self.force_flush:
             self.flush()
-        results = self.scrape()
-        self.save(results)
-
-    @retry(requests.exceptions.RequestException)
-    def get_url(self, url, retries=1, request_type='GET'):
+        try:
+            # save what's scraped as it comes, so a failure doesn't lose it all
+            batch = []
+            for result in self.scrape():
+                batch.append(result)
+                if len(batch) >= self.batch_size:
+                    self.save(batch)
+                    self.cache.save()
+                    batch = []
+            if batch:
+                self.save(batch)
+        finally:
+            self.cache.close()
+
+    def get_url(self, url, request_type='GET', headers=None):
         """
         Returns the response from a URL, retries if it fails.
+
+        Connection errors and server errors are retried up to self.retries
+        times, waiting self.backoff * (2 ** (retry number - 1)) seconds in
+        between. Every attempt waits its turn with the rate limiter, so
+        retries count against the --rate option too. Any headers provided
+        are added to the request's.
+        """
+        headers = dict(headers or {})
+        headers['User-Agent'] = 'California Civic Data Coalition \
+            (cacivicdata@gmail.com)'
+        attempt = 0
+        while True:
+            # wait our turn, so the site isn't flooded however many workers there are
+            self.rate_limiter.wait(url)
+            if self.verbosity > 2:
+                self.log(" Making a {} request for {}".format(request_type, url))
+            try:
+                response = self.session.request(request_type.upper(), url, headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+            attempt += 1
+            if self.verbosity > 2:
+                self.log(" Retrying {} ({} of {})".format(url, attempt, self.retries))
+            sleep(self.backoff * (2 ** (attempt - 1)))
+
+    def map(self, func, iterable):
         """
-        headers = {
-            'User-Agent': 'California Civic Data Coalition \
-            (cacivicdata@gmail.com)',
-        }
-        if self.verbosity > 2:
-            self.log(" Making a {} request for {}".format(request_type, url))
-        return getattr(requests, request_type.lower())(url, headers=headers)
+        Call func on each item in iterable, up to self.workers at once.
+
+        Returns a list of the results, in the same order as the items. Use
+        it for functions that only make requests and parse the responses:
+        they run on threads without their own database connections.
+        """
+        return list(self.imap(func, iterable))
 
-    def get_headers(self, url):
+    def imap(self, func, iterable):
         """
-        Returns a dict with metadata about the current CAL-ACCESS snapshot.
+        Call func on each item in iterable, up to self.workers at once.
+
+        Like map, but yields each result, in the same order as the items, as
+        soon as it's ready. The workers keep making requests while the
+        results are being saved.
         """
-        response = self.get_url(url, request_type='HEAD')
-        length = int(response.headers['content-length'])
-        return {
-            'content-length': length,
-        }
+        items = list(iterable)
+        if self.workers == 1 or len(items) < 2:
+            for i in items:
+                yield func(i)
+            return
+        pool = ThreadPool(min(self.workers, len(items)))
+        try:
+            for result in pool.imap(func, items, chunksize=1):
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def bulk_update_or_create(self, model, rows, batch_size=1000):
+        """
+        Update or create an instance of a scraped model for each dict of field values in rows.
+
+        Instances are matched on the model's unique_together fields, which
+        are all non-null. The existing ones are fetched with one query per
+        batch of rows and saved only if their other fields changed. The rest
+        are inserted with bulk_create, all inside one transaction.
+
+        Returns a list of the instances, in the same order as the rows.
+        """
+        key_fields = [model._meta.get_field(name) for name in model._meta.unique_together[0]]
+
+        def get_value(field, value):
+            return getattr(value, 'pk', value) if field.is_relation else field.to_python(value)
+
+        def get_row_key(row):
+            return tuple(get_value(f, row[f.name]) for f in key_fields)
+
+        def get_obj_key(obj):
+            return tuple(getattr(obj, f.attname) for f in key_fields)
+
+        def fetch(keys):
+            # narrow the query down by the first key field, then match the whole key
+            values = list(set(k[0] for k in keys))
+            objs = {}
+            for i in range(0, len(values), batch_size):
+                qs = model.objects.filter(**{
+                    '%s__in' % key_fields[0].attname: values[i:i + batch_size]
+                })
+                for obj in qs:
+                    objs[get_obj_key(obj)] = obj
+            return objs
+
+        def update(obj, row):
+            changed_fields = []
+            for name, value in row.items():
+                field = model._meta.get_field(name)
+                if field in key_fields or getattr(obj, field.attname) == get_value(field, value):
+                    continue
+                setattr(obj, name, value)
+                changed_fields.append(name)
+            if changed_fields:
+                obj.save(update_fields=changed_fields + ['last_modified'])
+                if self.verbosity > 2:
+                    self.log('Updated %s' % obj)
+
+        keys = [get_row_key(row) for row in rows]
+        with transaction.atomic():
+            objs = fetch(keys)
+            updated = set()
+            for attempt in range(2):
+                new_rows = OrderedDict()
+                for key, row in zip(keys, rows):
+                    if key in objs:
+                        if key not in updated:
+                            update(objs[key], row)
+                            updated.add(key)
+                    elif key not in new_rows:
+                        new_rows[key] = row
+                if not new_rows:
+                    break
+                new_objs = [model(**row) for row in new_rows.values()]
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create(new_objs, batch_size=batch_size)
+                except IntegrityError:
+                    # another scraper inserted some of them first, so fetch those and try again
+                    if attempt:
+                        raise
+                    objs.update(fetch(list(new_rows.keys())))
+                    continue
+                if self.verbosity > 2:
+                    for obj in new_objs:
+                        self.log('Created %s' % obj)
+                # bulk_create doesn't set primary keys on every database, so get them back
+                objs.update(fetch(list(new_rows.keys())))
+                break
+        return [objs[key] for key in keys]
 
-    def get_html(self, url, retries=1, base_url=None):
+    def get_html(self, url, base_url=None, parse_only=None):
         """
         Makes request for a URL and returns HTML as a BeautifulSoup object.
+
+        Cached pages are returned as they are if they were fetched in the
+        last self.cache_ttl seconds, or revalidated with a conditional
+        request otherwise.
+
+        If provided, parse_only is a SoupStrainer matching the only elements
+        to build into the BeautifulSoup object, along with their contents.
         """
-        # Put together the full URL
+        # Put together the full URL, which the page is cached under
         full_url = urljoin(base_url or self.base_url, url)
         if self.verbosity > 2:
             self.log(" Retrieving data for {}".format(url))
 
         # Pull a cached version of the file, if it exists
-        cache_path = os.path.join(
-            self.cache_dir,
-            url2pathname(url.strip("/"))
-        )
-        if os.path.exists(cache_path) and not self.force_download:
-            # Make a HEAD request for the file size of the live page
-            if self.update_cache:
-                cache_file_size = os.path.getsize(cache_path)
-                head = self.get_headers(full_url)
-                web_file_size = head['content-length']
-
-                if self.verbosity > 2:
-                    msg = " Cached file sized {}. Web file size {}."
-                    self.log(msg.format(
-                        cache_file_size,
-                        web_file_size
-                    ))
-
-            # If our cache is the same size as the live page, return the cache
-            if not self.update_cache or cache_file_size == web_file_size:
+        headers = {}
+        if self.cache.exists(full_url) and not self.force_download:
+            if not self.update_cache or self.cache.is_fresh(full_url, self.cache_ttl):
                 if self.verbosity > 2:
-                    self.log(" Returning cached {}".format(cache_path))
-                html = open(cache_path, 'r').read()
-                return BeautifulSoup(html, "html.parser")
+                    self.log(" Returning cached {}".format(self.cache.get_path(full_url)))
+                return self.make_soup(self.cache.read(full_url), parse_only)
+            # Only download the page if it changed
+            headers = self.cache.get_conditional_headers(full_url)
 
         # Otherwise, retrieve the full page and cache it
         try:
-            response = self.get_url(full_url)
+            response = self.get_url(full_url, headers=headers)
         except requests.exceptions.HTTPError as e:
             # If web requests fails, fall back to cached file, if it exists
-            if os.path.exists(cache_path):
+            if self.cache.exists(full_url):
                 if self.verbosity > 2:
-                    self.log(" Returning cached {}".format(cache_path))
-                html = open(cache_path, 'r').read()
-                return BeautifulSoup(html, "html.parser")
+                    self.log(" Returning cached {}".format(self.cache.get_path(full_url)))
+                return self.make_soup(self.cache.read(full_url), parse_only)
             else:
                 raise e
 
+        # If the page hasn't changed, return the cache
+        if response.status_code == 304:
+            if self.verbosity > 2:
+                self.log(" Returning unchanged {}".format(self.cache.get_path(full_url)))
+            self.cache.touch(full_url)
+            return self.make_soup(self.cache.read(full_url), parse_only)
+
         # Grab the HTML and cache it
         html = response.text
         if self.verbosity > 2:
-            self.log(" Writing to cache {}".format(cache_path))
-        cache_subdir = os.path.dirname(cache_path)
-        os.path.exists(cache_subdir) or os.makedirs(cache_subdir)
-        with open(cache_path, 'w') as f:
-            f.write(html)
+            self.log(" Writing to cache {}".format(self.cache.get_path(full_url)))
+        self.cache.write(full_url, html, response.headers)
 
         # Finally return the HTML ready to parse with BeautifulSoup
-        return BeautifulSoup(html, "html.parser")
+        return self.make_soup(html, parse_only)
+
+    def make_soup(self, html, parse_only=None):
+        """
+        Parse HTML into a BeautifulSoup object with the --parser option's parser.
+        """
+        return BeautifulSoup(html, self.parser, parse_only=parse_only)
 
     def flush(self):
         """
@@ -298,13 +598,15 @@ class ScrapeCommand(CalAccessCommand):
         """
         This method should perform the actual scraping.
 
-        Returns the structured data.
+        Yields the structured data, a page at a time.
         """
         raise NotImplementedError
 
     def save(self, results):
         """
-        This method should process structured data returned by `build_results`.
+        This method should process a list of the structured data yielded by `scrape`.
+
+        It's called with a batch of up to self.batch_size results at a time.
         """
         raise NotImplementedError
 
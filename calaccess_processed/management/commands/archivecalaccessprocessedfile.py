@@ -4,16 +4,190 @@
 Export and archive a .csv file for a given model.
 """
 import os
+import gzip
+import tempfile
+from threading import Thread
 from django.apps import apps
+from django.conf import settings
 from django.core.files import File
+from django.core.files.storage import FileSystemStorage
 from django.db import connection
 from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.parquet import copy_to_parquet
 from calaccess_processed.models.tracking import (
     ProcessedDataVersion,
     ProcessedDataFile,
 )
 
 
+class StreamingFile(File):
+    """
+    A File wrapping a stream that can only be read once, front to back.
+
+    Its size is the number of bytes read from it so far. If given a hash
+    object, such as hashlib.sha256(), it's updated with the bytes read.
+    """
+    def __init__(self, file, name=None, hasher=None):
+        super(StreamingFile, self).__init__(file, name=name)
+        self.bytes_read = 0
+        self.hasher = hasher
+
+    @property
+    def size(self):
+        """
+        Return the number of bytes read so far.
+        """
+        return self.bytes_read
+
+    def read(self, *args, **kwargs):
+        """
+        Read from the stream, counting the bytes read.
+        """
+        data = self.file.read(*args, **kwargs)
+        self.bytes_read += len(data)
+        if self.hasher:
+            self.hasher.update(data)
+        return data
+
+    def chunks(self, chunk_size=None):
+        """
+        Read the stream and yield chunks of chunk_size bytes.
+        """
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        while True:
+            data = self.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+    def multiple_chunks(self, chunk_size=None):
+        """
+        Return True, since the size of the stream isn't known in advance.
+        """
+        return True
+
+
+# Largest file spooled in memory, rather than on disk, for storage backends that can't stream
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+
+def can_stream_to(storage):
+    """
+    Return True if the storage backend can save a file read once, front to back.
+
+    FileSystemStorage saves a file by reading its chunks in order. Other
+    backends, such as S3's, may seek, rewind or ask for the size first.
+    """
+    return isinstance(storage, FileSystemStorage)
+
+
+def write_to_field_file(write, field_file, name, hasher=None):
+    """
+    Save everything the write function writes into a FileField's storage.
+
+    write is called with a writable file object. If the storage backend can
+    stream (see can_stream_to), the data is piped to it as it's written,
+    without an intermediate file. Otherwise it's written to a temporary file
+    first, kept in memory up to SPOOL_MAX_SIZE bytes. If given, hasher is
+    updated with the data saved. Returns the number of bytes saved.
+    """
+    if not can_stream_to(field_file.storage):
+        return _spool_to_field_file(write, field_file, name, hasher=hasher)
+
+    read_fd, write_fd = os.pipe()
+    reader = StreamingFile(os.fdopen(read_fd, 'rb'), name=name, hasher=hasher)
+    writer = os.fdopen(write_fd, 'wb')
+
+    # save from a separate thread, while this one does the writing
+    save_errors = []
+
+    def save():
+        try:
+            field_file.save(name, reader, save=False)
+        except Exception as e:
+            save_errors.append(e)
+        finally:
+            # keep the writer from blocking on a full pipe
+            while reader.read(reader.DEFAULT_CHUNK_SIZE):
+                pass
+            reader.close()
+    save_thread = Thread(target=save)
+    save_thread.start()
+
+    try:
+        write(writer)
+    except Exception:
+        writer.close()
+        save_thread.join()
+        field_file.delete(save=False)
+        raise
+    writer.close()
+    save_thread.join()
+
+    if save_errors:
+        raise save_errors[0]
+    return reader.size
+
+
+def _spool_to_field_file(write, field_file, name, hasher=None):
+    """
+    Save everything the write function writes into a FileField's storage, by way of a temporary file.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        write(spool)
+        size = spool.tell()
+        if hasher:
+            spool.seek(0)
+            for chunk in iter(lambda: spool.read(File.DEFAULT_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        spool.seek(0)
+        field_file.save(name, File(spool, name=name), save=False)
+    return size
+
+
+def copy_to_field_file(cursor, sql, field_file, name, compress=False, hasher=None):
+    """
+    Stream the output of a COPY ... TO STDOUT statement into a FileField's storage.
+
+    The rows are piped straight from the database connection to the storage
+    backend without an intermediate file, gzipped on the way if compress is
+    True. If given, hasher is updated with the data saved. Returns the number
+    of bytes saved.
+    """
+    def write(writer):
+        if compress:
+            with gzip.GzipFile(filename='', mode='wb', fileobj=writer, mtime=0) as gz:
+                cursor.copy_expert(sql, gz)
+        else:
+            cursor.copy_expert(sql, writer)
+    return write_to_field_file(write, field_file, name, hasher=hasher)
+
+
+def get_content_digest(cursor, db_table):
+    """
+    Return a digest of the rows in the database table, regardless of their order.
+
+    Each row's text is hashed with md5, and the halves of the hashes are
+    summed as 64-bit integers. The digest is the md5 of the row count and
+    the two sums, so the whole table is read only once, without sorting.
+
+    Rows are hashed whole, ids included. A load that gives the same rows
+    new ids changes the digest, so an archive is only reused if its ids
+    still match the other files of the version.
+    """
+    cursor.execute(
+        """
+        SELECT md5(
+            count(*)::text || ':' ||
+            coalesce(sum(('x' || substr(h, 1, 16))::bit(64)::bigint::numeric), 0)::text || ':' ||
+            coalesce(sum(('x' || substr(h, 17, 16))::bit(64)::bigint::numeric), 0)::text
+        )
+        FROM (SELECT md5(t::text) AS h FROM "{}" AS t) AS hashes;
+        """.format(db_table)
+    )
+    return cursor.fetchone()[0]
+
+
 class Command(CalAccessCommand):
     """
     Export and archive a .csv file for a given model.
@@ -33,6 +207,28 @@ class Command(CalAccessCommand):
             'model_name',
             help="Name of the model to archive"
         )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            dest="gzip",
+            default=getattr(settings, 'CALACCESS_GZIP_ARCHIVE', False),
+            help="Compress the archived .csv file with gzip."
+        )
+        parser.add_argument(
+            "--parquet",
+            action="store_true",
+            dest="parquet",
+            default=getattr(settings, 'CALACCESS_PARQUET_ARCHIVE', False),
+            help="Also archive a .parquet file (requires pyarrow)."
+        )
+        parser.add_argument(
+            "--no-reuse",
+            action="store_false",
+            dest="reuse",
+            default=True,
+            help="Export the model even if its contents haven't changed since "
+                 "the previous version."
+        )
 
     def handle(self, *args, **options):
         """
@@ -41,12 +237,10 @@ class Command(CalAccessCommand):
         super(Command, self).handle(*args, **options)
         self.app_name = options['app_name']
         self.model_name = options['model_name']
+        self.gzip = options['gzip']
+        self.parquet = options['parquet']
+        self.reuse = options['reuse']
 
-        # get the full path for archiving the csv
-        self.csv_path = os.path.join(
-            self.processed_data_dir,
-            '%s.csv' % self.model_name,
-        )
         # get model
         self.model = apps.get_model(self.app_name, self.model_name)
         # and the db table name
@@ -66,23 +260,94 @@ class Command(CalAccessCommand):
                 records_count=self.model.objects.count(),
             )
 
-        # Remove previous .CSV files
-        self.processed_file.file_archive.delete()
-
         with connection.cursor() as c:
-            c.execute(
-                """
-                COPY {db_table} TO '{csv_path}' CSV HEADER;
-                """.format(**self.__dict__)
-            )
+            content_digest = get_content_digest(c, self.db_table)
 
-        # Open up the .CSV file for reading so we can wrap it in the Django File obj
-        with open(self.csv_path, 'rb') as csv_file:
-            # Save the .CSV on the raw data file
-            self.processed_file.file_archive.save(
-                '%s.csv' % self.model_name,
-                File(csv_file),
-            )
+        file_name = '%s.csv' % self.model_name
+        if self.gzip:
+            file_name += '.gz'
 
-        self.processed_file.file_size = os.path.getsize(self.csv_path)
+        if self.reuse:
+            unchanged_file = self.get_unchanged_file(content_digest, file_name)
+        else:
+            unchanged_file = None
+        self.processed_file.content_digest = content_digest
+        if unchanged_file:
+            if self.verbosity > 2:
+                self.log(" Reusing %s" % unchanged_file.file_archive.name)
+            if unchanged_file != self.processed_file:
+                self.reuse_archive(unchanged_file, 'file_archive', 'file_size')
+        else:
+            # Remove previous .CSV files
+            self.processed_file.delete_archive('file_archive')
+            with connection.cursor() as c:
+                self.processed_file.file_size = copy_to_field_file(
+                    c,
+                    # select from the table, rather than copy it, so materialized views work too
+                    'COPY (SELECT * FROM "{}") TO STDOUT CSV HEADER;'.format(self.db_table),
+                    self.processed_file.file_archive,
+                    file_name,
+                    compress=self.gzip,
+                )
+        if self.parquet:
+            if unchanged_file and unchanged_file.parquet_archive:
+                if unchanged_file != self.processed_file:
+                    self.reuse_archive(unchanged_file, 'parquet_archive', 'parquet_size')
+            else:
+                self.archive_parquet()
         self.processed_file.save()
+
+    def get_unchanged_file(self, content_digest, file_name):
+        """
+        Return an archived file with the same content digest and file type, if there is one.
+
+        Checks the file itself (if it's being archived again), then the same
+        file in the previous version.
+        """
+        extension = file_name[len(self.model_name):]
+        for f in [self.processed_file, self.processed_file.get_previous_file()]:
+            if (
+                f and
+                f.file_archive and
+                f.content_digest == content_digest and
+                f.file_archive.name.endswith(extension)
+            ):
+                return f
+        return None
+
+    def reuse_archive(self, unchanged_file, field_name, size_field_name):
+        """
+        Point the processed file's archive at the unchanged file's, instead of uploading a copy.
+        """
+        field_file = getattr(unchanged_file, field_name)
+        if getattr(self.processed_file, field_name).name != field_file.name:
+            self.processed_file.delete_archive(field_name)
+        setattr(self.processed_file, field_name, field_file.name)
+        setattr(self.processed_file, size_field_name, getattr(unchanged_file, size_field_name))
+
+    def archive_parquet(self):
+        """
+        Export the model to a .parquet file and archive it.
+        """
+        self.log(" Archiving %s.parquet" % self.model._meta.object_name)
+
+        # Remove previous .parquet file
+        self.processed_file.delete_archive('parquet_archive')
+
+        fd, parquet_path = tempfile.mkstemp(suffix='.parquet', dir=self.processed_data_dir)
+        os.close(fd)
+        try:
+            with connection.cursor() as c:
+                self.processed_file.parquet_size = copy_to_parquet(
+                    c,
+                    self.model,
+                    parquet_path,
+                )
+            with open(parquet_path, 'rb') as f:
+                self.processed_file.parquet_archive.save(
+                    '%s.parquet' % self.model_name,
+                    File(f),
+                    save=False,
+                )
+        finally:
+            os.remove(parquet_path)
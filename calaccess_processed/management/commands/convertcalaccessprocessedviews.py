@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Replace the materialized views backing processed data models with empty tables.
+"""
+from django.apps import apps
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.managers import ProcessedDataManager
+
+
+class Command(CalAccessCommand):
+    """
+    Replace the materialized views backing processed data models with empty tables.
+    """
+    help = (
+        'Replace the materialized views backing processed data models with empty tables. '
+        'Run it before migrate if models were loaded with --views.'
+    )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+
+        view_models = self.get_view_models()
+        if not view_models:
+            if self.verbosity > 2:
+                self.log(" No materialized views to convert")
+            return
+
+        self.header('Converting %s materialized views to tables' % len(view_models))
+        # create the tables the applied migrations expect, so pending ones apply cleanly
+        state_apps = self.get_migration_state_apps()
+        for m in view_models:
+            if self.verbosity > 2:
+                self.log(" Converting %s to a table" % m._meta.db_table)
+            m.objects.convert_view_to_table(
+                state_apps.get_model(m._meta.app_label, m._meta.object_name)
+            )
+
+        self.success("Done!")
+
+    def get_view_models(self):
+        """
+        Return a list of the processed data models currently backed by materialized views.
+        """
+        return [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if isinstance(m.objects, ProcessedDataManager) and m.objects.is_materialized_view
+        ]
+
+    def get_migration_state_apps(self):
+        """
+        Return the registry of historical models as of the applied migrations.
+        """
+        loader = MigrationExecutor(connection).loader
+        return loader.project_state(list(loader.applied_migrations)).apps
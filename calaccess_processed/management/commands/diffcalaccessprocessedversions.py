@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export the rows added, changed and removed from each processed filing model between two versions.
+"""
+import gzip
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection, models, DatabaseError
+from django.utils.timezone import now
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.management.commands.archivecalaccessprocessedfile import copy_to_field_file
+from calaccess_processed.managers import get_temp_name
+from calaccess_processed.models.tracking import (
+    ProcessedDataVersion,
+    ProcessedDataFile,
+    ProcessedDataFileDiff,
+)
+
+
+class Command(CalAccessCommand):
+    """
+    Export the rows added, changed and removed from each processed filing model between two versions.
+    """
+    help = 'Export the rows added, changed and removed from each processed filing model between two versions.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            'model_names',
+            nargs='*',
+            help="Names of the models to compare (default: all filing models)"
+        )
+        parser.add_argument(
+            "--from-version",
+            action="store",
+            type=int,
+            dest="from_version",
+            default=None,
+            help="Id of the processed version to compare from (default: the "
+                 "latest finished version before the one compared to)."
+        )
+        parser.add_argument(
+            "--to-version",
+            action="store",
+            type=int,
+            dest="to_version",
+            default=None,
+            help="Id of the processed version to compare to (default: the "
+                 "latest version)."
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            dest="gzip",
+            default=getattr(settings, 'CALACCESS_GZIP_ARCHIVE', False),
+            help="Compress the archived .csv files with gzip."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        self.gzip = options['gzip']
+
+        latest_version = ProcessedDataVersion.objects.latest('process_start_datetime')
+        try:
+            if options['to_version']:
+                self.to_version = ProcessedDataVersion.objects.get(id=options['to_version'])
+            else:
+                self.to_version = latest_version
+            if options['from_version']:
+                self.from_version = ProcessedDataVersion.objects.get(id=options['from_version'])
+            else:
+                self.from_version = ProcessedDataVersion.objects.filter(
+                    process_finish_datetime__isnull=False,
+                    raw_version__release_datetime__lt=self.to_version.raw_version.release_datetime,
+                ).order_by('-raw_version__release_datetime')[0]
+        except (ProcessedDataVersion.DoesNotExist, IndexError):
+            raise CommandError('No processed version to compare.')
+
+        # only the latest version's rows are in the database, any other
+        # version's are loaded from its archived files
+        self.to_live_tables = self.to_version == latest_version
+
+        self.header(
+            'Comparing {:%m-%d-%Y %H:%M:%S} snapshot to {:%m-%d-%Y %H:%M:%S} snapshot'.format(
+                self.from_version.raw_version.release_datetime,
+                self.to_version.raw_version.release_datetime,
+            )
+        )
+
+        # tables of each version's rows, by model
+        self.tables = {'from': {}, 'to': {}}
+        self.temp_tables = []
+        try:
+            for model in self.get_model_list(options['model_names']):
+                self.diff_model(model)
+        finally:
+            self.drop_temp_tables(self.temp_tables)
+
+        self.success("Done!")
+
+    def get_model_list(self, model_names):
+        """
+        Return a list of the filing models to compare, limited to model_names if any.
+        """
+        model_list = [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if not m._meta.abstract and
+            'filings' in str(m)
+        ]
+        if model_names:
+            model_list = [m for m in model_list if m._meta.object_name in model_names]
+        return model_list
+
+    def get_natural_key(self, model):
+        """
+        Return the list of fields that identify a row of the model across versions.
+
+        That's the first set of unique_together fields or, failing that, the
+        primary key, unless it's a sequential id. Returns None if the model
+        has no natural key.
+        """
+        if model._meta.unique_together:
+            return [model._meta.get_field(name) for name in model._meta.unique_together[0]]
+        if not isinstance(model._meta.pk, models.AutoField):
+            return [model._meta.pk]
+        return None
+
+    def has_sequential_ids(self, field):
+        """
+        Return True if the field is a foreign key to a model with sequential ids.
+
+        Those ids are reassigned each time a model is loaded, so they can't
+        be compared across versions.
+        """
+        return field.is_relation and isinstance(field.target_field, models.AutoField)
+
+    def get_columns(self, side, model):
+        """
+        Return the column expressions, names and joins to select a model's comparable columns.
+
+        Sequential ids are left out. Foreign keys to models with sequential
+        ids are replaced by the natural key of the row they refer to, named
+        "<field name>__<column name>".
+
+        Returns a tuple of (expressions, names, joins), where expressions
+        and names map each field to a list.
+        """
+        expressions = {}
+        names = {}
+        joins = []
+        for f in model._meta.concrete_fields:
+            if isinstance(f, models.AutoField):
+                continue
+            if self.has_sequential_ids(f):
+                related_model = f.related_model
+                alias = 'j%s' % len(joins)
+                joins.append(
+                    'LEFT JOIN "{table}" AS {alias} ON {alias}."{pk}" = t."{column}"'.format(
+                        table=self.get_table(side, related_model),
+                        alias=alias,
+                        pk=related_model._meta.pk.column,
+                        column=f.column,
+                    )
+                )
+                key = self.get_natural_key(related_model)
+                expressions[f] = ['%s."%s"' % (alias, k.column) for k in key]
+                names[f] = ['%s__%s' % (f.name, k.column) for k in key]
+            else:
+                expressions[f] = ['t."%s"' % f.column]
+                names[f] = [f.column]
+        return expressions, names, joins
+
+    def get_table(self, side, model):
+        """
+        Return the name of the table with the model's rows in the "from" or "to" version.
+        """
+        tables = self.tables[side]
+        if model not in tables:
+            if side == 'to' and self.to_live_tables:
+                tables[model] = model._meta.db_table
+            else:
+                version = self.from_version if side == 'from' else self.to_version
+                tables[model] = self.load_archive(
+                    version,
+                    model,
+                    get_temp_name(side, model._meta.db_table),
+                )
+        return tables[model]
+
+    def load_archive(self, version, model, table_name):
+        """
+        Copy the model's archived file from the version into a temporary table.
+
+        Raises ProcessedDataFile.DoesNotExist if the file wasn't archived.
+        """
+        processed_file = version.files.exclude(file_archive='').get(
+            file_name=model._meta.object_name,
+        )
+        archive_file = processed_file.file_archive
+        if self.verbosity > 2:
+            self.log(" Loading %s" % archive_file.name)
+
+        self.temp_tables.append(table_name)
+        with connection.cursor() as c:
+            c.execute('DROP TABLE IF EXISTS pg_temp."{}";'.format(table_name))
+            c.execute(
+                'CREATE TEMPORARY TABLE "{}" (LIKE "{}");'.format(
+                    table_name,
+                    model._meta.db_table,
+                )
+            )
+            with archive_file.storage.open(archive_file.name, 'rb') as archive:
+                if archive_file.name.endswith('.gz'):
+                    archive = gzip.GzipFile(fileobj=archive, mode='rb')
+                c.copy_expert(
+                    'COPY "{}" FROM STDIN CSV HEADER;'.format(table_name),
+                    archive,
+                )
+            c.execute('ANALYZE "{}";'.format(table_name))
+        return table_name
+
+    def diff_model(self, model):
+        """
+        Compare the model's rows in both versions and archive the differences.
+
+        Rows are matched on their natural keys, so rows with a null in their
+        natural key can't be matched and are counted as removed and added.
+        """
+        file_name = model._meta.object_name
+        key = self.get_natural_key(model)
+        if not key:
+            self.warn(' Skipping %s, which has no natural key' % file_name)
+            return
+
+        if self.verbosity > 2:
+            self.log(" Comparing %s" % file_name)
+        diff_tables = {
+            'added': """
+                SELECT n.* FROM diff_to_rows AS n
+                WHERE NOT EXISTS (SELECT 1 FROM diff_from_rows AS o WHERE {key_match})
+            """,
+            'changed': """
+                SELECT n.* FROM diff_to_rows AS n
+                JOIN diff_from_rows AS o ON {key_match}
+                WHERE ROW(n.*) IS DISTINCT FROM ROW(o.*)
+            """,
+            'removed': """
+                SELECT o.* FROM diff_from_rows AS o
+                WHERE NOT EXISTS (SELECT 1 FROM diff_to_rows AS n WHERE {key_match})
+            """,
+        }
+        try:
+            try:
+                self.select_rows('from', model)
+                self.select_rows('to', model)
+            except ProcessedDataFile.DoesNotExist:
+                self.warn(' Skipping %s, which was not archived in both versions' % file_name)
+                return
+            except DatabaseError as e:
+                self.warn(' Skipping %s, which could not be loaded: %s' % (file_name, e))
+                return
+
+            diff, created = ProcessedDataFileDiff.objects.get_or_create(
+                from_version=self.from_version,
+                to_version=self.to_version,
+                file_name=file_name,
+            )
+            diff.process_start_datetime = now()
+            diff.process_finish_datetime = None
+            diff.save()
+
+            expressions, names, joins = self.get_columns('to', model)
+            key_columns = [name for f in key for name in names[f]]
+            key_match = ' AND '.join('o."{0}" = n."{0}"'.format(c) for c in key_columns)
+
+            with connection.cursor() as c:
+                for change in ('added', 'changed', 'removed'):
+                    table_name = 'diff_%s' % change
+                    c.execute(
+                        'CREATE TEMPORARY TABLE "{}" AS {};'.format(
+                            table_name,
+                            diff_tables[change].format(key_match=key_match),
+                        )
+                    )
+                    c.execute('SELECT COUNT(*) FROM "{}";'.format(table_name))
+                    setattr(diff, '%s_count' % change, c.fetchone()[0])
+
+                    archive_field = getattr(diff, '%s_archive' % change)
+                    archive_field.delete(save=False)
+                    archive_name = '%s_%s.csv' % (file_name, change)
+                    if self.gzip:
+                        archive_name += '.gz'
+                    copy_to_field_file(
+                        c,
+                        'COPY (SELECT * FROM "{}" ORDER BY {}) TO STDOUT CSV HEADER;'.format(
+                            table_name,
+                            ', '.join('"%s"' % k for k in key_columns),
+                        ),
+                        archive_field,
+                        archive_name,
+                        compress=self.gzip,
+                    )
+        finally:
+            self.drop_temp_tables(
+                ['diff_from_rows', 'diff_to_rows'] + ['diff_%s' % c for c in diff_tables]
+            )
+
+        diff.process_finish_datetime = now()
+        diff.save()
+        if self.verbosity > 2:
+            self.log(
+                " {0.added_count} added, {0.changed_count} changed, "
+                "{0.removed_count} removed".format(diff)
+            )
+
+    def select_rows(self, side, model):
+        """
+        Select the comparable columns of the model's rows in one version into a temporary table.
+
+        The table is named diff_from_rows or diff_to_rows, and its natural
+        key columns come first.
+        """
+        expressions, names, joins = self.get_columns(side, model)
+        key = self.get_natural_key(model)
+        fields = key + [
+            f for f in model._meta.concrete_fields
+            if f in expressions and f not in key
+        ]
+        select_list = []
+        for f in fields:
+            for expression, name in zip(expressions[f], names[f]):
+                select_list.append('%s AS "%s"' % (expression, name))
+
+        table_name = 'diff_%s_rows' % side
+        with connection.cursor() as c:
+            c.execute(
+                'CREATE TEMPORARY TABLE "{name}" AS SELECT {columns} FROM "{table}" AS t {joins};'.format(
+                    name=table_name,
+                    columns=', '.join(select_list),
+                    table=self.get_table(side, model),
+                    joins=' '.join(joins),
+                )
+            )
+            c.execute('ANALYZE "{}";'.format(table_name))
+
+    def drop_temp_tables(self, table_names):
+        """
+        Drop the temporary tables, if they exist.
+        """
+        with connection.cursor() as c:
+            for table_name in table_names:
+                c.execute('DROP TABLE IF EXISTS pg_temp."{}";'.format(table_name))
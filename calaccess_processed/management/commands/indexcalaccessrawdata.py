@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Create (or drop) the raw data table indexes that support the processed data loading queries.
+"""
+from django.db import connection
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.managers import execute_sql, get_index_name
+from calaccess_processed.raw_data_indexes import indexes_by_query
+
+
+class Command(CalAccessCommand):
+    """
+    Create (or drop) the raw data table indexes that support the processed data loading queries.
+    """
+    help = 'Create (or drop) the raw data table indexes that support the processed data loading queries.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            dest="drop",
+            default=False,
+            help="Drop the indexes instead of creating them."
+        )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            type=int,
+            dest="workers",
+            default=1,
+            help="Number of indexes to build at once, each on its own "
+                 "database connection (default: 1)."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        self.workers = max(options.get("workers") or 1, 1)
+
+        if options.get("drop"):
+            self.header("Dropping raw data indexes")
+            self.drop_indexes()
+        else:
+            self.header("Indexing raw data")
+            self.create_indexes()
+
+        self.success("Done!")
+
+    def get_index_list(self):
+        """
+        Return a list of (index name, table name, column names) for each index to create.
+
+        Indexes needed by more than one loading query are only listed once.
+        """
+        index_list = []
+        for query_name, indexes in indexes_by_query:
+            for table, columns in indexes:
+                name = get_index_name(table, columns)
+                if name not in [i[0] for i in index_list]:
+                    index_list.append((name, table, columns))
+        return index_list
+
+    def create_indexes(self):
+        """
+        Create each index that doesn't exist yet, then analyze the indexed tables.
+        """
+        index_list = self.get_index_list()
+        # CREATE INDEX IF NOT EXISTS needs Postgres 9.5, so check for each first
+        existing_indexes = self.get_existing_index_names()
+        index_list = [i for i in index_list if i[0] not in existing_indexes]
+        if not index_list:
+            return
+        if self.verbosity > 2:
+            self.log(
+                " Creating %s indexes with %s workers" % (len(index_list), self.workers)
+            )
+        execute_sql(
+            [
+                'CREATE INDEX "{name}" ON "{table}" ({columns});'.format(
+                    name=name,
+                    table=table,
+                    columns=', '.join('"%s"' % c for c in columns),
+                ) for name, table, columns in index_list
+            ],
+            workers=self.workers,
+        )
+
+        tables = sorted(set(table for name, table, columns in index_list))
+        if self.verbosity > 2:
+            self.log(" Analyzing %s tables" % len(tables))
+        execute_sql(
+            ['ANALYZE "%s";' % table for table in tables],
+            workers=self.workers,
+        )
+
+    def get_existing_index_names(self):
+        """
+        Return the set of names of the indexes in the current schema.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'SELECT indexname FROM pg_indexes WHERE schemaname = current_schema();'
+            )
+            return set(name for name, in c.fetchall())
+
+    def drop_indexes(self):
+        """
+        Drop each index.
+        """
+        execute_sql(
+            ['DROP INDEX IF EXISTS "%s";' % name for name, table, columns in self.get_index_list()]
+        )
@@ -3,13 +3,46 @@
 """
 Load and archive the CAL-ACCESS Filing and FilingVersion models.
 """
+import os
+from time import sleep
+from multiprocessing import Pool
 from django.apps import apps
 from django.conf import settings
 from django.core.management import call_command
-from django.db import connection
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction
 from django.utils.timezone import now
+import calaccess_processed
 from calaccess_processed.management.commands import CalAccessCommand
-from calaccess_processed.models.tracking import ProcessedDataFile
+from calaccess_processed.managers import (
+    execute_constraint_and_index_sql,
+    execute_sql,
+    get_query_tables,
+)
+from calaccess_processed.models.tracking import (
+    ProcessedDataVersion,
+    ProcessedDataFile,
+)
+
+# Restricts incremental loads to filings added, amended or removed
+CHANGED_FILING_CONDITION = '{column} IN (SELECT filing_id FROM calaccess_processed_changedfiling)'
+
+
+def load_model(model_label, load_options, processed_file_id):
+    """
+    Load the processed model with the given label in a worker process.
+
+    Each worker process opens its own database connection.
+    """
+    model = apps.get_model(model_label)
+    try:
+        model.objects.load_raw_data(
+            checkpoint=ProcessedDataFile.objects.get(id=processed_file_id),
+            **load_options
+        )
+    finally:
+        connection.close()
+    return model_label
 
 
 class Command(CalAccessCommand):
@@ -30,6 +63,78 @@ class Command(CalAccessCommand):
             default=False,
             help="Force re-start (overrides auto-resume)."
         )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            type=int,
+            dest="workers",
+            default=1,
+            help="Number of models to load at once, each on its own database "
+                 "connection (default: 1)."
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            dest="incremental",
+            default=False,
+            help="Only re-load filings whose rows in the raw data tables were "
+                 "added, changed or removed since the previous processed "
+                 "version. Finding them reads every row of those tables."
+        )
+        parser.add_argument(
+            "--swap",
+            action="store_true",
+            dest="swap",
+            default=False,
+            help="Load each model into a shadow table and swap it in when "
+                 "done, so the model's table stays readable throughout."
+        )
+        parser.add_argument(
+            "--index-workers",
+            action="store",
+            type=int,
+            dest="index_workers",
+            default=1,
+            help="Number of indexes and constraints to build at once, each "
+                 "on its own database connection (default: 1)."
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            dest="defer_indexes",
+            default=False,
+            help="Build the indexes and constraints of all the models loaded "
+                 "in each phase together, after the phase's models are loaded."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            action="store",
+            type=int,
+            dest="chunk_size",
+            default=None,
+            help="Load each model this many filing_ids at a time, committing "
+                 "each chunk so an interrupted load resumes where it stopped. "
+                 "Tables read without a filing_id index are indexed first."
+        )
+        parser.add_argument(
+            "--archive-workers",
+            action="store",
+            type=int,
+            dest="archive_workers",
+            default=1,
+            help="Number of models to archive at once, each on its own "
+                 "database connection (default: 1)."
+        )
+        parser.add_argument(
+            "--views",
+            action="store_true",
+            dest="views",
+            default=False,
+            help="Back the latest-version item and summary models with "
+                 "materialized views of their version models, refreshed "
+                 "concurrently on each load. Migrations can't alter the "
+                 "views, so run convertcalaccessprocessedviews before migrate."
+        )
 
     def handle(self, *args, **options):
         """
@@ -38,6 +143,24 @@ class Command(CalAccessCommand):
         super(Command, self).handle(*args, **options)
 
         self.force_restart = options.get("restart")
+        self.workers = max(options.get("workers") or 1, 1)
+        self.incremental = options.get("incremental")
+        self.swap = options.get("swap")
+        if self.incremental and self.swap:
+            raise CommandError('--incremental and --swap cannot be combined.')
+        self.index_workers = max(options.get("index_workers") or 1, 1)
+        self.defer_indexes = options.get("defer_indexes")
+        if self.defer_indexes and (self.incremental or self.swap):
+            self.warn('--defer-indexes is ignored by --incremental and --swap loads.')
+            self.defer_indexes = False
+        self.chunk_size = options.get("chunk_size")
+        if self.chunk_size and (self.incremental or self.swap):
+            self.warn('--chunk-size is ignored by --incremental and --swap loads.')
+            self.chunk_size = None
+        self.views = options.get("views")
+        self.archive_workers = max(options.get("archive_workers") or 1, 1)
+        if self.views and self.swap:
+            raise CommandError('--views and --swap cannot be combined.')
 
         # get or create the ProcessedDataVersion instance
         self.processed_version, created = self.get_or_create_processed_version()
@@ -59,13 +182,36 @@ class Command(CalAccessCommand):
             self.processed_version.process_start_datetime = now()
             self.processed_version.save()
 
-        # handle version models first
+        if not self.views:
+            self.convert_views_to_tables()
+
+        self.loaded_models = []
+
         version_models = self.get_model_list('version')
+        filing_models = self.get_model_list('filing')
+
+        if self.incremental:
+            self.prepare_incremental_load(version_models + filing_models)
+
+        # handle version models first
         self.load_model_list(version_models)
+        self.add_pending_constraints_and_indexes('version')
 
         # then filing models
-        filing_models = self.get_model_list('filing')
         self.load_model_list(filing_models)
+        self.add_pending_constraints_and_indexes('filing')
+
+        if self.swap:
+            self.validate_constraints(
+                self.get_models_of_type('version') + self.get_models_of_type('filing')
+            )
+
+        # for the next incremental load to compare with
+        self.save_filing_digests()
+
+        # archive if django project setting enabled
+        if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
+            self.archive_loaded_models()
 
         self.success("Done!")
 
@@ -75,22 +221,7 @@ class Command(CalAccessCommand):
 
         model_type must be "version" of "filing".
         """
-        non_abstract_models = [
-            m for m in apps.get_app_config('calaccess_processed').get_models()
-            if not m._meta.abstract and
-            'filings' in str(m)
-        ]
-
-        if model_type == 'version':
-            models_to_load = [
-                m for m in non_abstract_models if 'Version' in str(m)
-            ]
-        elif model_type == 'filing':
-            models_to_load = [
-                m for m in non_abstract_models if 'Version' not in str(m)
-            ]
-        else:
-            raise Exception('model_type must be "version" or "filing".')
+        models_to_load = self.get_models_of_type(model_type)
 
         # if not forcing a restart, filter out the models already loaded
         if not self.force_restart:
@@ -129,37 +260,512 @@ class Command(CalAccessCommand):
 
         return models_to_load
 
+    def get_models_of_type(self, model_type):
+        """
+        Return a list of all the models of the specified type.
+
+        model_type must be "version" of "filing".
+        """
+        non_abstract_models = [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if not m._meta.abstract and
+            'filings' in str(m)
+        ]
+
+        if model_type == 'version':
+            return [m for m in non_abstract_models if 'Version' in str(m)]
+        elif model_type == 'filing':
+            return [m for m in non_abstract_models if 'Version' not in str(m)]
+        else:
+            raise Exception('model_type must be "version" or "filing".')
+
+    def loads_as_view(self, model):
+        """
+        Return True if the model is to be loaded as a materialized view.
+        """
+        return self.views and model.objects.can_load_as_view
+
+    def convert_views_to_tables(self):
+        """
+        Replace the materialized views backing any models with tables.
+
+        Their tables are empty until the models are re-loaded.
+        """
+        view_models = [
+            m for m in self.get_models_of_type('filing') if m.objects.is_materialized_view
+        ]
+        if not view_models:
+            return
+        if self.incremental:
+            raise CommandError(
+                'Models loaded as views can only be incrementally loaded with --views.'
+            )
+        call_command(
+            'convertcalaccessprocessedviews',
+            verbosity=self.verbosity,
+            no_color=self.no_color,
+        )
+        # make sure the models are re-loaded even when resuming
+        ProcessedDataFile.objects.filter(
+            version=self.processed_version,
+            file_name__in=[m._meta.object_name for m in view_models],
+        ).update(process_finish_datetime=None)
+
+    def prepare_incremental_load(self, model_list):
+        """
+        Find the filings that changed and delete their rows from the models to load.
+
+        Falls back to a full load if no previous processed version finished.
+        """
+        previous_versions = ProcessedDataVersion.objects.exclude(
+            id=self.processed_version.id,
+        ).filter(process_finish_datetime__isnull=False)
+        if not previous_versions.exists():
+            self.warn(
+                'No previously processed version to compare. Loading all filings.'
+            )
+            self.incremental = False
+            return
+
+        if not self.table_exists('calaccess_processed_filingdigest'):
+            self.warn(
+                'No digests of the previously loaded filings to compare. Loading all filings.'
+            )
+            self.incremental = False
+            return
+
+        # only compare with the raw data before this version changed any tables
+        loaded_files = self.processed_version.files.filter(
+            process_finish_datetime__isnull=False,
+        )
+        if self.force_restart or not loaded_files.exists():
+            self.find_changed_filings()
+
+        if self.verbosity > 2:
+            with connection.cursor() as c:
+                c.execute('SELECT COUNT(*) FROM calaccess_processed_changedfiling;')
+                self.log(" %s filings changed" % c.fetchone()[0])
+
+        # delete from models before the models their foreign keys point to
+        for m in reversed(self.sort_by_dependencies(model_list)):
+            # views are refreshed in full
+            if self.loads_as_view(m):
+                continue
+            if self.verbosity > 2:
+                self.log(" Deleting changed filings from %s" % m._meta.db_table)
+            m.objects.delete_raw_data(CHANGED_FILING_CONDITION)
+
+    def find_changed_filings(self):
+        """
+        Stage the filing_id of each filing whose raw data changed since the last finished load.
+
+        Filings are compared on digests of their rows in every raw data table
+        the filing models are loaded from (see stage_filing_digests).
+        """
+        if self.verbosity > 2:
+            self.log(" Finding changed filings")
+        self.stage_filing_digests()
+        self.load_staging_table('calaccess_processed_changedfiling')
+
+    def get_raw_tables(self, model_list):
+        """
+        Return a sorted list of the raw data tables the models are loaded from.
+
+        Includes the tables read by the staging tables the models read.
+        """
+        raw_tables = set()
+        checked = set()
+        pending = set(t for m in model_list for t in m.objects.raw_data_load_query_tables)
+        while pending:
+            table = pending.pop()
+            checked.add(table)
+            if os.path.exists(self.get_staging_query_path(table)):
+                with open(self.get_staging_query_path(table)) as f:
+                    pending.update(get_query_tables(f.read()) - checked)
+            elif not table.startswith('calaccess_processed_'):
+                raw_tables.add(table)
+        return sorted(raw_tables)
+
+    def stage_filing_digests(self):
+        """
+        Stage a digest of each filing's rows in the raw data tables the filing models are loaded from.
+
+        Rows are hashed without their id column, which every raw data update
+        reassigns.
+        """
+        model_list = self.get_models_of_type('version') + self.get_models_of_type('filing')
+        selects = []
+        with connection.cursor() as c:
+            for table in self.get_raw_tables(model_list):
+                columns = [
+                    col.name for col in
+                    connection.introspection.get_table_description(c, table)
+                ]
+                if 'FILING_ID' not in columns:
+                    continue
+                selects.append(
+                    """
+                    SELECT "FILING_ID" AS filing_id, md5('{table}:' || ROW({columns})::text) AS row_hash
+                    FROM "{table}"
+                    WHERE "FILING_ID" IS NOT NULL
+                    """.format(
+                        table=table,
+                        columns=', '.join('"%s"' % col for col in columns if col != 'id'),
+                    )
+                )
+            c.execute('DROP TABLE IF EXISTS calaccess_processed_newfilingdigest;')
+            c.execute(
+                """
+                CREATE TABLE calaccess_processed_newfilingdigest AS
+                SELECT filing_id, md5(string_agg(row_hash, '' ORDER BY row_hash)) AS digest
+                FROM ({}) AS hashes
+                GROUP BY filing_id;
+                """.format(' UNION ALL '.join(selects))
+            )
+            c.execute(
+                'ALTER TABLE calaccess_processed_newfilingdigest ADD PRIMARY KEY (filing_id);'
+            )
+            c.execute('ANALYZE calaccess_processed_newfilingdigest;')
+
+    def save_filing_digests(self):
+        """
+        Keep the staged filing digests for the next incremental load to compare with.
+
+        An incremental load keeps the digests it staged to find the changed
+        filings. Other loads stage them at the end.
+        """
+        if not self.incremental or not self.table_exists('calaccess_processed_newfilingdigest'):
+            if self.verbosity > 2:
+                self.log(" Staging filing digests")
+            self.stage_filing_digests()
+        with transaction.atomic():
+            with connection.cursor() as c:
+                c.execute('DROP TABLE IF EXISTS calaccess_processed_filingdigest;')
+                c.execute(
+                    'ALTER TABLE calaccess_processed_newfilingdigest '
+                    'RENAME TO calaccess_processed_filingdigest;'
+                )
+                c.execute(
+                    'ALTER INDEX calaccess_processed_newfilingdigest_pkey '
+                    'RENAME TO calaccess_processed_filingdigest_pkey;'
+                )
+
+    def table_exists(self, table_name):
+        """
+        Return True if the database table exists in the current schema.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'SELECT 1 FROM pg_tables '
+                'WHERE tablename = %s AND schemaname = current_schema();',
+                [table_name],
+            )
+            return c.fetchone() is not None
+
+    def get_staging_query_path(self, table_name):
+        """
+        Return the path to the .sql file that creates the given staging table.
+        """
+        return os.path.join(
+            os.path.dirname(calaccess_processed.__file__),
+            'sql',
+            'stage_%s.sql' % table_name.replace('calaccess_processed_', ''),
+        )
+
+    def load_staging_table(self, table_name):
+        """
+        Create the given staging table by executing its raw sql query.
+        """
+        with open(self.get_staging_query_path(table_name)) as f:
+            sql = f.read()
+        with connection.cursor() as c:
+            c.execute(sql)
+
+    def load_staging_tables(self, model_list):
+        """
+        Create the staging tables read by the loading queries of the given models.
+        """
+        staging_tables = set(
+            t for m in model_list for t in m.objects.raw_data_load_query_tables
+            if os.path.exists(self.get_staging_query_path(t))
+        )
+        for t in sorted(staging_tables):
+            if self.verbosity > 2:
+                self.log(" Staging %s" % t)
+            self.load_staging_table(t)
+
+    def get_model_dependencies(self, model_list):
+        """
+        Return a dict mapping each model in the list to the models it must wait for.
+
+        A model depends on any other model in the list whose table is read
+        by its loading query or that is the target of one of its foreign keys.
+        """
+        models_by_table = dict((m._meta.db_table, m) for m in model_list)
+        dependencies = {}
+        for m in model_list:
+            dependencies[m] = set(
+                models_by_table[t] for t in m.objects.raw_data_load_query_tables
+                if t in models_by_table
+            )
+            dependencies[m].update(
+                f.related_model for f in m._meta.fields
+                if f.is_relation and f.related_model in model_list
+            )
+            dependencies[m].discard(m)
+        return dependencies
+
+    def sort_by_dependencies(self, model_list):
+        """
+        Return the models in the list ordered so each comes after every model it depends on.
+        """
+        dependencies = self.get_model_dependencies(model_list)
+        ordered = []
+        pending = list(model_list)
+        while pending:
+            ready = [m for m in pending if not dependencies[m] - set(ordered)]
+            if not ready:
+                raise CommandError(
+                    'Circular dependencies between models: %s' % ', '.join(
+                        m._meta.object_name for m in pending
+                    )
+                )
+            for m in ready:
+                pending.remove(m)
+                ordered.append(m)
+        return ordered
+
     def load_model_list(self, model_list):
         """
         Iterate over the given list of models, loading each one.
         """
-        # iterate over all of filing models
+        self.load_staging_tables(model_list)
+
+        if self.workers > 1 and len(model_list) > 1:
+            self.load_model_list_in_parallel(model_list)
+        else:
+            # iterate over all of filing models
+            for m in model_list:
+                processed_file = self.start_model_load(m)
+                # load the processed model
+                if self.verbosity > 2:
+                    self.log(" Loading %s" % m._meta.db_table)
+                m.objects.load_raw_data(
+                    checkpoint=processed_file,
+                    **self.load_options
+                )
+                self.finish_model_load(m, processed_file)
+
+    def add_pending_constraints_and_indexes(self, model_type):
+        """
+        Re-create the constraints and indexes of every model of the type whose indexes are still dropped.
+
+        That includes models loaded with --defer-indexes by an earlier run
+        that was interrupted before it got to re-create them.
+        """
+        pending_file_names = set(
+            ProcessedDataFile.objects.filter(
+                indexes_pending=True,
+            ).values_list('file_name', flat=True)
+        )
+        model_list = [
+            m for m in self.get_models_of_type(model_type)
+            if m._meta.object_name in pending_file_names and
+            not m.objects.is_materialized_view
+        ]
+        if not model_list:
+            return
+        self.add_constraints_and_indexes(model_list)
+        ProcessedDataFile.objects.filter(
+            file_name__in=[m._meta.object_name for m in model_list],
+        ).update(indexes_pending=False)
+
+    def validate_constraints(self, model_list):
+        """
+        Validate the foreign keys of the given models that were added NOT VALID.
+
+        Swapping in a model's table re-adds the foreign keys to it from other
+        tables without checking them, since those tables are re-loaded later.
+        """
+        statements = []
         for m in model_list:
-            # set up the ProcessedDataFile instance
-            processed_file, created = ProcessedDataFile.objects.get_or_create(
-                version=self.processed_version,
-                file_name=m._meta.object_name,
+            if not m.objects.is_materialized_view:
+                statements.extend(m.objects.get_validate_constraint_sql())
+        if not statements:
+            return
+        if self.verbosity > 2:
+            self.log(" Validating %s foreign keys" % len(statements))
+        execute_sql(statements, workers=self.index_workers)
+
+    def add_constraints_and_indexes(self, model_list):
+        """
+        Re-create the constraints and indexes of the given models all at once.
+        """
+        if self.verbosity > 2:
+            self.log(
+                " Indexing %s models with %s workers" % (
+                    len(model_list),
+                    self.index_workers,
+                )
             )
-            processed_file.process_start_datetime = now()
+        statements = []
+        for m in model_list:
+            statements.extend(m.objects.get_constraint_and_index_sql())
+        execute_constraint_and_index_sql(statements, workers=self.index_workers)
+
+    def load_model_list_in_parallel(self, model_list):
+        """
+        Load the given list of models in a pool of worker processes.
+
+        Each model is loaded as soon as every model it depends on is loaded.
+        """
+        dependencies = self.get_model_dependencies(model_list)
+        pending = list(model_list)
+        running = {}
+
+        if self.verbosity > 2:
+            self.log(" Loading with %s workers" % self.workers)
+
+        # worker processes must not share the parent's database connections
+        for conn in connections.all():
+            conn.close()
+        pool = Pool(processes=self.workers)
+        try:
+            while pending or running:
+                waiting_on = set(pending) | set(running)
+                ready = [m for m in pending if not dependencies[m] & waiting_on]
+                if not ready and not running:
+                    raise CommandError(
+                        'Circular dependencies between models: %s' % ', '.join(
+                            m._meta.object_name for m in pending
+                        )
+                    )
+                for m in ready:
+                    pending.remove(m)
+                    processed_file = self.start_model_load(m)
+                    if self.verbosity > 2:
+                        self.log(" Loading %s" % m._meta.db_table)
+                    running[m] = (
+                        pool.apply_async(
+                            load_model,
+                            (m._meta.label, self.load_options, processed_file.id),
+                        ),
+                        processed_file,
+                    )
+
+                finished = [m for m, (result, _) in running.items() if result.ready()]
+                if not finished:
+                    sleep(0.5)
+                for m in finished:
+                    result, processed_file = running.pop(m)
+                    # re-raises any exception from the worker
+                    result.get()
+                    self.finish_model_load(m, processed_file)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    @property
+    def load_options(self):
+        """
+        Return a dict of keyword arguments for each model's load_raw_data method.
+        """
+        options = {
+            'swap': self.swap,
+            'defer_indexes': self.defer_indexes,
+            'index_workers': self.index_workers,
+            'as_view': self.views,
+        }
+        if self.chunk_size:
+            options['chunk_size'] = self.chunk_size
+        if self.incremental:
+            options['filing_id_condition'] = CHANGED_FILING_CONDITION
+        return options
+
+    def start_model_load(self, model):
+        """
+        Set up the tracking of the model's load and flush its table.
+
+        Return the model's ProcessedDataFile instance.
+        """
+        # set up the ProcessedDataFile instance
+        processed_file, created = ProcessedDataFile.objects.get_or_create(
+            version=self.processed_version,
+            file_name=model._meta.object_name,
+        )
+        processed_file.process_start_datetime = now()
+        # resume a chunked load from its last checkpoint
+        if (
+            self.chunk_size and
+            processed_file.load_checkpoint is not None and
+            not self.force_restart
+        ):
+            if self.verbosity > 2:
+                self.log(
+                    " Resuming %s after filing_id %s" % (
+                        model._meta.db_table,
+                        processed_file.load_checkpoint,
+                    )
+                )
+            # the indexes were dropped when the interrupted load started
+            processed_file.indexes_pending = self.defer_indexes
             processed_file.save()
-            # flush the processed model
+            return processed_file
+        processed_file.load_checkpoint = None
+        # an interrupted --defer-indexes run may have left the model's
+        # indexes dropped, so put them back before they're dropped again
+        pending_files = ProcessedDataFile.objects.filter(
+            file_name=model._meta.object_name,
+            indexes_pending=True,
+        )
+        if pending_files.exists() and not model.objects.is_materialized_view:
             if self.verbosity > 2:
-                self.log(" Truncating %s" % m._meta.db_table)
-            with connection.cursor() as c:
-                c.execute('TRUNCATE TABLE "%s" CASCADE' % (m._meta.db_table))
-            # load the processed model
+                self.log(" Re-creating dropped indexes of %s" % model._meta.db_table)
+            self.add_constraints_and_indexes([model])
+            pending_files.update(indexes_pending=False)
+        processed_file.indexes_pending = self.defer_indexes and not self.loads_as_view(model)
+        processed_file.save()
+        # flush the processed model, unless only re-loading changed filings,
+        # swapping in a new table or refreshing a view
+        if not self.incremental and not self.swap and not self.loads_as_view(model):
             if self.verbosity > 2:
-                self.log(" Loading %s" % m._meta.db_table)
-            m.objects.load_raw_data()
+                self.log(" Truncating %s" % model._meta.db_table)
+            with connection.cursor() as c:
+                c.execute('TRUNCATE TABLE "%s" CASCADE' % (model._meta.db_table))
+        return processed_file
 
-            processed_file.records_count = m.objects.count()
-            processed_file.process_finish_datetime = now()
-            processed_file.save()
+    def finish_model_load(self, model, processed_file):
+        """
+        Record the completion of the model's load and archive it.
+        """
+        processed_file.records_count = model.objects.count()
+        processed_file.process_finish_datetime = now()
+        processed_file.save()
+        if not processed_file.indexes_pending:
+            # the load re-created the model's indexes
+            ProcessedDataFile.objects.filter(
+                file_name=model._meta.object_name,
+                indexes_pending=True,
+            ).update(indexes_pending=False)
+        self.loaded_models.append(model)
 
-            # archive if django project setting enabled
-            if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
-                call_command(
-                    'archivecalaccessprocessedfile',
-                    'calaccess_processed',
-                    m._meta.object_name,
-                )
+    def archive_loaded_models(self):
+        """
+        Archive each model loaded by this run or loaded but not archived by a previous one.
+        """
+        unarchived_file_names = set(
+            self.processed_version.files.filter(
+                process_finish_datetime__isnull=False,
+                file_archive='',
+            ).values_list('file_name', flat=True)
+        )
+        model_list = [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if 'filings' in str(m) and (
+                m in self.loaded_models or
+                m._meta.object_name in unarchived_file_names
+            )
+        ]
+        if self.verbosity:
+            self.header("Archiving %s processed files" % len(model_list))
+        self.archive_models(model_list, workers=self.archive_workers)
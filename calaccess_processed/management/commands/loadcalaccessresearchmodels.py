@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Load and archive the research models of filer_id and filing_id values in the raw data.
+"""
+from django.conf import settings
+from django.db import connection
+from django.utils.timezone import now
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.models import FilerIDValue, FilingIDValue
+from calaccess_processed.models.tracking import ProcessedDataFile
+
+
+class Command(CalAccessCommand):
+    """
+    Load and archive the research models of filer_id and filing_id values in the raw data.
+    """
+    help = 'Load and archive the research models of filer_id and filing_id values in the raw data.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--query-workers",
+            action="store",
+            type=int,
+            dest="query_workers",
+            default=getattr(settings, 'CALACCESS_QUERY_WORKERS', 1),
+            help="Number of raw tables to scan at once, each on its own "
+                 "database connection (default: 1)."
+        )
+        parser.add_argument(
+            "--index-workers",
+            action="store",
+            type=int,
+            dest="index_workers",
+            default=1,
+            help="Number of indexes and constraints to build at once, each "
+                 "on its own database connection (default: 1)."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        self.query_workers = max(options.get("query_workers") or 1, 1)
+        self.index_workers = max(options.get("index_workers") or 1, 1)
+
+        self.processed_version, created = self.get_or_create_processed_version()
+        self.header(
+            'Load research models from {:%m-%d-%Y %H:%M:%S} snapshot'.format(
+                self.processed_version.raw_version.release_datetime
+            )
+        )
+
+        model_list = [FilerIDValue, FilingIDValue]
+        for m in model_list:
+            self.load_model(m)
+
+        # archive if django project setting enabled
+        if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
+            self.archive_models(model_list)
+
+        self.success("Done!")
+
+    def load_model(self, model):
+        """
+        Flush and load the model, tracking it with a ProcessedDataFile.
+        """
+        processed_file, created = ProcessedDataFile.objects.get_or_create(
+            version=self.processed_version,
+            file_name=model._meta.object_name,
+        )
+        processed_file.process_start_datetime = now()
+        processed_file.process_finish_datetime = None
+        processed_file.save()
+
+        if self.verbosity > 2:
+            self.log(
+                " Loading %s with %s workers" % (model._meta.db_table, self.query_workers)
+            )
+        with connection.cursor() as c:
+            c.execute('TRUNCATE TABLE "%s" CASCADE' % model._meta.db_table)
+        model.objects.load_raw_data(
+            query_workers=self.query_workers,
+            index_workers=self.index_workers,
+        )
+
+        processed_file.records_count = model.objects.count()
+        processed_file.process_finish_datetime = now()
+        processed_file.save()
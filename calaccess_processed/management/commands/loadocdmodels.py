@@ -17,11 +17,26 @@ class Command(CalAccessCommand):
     """
     help = 'Load data extracted from scrape and raw data snapshot into OCD models'
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        parser.add_argument(
+            "--archive-workers",
+            action="store",
+            type=int,
+            dest="archive_workers",
+            default=1,
+            help="Number of models to archive at once, each on its own "
+                 "database connection (default: 1)."
+        )
+
     def handle(self, *args, **options):
         """
         Make it happen.
         """
         super(Command, self).handle(*args, **options)
+        self.archive_workers = max(options.get("archive_workers") or 1, 1)
 
         self.processed_version = ProcessedDataVersion.objects.latest()
 
@@ -111,11 +126,18 @@ class Command(CalAccessCommand):
             processed_data_file.process_start_datetime = now()
             processed_data_file.save()
 
-            call_command(
-                'archivecalaccessprocessedfile',
-                m._meta.app_label,
-                m._meta.object_name,
-            )
-            processed_data_file.refresh_from_db()
-            processed_data_file.process_finish_datetime = now()
-            processed_data_file.save()
+        self.archive_models(
+            models_to_load,
+            workers=self.archive_workers,
+            on_archived=self.finish_model_archive,
+        )
+
+    def finish_model_archive(self, model):
+        """
+        Record the completion of the model's archive.
+        """
+        processed_data_file = self.processed_version.files.get(
+            file_name=model._meta.object_name,
+        )
+        processed_data_file.process_finish_datetime = now()
+        processed_data_file.save()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export and archive each processed filing model in partitions by election cycle and filer.
+"""
+import json
+import hashlib
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.base import ContentFile
+from django.db import connection, models
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.management.commands.archivecalaccessprocessedfile import copy_to_field_file
+from calaccess_processed.models.tracking import (
+    ProcessedDataVersion,
+    ProcessedDataFile,
+)
+
+# Fields that date a filing, in order of preference, for its election cycle
+CYCLE_DATE_FIELDS = ('election_date', 'election_year', 'date_filed')
+
+# Foreign keys that lead from an item to its filing
+FILING_FIELDS = ('filing', 'filing_version')
+
+
+class Command(CalAccessCommand):
+    """
+    Export and archive each processed filing model in partitions by election cycle and filer.
+    """
+    help = 'Export and archive each processed filing model in partitions by election cycle and filer.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            'model_names',
+            nargs='*',
+            help="Names of the models to partition (default: all filing models)"
+        )
+        parser.add_argument(
+            "--by",
+            action="store",
+            dest="by",
+            choices=('cycle', 'filer', 'both'),
+            default='both',
+            help="Partition by election cycle, filer_id bucket or both (default: both)."
+        )
+        parser.add_argument(
+            "--filer-buckets",
+            action="store",
+            type=int,
+            dest="filer_buckets",
+            default=getattr(settings, 'CALACCESS_PARTITION_FILER_BUCKETS', 16),
+            help="Number of buckets to split filer_ids into (default: 16)."
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            dest="gzip",
+            default=getattr(settings, 'CALACCESS_GZIP_ARCHIVE', False),
+            help="Compress the archived .csv files with gzip."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        self.by_cycle = options['by'] in ('cycle', 'both')
+        self.by_filer = options['by'] in ('filer', 'both')
+        self.filer_buckets = max(options['filer_buckets'], 1)
+        self.gzip = options['gzip']
+
+        self.version = ProcessedDataVersion.objects.latest('process_start_datetime')
+        self.header(
+            'Partitioning files from {:%m-%d-%Y %H:%M:%S} snapshot'.format(
+                self.version.raw_version.release_datetime,
+            )
+        )
+
+        for model in self.get_model_list(options['model_names']):
+            self.partition_model(model)
+
+        self.archive_manifest()
+        self.success("Done!")
+
+    def get_model_list(self, model_names):
+        """
+        Return a list of the filing models to partition, limited to model_names if any.
+        """
+        model_list = [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if not m._meta.abstract and
+            'filings' in str(m)
+        ]
+        if model_names:
+            model_list = [m for m in model_list if m._meta.object_name in model_names]
+        return model_list
+
+    def get_filing_source(self, model):
+        """
+        Return the filing model, join and table alias that lead to each row's filer_id and dates.
+
+        Filing models are their own source, item models join the filing
+        they belong to. Returns (None, None, None) for models without a filer.
+        """
+        field_names = [f.name for f in model._meta.concrete_fields]
+        if 'filer_id' in field_names:
+            return model, '', 't'
+        for name in FILING_FIELDS:
+            if name in field_names:
+                field = model._meta.get_field(name)
+                return (
+                    field.related_model,
+                    'LEFT JOIN "{table}" AS f ON f."{pk}" = t."{column}"'.format(
+                        table=field.related_model._meta.db_table,
+                        pk=field.target_field.column,
+                        column=field.column,
+                    ),
+                    'f',
+                )
+        return None, None, None
+
+    def get_cycle_sql(self, filing_model, alias):
+        """
+        Return the SQL expression for the election cycle of a filing.
+
+        Cycles are named for their even year, so 2015 and 2016 are both in
+        the 2016 cycle. The year comes from the first of CYCLE_DATE_FIELDS
+        the filing has.
+        """
+        years = []
+        for name in CYCLE_DATE_FIELDS:
+            try:
+                field = filing_model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if isinstance(field, models.DateField):
+                years.append('EXTRACT(YEAR FROM {}."{}")::integer'.format(alias, field.column))
+            else:
+                years.append('{}."{}"'.format(alias, field.column))
+        year = 'COALESCE(%s)' % ', '.join(years)
+        return '({0} + {0} % 2)'.format(year)
+
+    def get_filer_bucket_sql(self, alias):
+        """
+        Return the SQL expression for the bucket of a filer_id.
+
+        The bucket is the first seven hex digits of the md5 of the filer_id,
+        modulo the number of buckets, so consumers can compute it, too.
+        """
+        return "(('x' || substr(md5({}.\"filer_id\"::text), 1, 7))::bit(28)::integer % {})".format(
+            alias,
+            self.filer_buckets,
+        )
+
+    def partition_model(self, model):
+        """
+        Export and archive the partitions of a model.
+
+        The rows are copied once into a temporary table along with their
+        partition, which is then indexed so each partition can be exported
+        without scanning the whole model again.
+        """
+        file_name = model._meta.object_name
+        filing_model, join, alias = self.get_filing_source(model)
+        if not filing_model:
+            self.warn(' Skipping %s, which has no filer' % file_name)
+            return
+
+        if self.verbosity > 2:
+            self.log(" Partitioning %s" % file_name)
+
+        try:
+            processed_file = self.version.files.get(file_name=file_name)
+        except ProcessedDataFile.DoesNotExist:
+            processed_file = self.version.files.create(
+                file_name=file_name,
+                records_count=model.objects.count(),
+            )
+
+        # clear out the previous partitions
+        for partition in processed_file.partitions.all():
+            partition.file_archive.delete(save=False)
+            partition.delete()
+
+        cycle_sql = self.get_cycle_sql(filing_model, alias) if self.by_cycle else 'NULL::integer'
+        bucket_sql = self.get_filer_bucket_sql(alias) if self.by_filer else 'NULL::integer'
+        columns = ', '.join('t."%s"' % f.column for f in model._meta.concrete_fields)
+
+        with connection.cursor() as c:
+            c.execute('DROP TABLE IF EXISTS pg_temp.partitioned_rows;')
+            c.execute(
+                """
+                CREATE TEMPORARY TABLE partitioned_rows AS
+                SELECT {cycle} AS partition_cycle, {bucket} AS partition_bucket, {columns}
+                FROM "{table}" AS t {join};
+                """.format(
+                    cycle=cycle_sql,
+                    bucket=bucket_sql,
+                    columns=columns,
+                    table=model._meta.db_table,
+                    join=join,
+                )
+            )
+            c.execute(
+                'CREATE INDEX ON partitioned_rows (partition_cycle, partition_bucket);'
+            )
+            c.execute('ANALYZE partitioned_rows;')
+            c.execute(
+                """
+                SELECT partition_cycle, partition_bucket, COUNT(*)
+                FROM partitioned_rows
+                GROUP BY 1, 2
+                ORDER BY 1, 2;
+                """
+            )
+            partition_counts = c.fetchall()
+
+            try:
+                for cycle, bucket, count in partition_counts:
+                    self.archive_partition(c, model, processed_file, cycle, bucket, count)
+            finally:
+                c.execute('DROP TABLE IF EXISTS pg_temp.partitioned_rows;')
+
+        if self.verbosity > 2:
+            self.log(" %s partitions archived" % len(partition_counts))
+
+    def archive_partition(self, cursor, model, processed_file, cycle, bucket, count):
+        """
+        Export and archive one partition of a model.
+        """
+        name_parts = [processed_file.file_name]
+        if self.by_cycle:
+            name_parts.append('cycle-%s' % (cycle or 'unknown'))
+        if self.by_filer:
+            name_parts.append('filer-%02d' % bucket if bucket is not None else 'filer-unknown')
+        archive_name = '%s.csv' % '_'.join(name_parts)
+        if self.gzip:
+            archive_name += '.gz'
+
+        conditions = []
+        for column, value in (('partition_cycle', cycle), ('partition_bucket', bucket)):
+            if value is None:
+                conditions.append('%s IS NULL' % column)
+            else:
+                conditions.append('%s = %d' % (column, value))
+        sql = 'COPY (SELECT {columns} FROM partitioned_rows WHERE {conditions}) TO STDOUT CSV HEADER;'.format(
+            columns=', '.join('"%s"' % f.column for f in model._meta.concrete_fields),
+            conditions=' AND '.join(conditions),
+        )
+
+        partition = processed_file.partitions.create(
+            election_cycle=cycle,
+            filer_bucket=bucket,
+            records_count=count,
+        )
+        hasher = hashlib.sha256()
+        partition.file_size = copy_to_field_file(
+            cursor,
+            sql,
+            partition.file_archive,
+            archive_name,
+            compress=self.gzip,
+            hasher=hasher,
+        )
+        partition.sha256 = hasher.hexdigest()
+        partition.save()
+
+    def archive_manifest(self):
+        """
+        Archive a JSON manifest of every partition of the version's files.
+        """
+        manifest = {
+            'release_datetime': self.version.raw_version.release_datetime.isoformat(),
+            'filer_buckets': self.filer_buckets if self.by_filer else None,
+            'filer_bucket_sql': self.get_filer_bucket_sql('t') if self.by_filer else None,
+            'files': {},
+        }
+        for processed_file in self.version.files.filter(partitions__isnull=False).distinct():
+            manifest['files'][processed_file.file_name] = [
+                {
+                    'election_cycle': p.election_cycle,
+                    'filer_bucket': p.filer_bucket,
+                    'records_count': p.records_count,
+                    'size': p.file_size,
+                    'sha256': p.sha256,
+                    'path': p.file_archive.name,
+                } for p in processed_file.partitions.all()
+            ]
+
+        self.version.partition_manifest.delete(save=False)
+        self.version.partition_manifest.save(
+            'partitions.json',
+            ContentFile(json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')),
+        )
+        if self.verbosity > 2:
+            self.log(" Manifest archived")
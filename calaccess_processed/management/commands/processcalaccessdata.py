@@ -4,12 +4,30 @@
 Load data into processed CAL-ACCESS models, archive processed files and ZIP.
 """
 import os
+import gzip
 from django.conf import settings
 from django.core.management import call_command
-from django.core.files import File
 from django.utils.timezone import now
+from hurry.filesize import size as sizeformat
 from calaccess_processed.management.commands import CalAccessCommand
-from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+from calaccess_processed.management.commands.archivecalaccessprocessedfile import write_to_field_file
+from calaccess_processed.zipstream import COMPRESSION_BY_NAME, ZipStreamWriter
+
+
+class GzipArchiveFile(gzip.GzipFile):
+    """
+    A GzipFile that also closes the file object it decompresses.
+    """
+    def close(self):
+        """
+        Close the GzipFile and the underlying file object.
+        """
+        fileobj = self.fileobj
+        try:
+            super(GzipArchiveFile, self).close()
+        finally:
+            if fileobj is not None:
+                fileobj.close()
 
 
 class Command(CalAccessCommand):
@@ -37,6 +55,111 @@ class Command(CalAccessCommand):
             default=True,
             help="Skip scraping."
         )
+        parser.add_argument(
+            "--no-raw-indexes",
+            action="store_false",
+            dest="raw_indexes",
+            default=True,
+            help="Skip indexing the raw data tables before loading."
+        )
+        parser.add_argument(
+            "--drop-raw-indexes",
+            action="store_true",
+            dest="drop_raw_indexes",
+            default=False,
+            help="Drop the raw data table indexes after loading."
+        )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            type=int,
+            dest="workers",
+            default=1,
+            help="Number of processed models to load at once (default: 1)."
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            dest="incremental",
+            default=False,
+            help="Only re-load filings added, amended or removed since the "
+                 "previous processed version."
+        )
+        parser.add_argument(
+            "--swap",
+            action="store_true",
+            dest="swap",
+            default=False,
+            help="Load each processed model into a shadow table and swap it "
+                 "in when done."
+        )
+        parser.add_argument(
+            "--index-workers",
+            action="store",
+            type=int,
+            dest="index_workers",
+            default=1,
+            help="Number of indexes and constraints to build at once (default: 1)."
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            dest="defer_indexes",
+            default=False,
+            help="Build the indexes and constraints of the processed models "
+                 "together, after the models are loaded."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            action="store",
+            type=int,
+            dest="chunk_size",
+            default=None,
+            help="Load processed models this many filing_ids at a time."
+        )
+        parser.add_argument(
+            "--archive-workers",
+            action="store",
+            type=int,
+            dest="archive_workers",
+            default=1,
+            help="Number of processed files to archive at once (default: 1)."
+        )
+        parser.add_argument(
+            "--views",
+            action="store_true",
+            dest="views",
+            default=False,
+            help="Back the latest-version item and summary models with "
+                 "materialized views. Run convertcalaccessprocessedviews "
+                 "before migrate, which can't alter them."
+        )
+        parser.add_argument(
+            "--partition",
+            action="store_true",
+            dest="partition",
+            default=getattr(settings, 'CALACCESS_PARTITION_ARCHIVE', False),
+            help="Also archive the filing models partitioned by election cycle "
+                 "and filer."
+        )
+        parser.add_argument(
+            "--zip-workers",
+            action="store",
+            type=int,
+            dest="zip_workers",
+            default=1,
+            help="Number of processed files to compress into the zip at once "
+                 "(default: 1)."
+        )
+        parser.add_argument(
+            "--zip-compression",
+            action="store",
+            dest="zip_compression",
+            choices=sorted(COMPRESSION_BY_NAME.keys()),
+            default=getattr(settings, 'CALACCESS_ZIP_COMPRESSION', 'deflate'),
+            help="Compression method for the files in the zip (default: deflate). "
+                 "zstd requires the zstandard package."
+        )
 
     def handle(self, *args, **options):
         """
@@ -46,6 +169,19 @@ class Command(CalAccessCommand):
 
         self.force_restart = options.get("restart")
         self.scrape = options.get("scrape")
+        self.raw_indexes = options.get("raw_indexes")
+        self.drop_raw_indexes = options.get("drop_raw_indexes")
+        self.workers = options.get("workers")
+        self.incremental = options.get("incremental")
+        self.swap = options.get("swap")
+        self.index_workers = options.get("index_workers")
+        self.defer_indexes = options.get("defer_indexes")
+        self.chunk_size = options.get("chunk_size")
+        self.views = options.get("views")
+        self.archive_workers = options.get("archive_workers")
+        self.partition = options.get("partition")
+        self.zip_workers = options.get("zip_workers")
+        self.zip_compression = options.get("zip_compression")
 
         self.processed_version, created = self.get_or_create_processed_version()
 
@@ -68,10 +204,18 @@ class Command(CalAccessCommand):
                 )
             ):
                 self.scrape_all()
+            # index the raw data tables for the loading queries
+            if self.raw_indexes:
+                self.index_raw_data()
             # then load
             self.load()
+            if self.drop_raw_indexes:
+                self.index_raw_data(drop=True)
             # zip only if django project setting enabled
             if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
+                # partition if enabled
+                if self.partition:
+                    self.partition_files()
                 # then zip
                 self.zip()
 
@@ -103,6 +247,19 @@ class Command(CalAccessCommand):
             force_flush=True,
         )
 
+    def index_raw_data(self, drop=False):
+        """
+        Create (or drop) the raw data table indexes used by the processed models.
+        """
+        call_command(
+            'indexcalaccessrawdata',
+            verbosity=self.verbosity,
+            no_color=self.no_color,
+            drop=drop,
+            workers=self.index_workers,
+        )
+        self.duration()
+
     def load(self):
         """
         Load all of the processed models.
@@ -111,7 +268,15 @@ class Command(CalAccessCommand):
             'loadcalaccessfilingmodels',
             verbosity=self.verbosity,
             no_color=self.no_color,
-            force_restart=self.force_restart
+            force_restart=self.force_restart,
+            workers=self.workers,
+            incremental=self.incremental,
+            swap=self.swap,
+            index_workers=self.index_workers,
+            defer_indexes=self.defer_indexes,
+            chunk_size=self.chunk_size,
+            views=self.views,
+            archive_workers=self.archive_workers,
         )
         self.duration()
 
@@ -119,49 +284,92 @@ class Command(CalAccessCommand):
             'loadocdmodels',
             verbosity=self.verbosity,
             no_color=self.no_color,
+            archive_workers=self.archive_workers,
+        )
+        self.duration()
+
+    def partition_files(self):
+        """
+        Archive the filing models partitioned by election cycle and filer.
+        """
+        call_command(
+            'partitioncalaccessprocessedfiles',
+            verbosity=self.verbosity,
+            no_color=self.no_color,
         )
         self.duration()
 
     def zip(self):
         """
         Zip up all processed data files and archive the zip.
+
+        Each archived file is read from storage, compressed and written into
+        the zip as it's saved to storage, so none of them (nor the zip) has
+        to fit on local disk.
         """
         if self.verbosity:
             self.header("Zipping processed files")
         # Remove previous zip file
         self.processed_version.zip_archive.delete()
-        zip_path = os.path.join(self.data_dir, 'processed.zip')
 
-        # enable zipfile compression
-        compression = ZIP_DEFLATED
+        members = [
+            (self.get_zip_member_name(f.file_archive), self.get_archive_opener(f.file_archive))
+            for f in self.processed_version.files.exclude(file_archive='')
+        ]
+
+        def write(fileobj):
+            with ZipStreamWriter(
+                fileobj,
+                compression=COMPRESSION_BY_NAME[self.zip_compression],
+                workers=self.zip_workers,
+            ) as zf:
+                zf.write_members(members, on_written=self.log_zip_member)
 
-        try:
-            zf = ZipFile(zip_path, 'w', compression, allowZip64=True)
-        except RuntimeError:
-            self.error('Zip file cannot be compressed (check zlib module).')
-            compression = ZIP_STORED
-            zf = ZipFile(zip_path, 'w', compression, allowZip64=True)
-
-        # loop over and save files in csv dir
-        for f in os.listdir(self.processed_data_dir):
-            if self.verbosity > 2:
-                self.log(" Adding %s to zip" % f)
-            csv_path = os.path.join(self.processed_data_dir, f)
-            zf.write(csv_path, f)
-
-        # close the zip file
-        zf.close()
         if self.verbosity > 2:
-            self.log(" All files zipped")
-
-        # save the zip size
-        self.processed_version.zip_size = os.path.getsize(zip_path)
-        with open(zip_path, 'rb') as zf:
-            # Save the zip on the processed data version
-            if self.verbosity > 2:
-                self.log(" Archiving zip")
-            self.processed_version.zip_archive.save(
-                os.path.basename(zip_path), File(zf)
+            self.log(
+                " Zipping and archiving %s files with %s workers" % (
+                    len(members),
+                    self.zip_workers,
+                )
             )
+        self.processed_version.zip_size = write_to_field_file(
+            write,
+            self.processed_version.zip_archive,
+            'processed.zip',
+        )
+        self.processed_version.save()
         if self.verbosity > 2:
             self.log(" Zip archived.")
+
+    def get_zip_member_name(self, archive_file):
+        """
+        Return the name of the archived file inside the zip, minus any .gz extension.
+        """
+        name = os.path.basename(archive_file.name)
+        if name.endswith('.gz'):
+            name = name[:-len('.gz')]
+        return name
+
+    def get_archive_opener(self, archive_file):
+        """
+        Return a function that opens the archived file, decompressing it if gzipped.
+        """
+        def open_archive():
+            archive = archive_file.storage.open(archive_file.name, 'rb')
+            if archive_file.name.endswith('.gz'):
+                return GzipArchiveFile(fileobj=archive, mode='rb')
+            return archive
+        return open_archive
+
+    def log_zip_member(self, name, file_size, compress_size):
+        """
+        Log each file added to the zip.
+        """
+        if self.verbosity > 2:
+            self.log(
+                " Added %s to zip (%s compressed to %s)" % (
+                    name,
+                    sizeformat(file_size),
+                    sizeformat(compress_size),
+                )
+            )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Report on the scraper's cache of pages and prune old pages from it.
+"""
+from datetime import datetime
+from django.conf import settings
+from hurry.filesize import size as sizeformat
+from calaccess_processed.management.commands import CalAccessCommand, ScrapeCommand
+from calaccess_processed.scraper.cache import CACHE_BACKENDS, get_cache
+
+
+class Command(CalAccessCommand):
+    """
+    Report on the scraper's cache of pages and prune old pages from it.
+    """
+    help = "Report on the scraper's cache of pages and prune old pages from it."
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--cache-backend',
+            action='store',
+            dest='cache_backend',
+            choices=sorted(CACHE_BACKENDS),
+            default=getattr(settings, 'CALACCESS_SCRAPER_CACHE_BACKEND', 'files'),
+            help='Backend the cached pages are stored with (default: files).',
+        )
+        parser.add_argument(
+            '--max-age',
+            action='store',
+            type=float,
+            dest='max_age',
+            default=None,
+            help='Prune pages fetched more than this many days ago.',
+        )
+        parser.add_argument(
+            '--max-size',
+            action='store',
+            type=float,
+            dest='max_size',
+            default=None,
+            help='Prune the oldest pages until the cache takes up no more than '
+                 'this many megabytes.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        max_age = options['max_age']
+        max_size = options['max_size']
+
+        cache = get_cache(options['cache_backend'], ScrapeCommand.cache_dir)
+        try:
+            self.header('Scraper cache in %s' % ScrapeCommand.cache_dir)
+            self.log_stats(cache)
+
+            if max_age is None and max_size is None:
+                return
+
+            pages, size = cache.prune(
+                max_age=max_age * 86400 if max_age is not None else None,
+                max_size=int(max_size * 1024 * 1024) if max_size is not None else None,
+            )
+            self.log('Pruned %s pages (%s)' % (pages, sizeformat(size)))
+            self.log_stats(cache)
+        finally:
+            cache.close()
+
+        self.success("Done!")
+
+    def log_stats(self, cache):
+        """
+        Log the number and size of the cached pages, and when they were fetched.
+        """
+        stats = cache.get_stats()
+        self.log(' %s pages (%s)' % (stats['pages'], sizeformat(stats['size'])))
+        if stats['pages']:
+            self.log(
+                ' Fetched from {:%m-%d-%Y %H:%M:%S} to {:%m-%d-%Y %H:%M:%S}'.format(
+                    datetime.fromtimestamp(stats['oldest'] or 0),
+                    datetime.fromtimestamp(stats['newest'] or 0),
+                )
+            )
@@ -4,9 +4,13 @@
 Scrape each certified candidate's committees from the CAL-ACCESS site.
 """
 import re
-from time import sleep
+from bs4 import SoupStrainer
+from six.moves.urllib.parse import urljoin
+from django.conf import settings
+from django.db import transaction
 from calaccess_processed.management.commands import ScrapeCommand
 from calaccess_processed.models import (
+    CandidateScrapedElection,
     ScrapedCandidate,
     ScrapedCandidateCommittee,
 )
@@ -18,6 +22,37 @@ class Command(ScrapeCommand):
     """
     help = "Scrape each candidate's committees from the CAL-ACCESS site."
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            dest='incremental',
+            default=getattr(settings, 'CALACCESS_SCRAPER_INCREMENTAL', False),
+            help='Only scrape candidates in new or recent elections, or in elections '
+                 'whose page changed since the candidate was last scraped.',
+        )
+        parser.add_argument(
+            '--recent-elections',
+            action='store',
+            type=int,
+            dest='recent_elections',
+            default=getattr(settings, 'CALACCESS_SCRAPER_RECENT_ELECTIONS', 4),
+            help='Number of the latest elections whose candidates are always '
+                 'scraped in incremental mode (default: 4).',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        self.incremental = options['incremental']
+        self.recent_elections = options['recent_elections']
+        super(Command, self).handle(*args, **options)
+
     def flush(self):
         """
         Delete records form related database tables.
@@ -30,28 +65,74 @@ class Command(ScrapeCommand):
         """
         self.header("Scraping candidate committees")
 
-        # Set of unique scraped candidate ids
-        candidate_ids = set(ScrapedCandidate.objects.values_list(
-            'scraped_id', flat=True))
+        if self.incremental:
+            candidate_ids = self.get_updated_candidate_ids()
+        else:
+            # Set of unique scraped candidate ids
+            candidate_ids = set(ScrapedCandidate.objects.values_list(
+                'scraped_id', flat=True))
+
+        for result in self.imap(self.scrape_candidate, candidate_ids):
+            yield result
+
+    def get_updated_candidate_ids(self):
+        """
+        Return the set of scraped candidate ids whose committees may have changed.
+
+        Those are the candidates in the latest self.recent_elections elections,
+        candidates whose page was never cached and candidates in an election
+        whose page changed since their own page was last fetched, according
+        to the scraper cache's index.
+        """
+        recent_election_ids = set(
+            CandidateScrapedElection.objects.order_by('-sort_index').values_list(
+                'id',
+                flat=True,
+            )[:self.recent_elections]
+        )
+        all_ids = set()
+        candidate_ids = set()
+        candidates = ScrapedCandidate.objects.values_list('scraped_id', 'election_id', 'election__url')
+        for candidate_id, election_id, election_url in candidates:
+            all_ids.add(candidate_id)
+            if candidate_id in candidate_ids:
+                continue
+            if election_id in recent_election_ids:
+                candidate_ids.add(candidate_id)
+                continue
+            url = self.get_candidate_url(candidate_id)
+            fetched = self.cache.get_metadata(url).get('fetched')
+            election_changed = self.cache.get_changed(election_url)
+            if not fetched or not self.cache.exists(url) or not election_changed or election_changed > fetched:
+                candidate_ids.add(candidate_id)
 
-        results = []
+        self.log('Scraping %s of %s candidates.' % (len(candidate_ids), len(all_ids)))
+        return candidate_ids
 
-        for candidate_id in candidate_ids:
-            url = '/Campaign/Candidates/Detail.aspx?id={}'.format(
-                candidate_id)
-            data = {}
-            data['candidate_id'] = candidate_id
-            data['committees'] = self.scrape_candidate_page(url)
-            results.append(data)
-            sleep(0.5)
+    def get_candidate_url(self, candidate_id):
+        """
+        Return the full URL of a candidate's page, which it's cached under.
+        """
+        return urljoin(
+            self.base_url,
+            '/Campaign/Candidates/Detail.aspx?id={}'.format(candidate_id),
+        )
 
-        return results
+    def scrape_candidate(self, candidate_id):
+        """
+        Return a dict with the candidate id and the committees on the candidate's page.
+        """
+        return {
+            'candidate_id': candidate_id,
+            'committees': self.scrape_candidate_page(self.get_candidate_url(candidate_id)),
+        }
 
     def scrape_candidate_page(self, url):
         """
         Pull the committees from a CAL-ACCESS candidate page.
         """
-        soup = self.get_html(url)
+        # Committees are in tables
+        soup = self.get_html(url, parse_only=SoupStrainer('table'))
 
         committees = []
 
@@ -82,15 +163,14 @@ class Command(ScrapeCommand):
         """
         Save results of scrape to related database tables.
         """
-        self.log('Processing %s committees.' % len(results))
+        self.log("Processing %s candidates' committees." % len(results))
 
+        rows = []
         for result in results:
             for committee_data in result['committees']:
                 # Add the candidate id to the committee data
                 committee_data['candidate_id'] = result['candidate_id']
-                committee_obj, c = ScrapedCandidateCommittee.objects \
-                    .get_or_create(
-                        **committee_data
-                    )
-                if c and self.verbosity > 2:
-                    self.log('Created %s' % committee_obj)
+                rows.append(committee_data)
+
+        with transaction.atomic():
+            self.bulk_update_or_create(ScrapedCandidateCommittee, rows)
@@ -4,8 +4,10 @@
 Scrape list of certified candidates from the CAL-ACCESS site.
 """
 import re
+from bs4 import SoupStrainer
+from six.moves import zip
 from six.moves.urllib.parse import urljoin
-from time import sleep
+from django.db import transaction
 from calaccess_processed.management.commands import ScrapeCommand
 from calaccess_processed.models import (
     ScrapedCandidate,
@@ -46,12 +48,12 @@ class Command(ScrapeCommand):
             if l.find_next_sibling('span').text != 'Prior Elections'
         ]
 
+        # Get each page and its data
+        urls = [urljoin(self.base_url, link["href"]) for link in links]
+        pages = self.imap(self.scrape_election_page, urls)
+
         # Loop through the links
-        results = {}
-        for i, link in enumerate(links):
-            # Get each page and its data
-            url = urljoin(self.base_url, link["href"])
-            data = self.scrape_election_page(url)
+        for i, (link, url, data) in enumerate(zip(links, urls, pages)):
             # Add the name of the election
             data['name'] = link.find_next_sibling('span').text.strip()
             # The index value is used to preserve sorting of elections,
@@ -60,68 +62,62 @@ class Command(ScrapeCommand):
             # but the top most election is the most recent so it should
             # have the highest id.
             data['sort_index'] = len(links) - i
-            # Add it to the list
-            results[url] = data
-            # Take a rest
-            sleep(0.5)
-
-        return results
+            # Pass it out
+            yield url, data
 
     def scrape_election_page(self, url):
         """
         Pull the elections and candidates from a CAL-ACCESS page.
         """
-        # Go and get the page
-        soup = self.get_html(url)
+        # Go and get the page, with just the section and office titles and the candidates.
+        # They're walked in the order they appear, rather than looked up in
+        # the tables that hold them, since the page's unclosed <a name="...">
+        # section anchors end up around those tables with some parsers and
+        # not others.
+        element_attrs = {'class': ['hdr14', 'hdr13', 'sublink2', 'txt7']}
+        soup = self.get_html(url, parse_only=SoupStrainer(['span', 'a'], element_attrs))
 
         races = {}
-        # Loop through all the election sets on the page
-        for section in soup.findAll('a', {'name': re.compile(r'[a-z]+')}):
-
-            # Check that this data matches the structure we expect.
-            section_name_el = section.find('span', {'class': 'hdr14'})
-
-            # If it doesn't, skip this one
-            if not section_name_el:
-                continue
-
-            # Loop through all the rows in the section table
-            for office in section.findAll('td'):
+        in_section = False
+        candidates = None
+        for el in soup.findAll(['span', 'a'], element_attrs):
+            classes = el.get('class') or []
 
-                # Check that this data matches the structure we expect.
-                title_el = office.find('span', {'class': 'hdr13'})
+            # Offices only count within a section with a title
+            if el.name == 'span' and 'hdr14' in classes:
+                in_section = True
+                candidates = None
 
-                # If it doesn't, skip
-                if not title_el:
-                    continue
-
-                office_name = title_el.text
+            elif el.name == 'span' and 'hdr13' in classes and in_section:
+                office_name = el.text
 
                 # Log what we're up to
                 if self.verbosity > 2:
                     self.log('Scraping office %s' % office_name)
 
-                # Pull the candidates out
-                candidates = []
-                for c in office.findAll('a', {'class': 'sublink2'}):
-                    candidates.append({
-                        'name': c.text,
-                        'scraped_id': re.match(
-                            r'.+id=(\d+)',
-                            c['href']
-                        ).group(1),
-                        'url': urljoin(self.base_url, url),
-                    })
-
-                for c in office.findAll('span', {'class': 'txt7'}):
-                    candidates.append({
-                        'name': c.text,
-                        'scraped_id': '',
-                        'url': urljoin(self.base_url, url),
-                    })
-
-                # Add it to the data dictionary
-                races[office_name] = candidates
+                # Add it to the data dictionary, and the candidates that follow to it
+                candidates = races[office_name] = []
+
+            # Pull the candidates out
+            elif candidates is None:
+                continue
+
+            elif el.name == 'a' and 'sublink2' in classes:
+                candidates.append({
+                    'name': el.text,
+                    'scraped_id': re.match(
+                        r'.+id=(\d+)',
+                        el['href']
+                    ).group(1),
+                    'url': urljoin(self.base_url, url),
+                })
+
+            elif el.name == 'span' and 'txt7' in classes:
+                candidates.append({
+                    'name': el.text,
+                    'scraped_id': '',
+                    'url': urljoin(self.base_url, url),
+                })
 
         return {
             'scraped_id': int(re.match(r'.+electNav=(\d+)', url).group(1)),
@@ -135,34 +131,39 @@ class Command(ScrapeCommand):
         """
         self.log('Processing %s elections.' % len(results))
 
-        # Loop through all the results
-        for url, election_data in results.items():
-
-            self.log('Processing %s' % election_data['name'])
-            election_obj, c = CandidateScrapedElection.objects.get_or_create(
-                name=election_data['name'].strip(),
-                scraped_id=election_data['scraped_id'],
-                sort_index=election_data['sort_index'],
-                url=url,
+        with transaction.atomic():
+            election_objs = self.bulk_update_or_create(
+                CandidateScrapedElection,
+                [
+                    dict(
+                        name=election_data['name'].strip(),
+                        scraped_id=election_data['scraped_id'],
+                        sort_index=election_data['sort_index'],
+                        url=url,
+                    ) for url, election_data in results
+                ]
             )
 
-            if c and self.verbosity > 2:
-                self.log('Created %s' % election_obj)
-
-            # Loop through each of the races
-            for office_name, candidates in election_data['races'].items():
-
-                # Loop through each of the candidates
-                for candidate_data in candidates:
-
-                    # Create the candidate object
-                    candidate_obj, c = ScrapedCandidate.objects.get_or_create(
-                        name=candidate_data['name'].strip(),
-                        scraped_id=candidate_data['scraped_id'],
-                        office_name=office_name.strip(),
-                        url=candidate_data['url'],
-                        election=election_obj,
-                    )
-
-                    if c and self.verbosity > 2:
-                        self.log('Created %s' % candidate_obj)
+            # Loop through all the results
+            candidate_rows = []
+            for (url, election_data), election_obj in zip(results, election_objs):
+
+                self.log('Processing %s' % election_data['name'])
+
+                # Loop through each of the races
+                for office_name, candidates in election_data['races'].items():
+
+                    # Loop through each of the candidates
+                    for candidate_data in candidates:
+                        candidate_rows.append(
+                            dict(
+                                name=candidate_data['name'].strip(),
+                                scraped_id=candidate_data['scraped_id'],
+                                office_name=office_name.strip(),
+                                url=candidate_data['url'],
+                                election=election_obj,
+                            )
+                        )
+
+            # Create the candidate objects
+            self.bulk_update_or_create(ScrapedCandidate, candidate_rows)
@@ -4,9 +4,11 @@
 Scrape list of incumbent state officials for each election on CAL-ACCESS site.
 """
 import re
+from bs4 import SoupStrainer
+from six.moves import zip
 from six.moves.urllib.parse import urljoin
 from datetime import datetime
-from time import sleep
+from django.db import transaction
 from calaccess_processed.management.commands import ScrapeCommand
 from calaccess_processed.models import (
     ScrapedIncumbent,
@@ -38,7 +40,8 @@ class Command(ScrapeCommand):
         self.header("Scraping incumbent state officials")
 
         soup = self.get_html(
-            '/Campaign/Candidates/list.aspx?view=incumbent'
+            '/Campaign/Candidates/list.aspx?view=incumbent',
+            parse_only=SoupStrainer('a', href=self.cycle_link_pattern),
         )
 
         # build a list of cycle urls
@@ -49,35 +52,34 @@ class Command(ScrapeCommand):
             )
         ]
 
-        # Loop through the cycle urls
-        results = {}
-        for link in cycle_links:
+        # Loop through the cycle urls, a batch at a time
+        batch = list(cycle_links)
+        while batch:
             # Get each page and its data
-            url = urljoin(self.base_url, link)
-            data = self.scrape_election_page(link)
-
-            # add any new cycle links we found
-            for l in data['cycle_links']:
-                if l not in cycle_links:
-                    cycle_links.append(l)
-
-            # Add the session
-            data['session'] = int(
-                re.search(self.cycle_link_pattern, link).groupdict()['yr']
-            )
-            # Add it to the results dict
-            results[url] = data
-            # Take a rest
-            sleep(0.5)
-
-        return results
+            pages = self.imap(self.scrape_election_page, batch)
+
+            new_links = []
+            for link, data in zip(batch, pages):
+                # add any new cycle links we found
+                for l in data['cycle_links']:
+                    if l not in cycle_links:
+                        cycle_links.append(l)
+                        new_links.append(l)
+
+                # Add the session
+                data['session'] = int(
+                    re.search(self.cycle_link_pattern, link).groupdict()['yr']
+                )
+                # Pass it out
+                yield urljoin(self.base_url, link), data
+            batch = new_links
 
     def scrape_election_page(self, url):
         """
         Pull the elections and incumbents from a CAL-ACCESS page.
         """
-        # Go and get the page
-        soup = self.get_html(url)
+        # Go and get the page, with just the links, elections and offices
+        soup = self.get_html(url, parse_only=SoupStrainer(['a', 'span', 'table']))
 
         data = {
             'cycle_links': [],
@@ -145,28 +147,21 @@ class Command(ScrapeCommand):
         """
         self.log('Processing %s elections.' % len(results))
 
+        election_rows = []
+        incumbent_rows = []
         # Loop through all the results
-        for url, data in results.items():
+        for url, data in results:
 
             self.log('Processing %s session elections' % data['session'])
 
             # Loop through each election
             for election in data['elections']:
-                # Create the election object
-                election_obj, created = IncumbentScrapedElection.objects.get_or_create(
-                    session=data['session'],
-                    url=url,
-                    **election
-                )
-                if created and self.verbosity > 2:
-                    self.log('Created %s' % election_obj)
+                election_rows.append(dict(session=data['session'], url=url, **election))
 
             # Loop through each incumbent
             for incumbent in data['incumbents']:
-                # Create the incumbent object
-                incumbent_obj, created = ScrapedIncumbent.objects.get_or_create(
-                    session=data['session'],
-                    **incumbent
-                )
-                if created and self.verbosity > 2:
-                    self.log('Created %s' % incumbent_obj)
+                incumbent_rows.append(dict(session=data['session'], **incumbent))
+
+        with transaction.atomic():
+            self.bulk_update_or_create(IncumbentScrapedElection, election_rows)
+            self.bulk_update_or_create(ScrapedIncumbent, incumbent_rows)
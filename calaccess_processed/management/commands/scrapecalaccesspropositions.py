@@ -4,8 +4,9 @@
 Scrape links between filers and propositions from the CAL-ACCESS site.
 """
 import re
-from time import sleep
+from bs4 import SoupStrainer
 from six.moves.urllib.parse import urljoin
+from django.db import transaction
 from calaccess_processed.management.commands import ScrapeCommand
 from calaccess_processed.models import (
     PropositionScrapedElection,
@@ -37,32 +38,34 @@ class Command(ScrapeCommand):
 
         # Build the link list from the 2013 page because otherwise the
         # other years are hidden under the "Historical" link.
-        soup = self.get_html('Campaign/Measures/list.aspx?session=2013')
+        session_link_pattern = re.compile(r'^.*\?session=\d+')
+        soup = self.get_html(
+            'Campaign/Measures/list.aspx?session=2013',
+            parse_only=SoupStrainer('a', href=session_link_pattern),
+        )
 
         # Filter links for uniqueness.
-        links = soup.findAll('a', href=re.compile(r'^.*\?session=\d+'))
+        links = soup.findAll('a', href=session_link_pattern)
         links = list(set([link['href'] for link in links]))
 
-        results = {}
+        # Pass out each year page as it's scraped
         for link in links:
-            results[urljoin(self.base_url, link)] = self.scrape_year_page(link)
-
-        # Pass it out
-        return results
+            yield urljoin(self.base_url, link), self.scrape_year_page(link)
 
     def scrape_year_page(self, url):
         """
         Scrape data page with list of props in a particular election year.
         """
-        # Get the URL of the year page
-        soup = self.get_html(url)
+        # Get the URL of the year page, and just the tables of elections
+        election_table_attrs = {'id': re.compile(r'ListElections1__[a-z0-9]+')}
+        soup = self.get_html(
+            url,
+            parse_only=SoupStrainer('table', election_table_attrs),
+        )
 
         # Loop through all the tables on the page
-        data_dict = {}
-        table_list = soup.findAll(
-            'table',
-            {'id': re.compile(r'ListElections1__[a-z0-9]+')}
-        )
+        elections = []
+        table_list = soup.findAll('table', election_table_attrs)
         for table in table_list:
 
             # Pull the title
@@ -80,17 +83,23 @@ class Command(ScrapeCommand):
                 )
                 self.log(msg)
 
-            # Scrape them one by one
-            prop_list = [
-                self.scrape_prop_page('/Campaign/Measures/%s' % link['href'])
+            elections.append((election_name, prop_links))
+
+        # Scrape the propositions of every election on the page at once
+        prop_pages = self.map(
+            self.scrape_prop_page,
+            [
+                '/Campaign/Measures/%s' % link['href']
+                for election_name, prop_links in elections
                 for link in prop_links
             ]
+        )
 
-            # Add the data to our data dict
-            data_dict[election_name] = prop_list
-
-        # Take a rest
-        sleep(0.5)
+        # Add the data to our data dict
+        data_dict = {}
+        for election_name, prop_links in elections:
+            data_dict[election_name] = prop_pages[:len(prop_links)]
+            prop_pages = prop_pages[len(prop_links):]
 
         # Pass the data back out
         return data_dict
@@ -99,8 +108,8 @@ class Command(ScrapeCommand):
         """
         Scrape data from a proposition detail page.
         """
-        # Pull the page
-        soup = self.get_html(url)
+        # Pull the page, with just the name and the tables of committees
+        soup = self.get_html(url, parse_only=SoupStrainer(['span', 'table']))
 
         # Create a data dictionary to put the good stuff in
         data_dict = {'url': urljoin(self.base_url, url)}
@@ -146,9 +155,6 @@ class Command(ScrapeCommand):
             )
             self.log(msg)
 
-        # Take a rest
-        sleep(0.5)
-
         # Pass the data out
         return data_dict
 
@@ -156,41 +162,50 @@ class Command(ScrapeCommand):
         """
         Save results of scrape to related database tables.
         """
-        # For each year page
-        for url, d in results.items():
-            # For each election on that page
-            for election_name, prop_list in d.items():
-                # Get or create election object
-                election_obj, c = PropositionScrapedElection.objects \
-                    .get_or_create(
-                        name=election_name.strip(),
-                        url=url,
-                    )
-                # Loop through propositions
-                for prop_data in prop_list:
-                    # Get or create proposition object
-                    prop_obj, c = ScrapedProposition.objects.get_or_create(
+        # For each election on each year page
+        elections = [
+            (url, election_name, prop_list)
+            for url, d in results
+            for election_name, prop_list in d.items()
+        ]
+
+        with transaction.atomic():
+            # Get or create election objects
+            election_objs = self.bulk_update_or_create(
+                PropositionScrapedElection,
+                [dict(name=election_name.strip(), url=url) for url, election_name, prop_list in elections]
+            )
+
+            # Get or create proposition objects
+            props = [
+                (prop_data, election_obj)
+                for (url, election_name, prop_list), election_obj in zip(elections, election_objs)
+                for prop_data in prop_list
+            ]
+            prop_objs = self.bulk_update_or_create(
+                ScrapedProposition,
+                [
+                    dict(
                         name=prop_data['name'].strip(),
                         scraped_id=prop_data['id'],
                         url=prop_data['url'],
-                        election=election_obj
+                        election=election_obj,
+                    ) for prop_data, election_obj in props
+                ]
+            )
+
+            # Now get or create their committees
+            self.bulk_update_or_create(
+                ScrapedPropositionCommittee,
+                [
+                    dict(
+                        name=committee['name'].strip(),
+                        scraped_id=committee['id'],
+                        position=committee['position'],
+                        url=committee['url'],
+                        proposition=prop_obj,
                     )
-                    # Log it
-                    if c and self.verbosity > 2:
-                        self.log('Created %s' % prop_obj)
-
-                    # Now loop through the committees
-                    for committee in prop_data['committees']:
-                        # Get or create it
-                        committee_obj, c = ScrapedPropositionCommittee \
-                            .objects.get_or_create(
-                                name=committee['name'].strip(),
-                                scraped_id=committee['id'],
-                                position=committee['position'],
-                                url=committee['url'],
-                                proposition=prop_obj,
-                            )
-
-                        # Log it
-                        if c and self.verbosity > 2:
-                            self.log('Created %s' % committee_obj)
+                    for (prop_data, election_obj), prop_obj in zip(props, prop_objs)
+                    for committee in prop_data['committees']
+                ]
+            )
@@ -5,18 +5,148 @@ Custom managers for working with CAL-ACCESS processed data models.
 """
 from __future__ import unicode_literals
 import os
-from django.db import models, connection
+import re
+import hashlib
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+from django.apps import apps
+from django.db import models, connection, transaction
+
+
+def get_shadow_name(name):
+    """
+    Return the name of the shadow copy of a database table, index or constraint.
+
+    Kept within Postgres' 63 character limit on identifiers.
+    """
+    shadow_name = '%s_shadow' % name
+    if len(shadow_name) > 63:
+        digest = hashlib.md5(name.encode('utf-8')).hexdigest()[:8]
+        shadow_name = '%s_%s_shadow' % (name[:47], digest)
+    return shadow_name
+
+
+def get_temp_name(prefix, name):
+    """
+    Return the name of a temporary copy of a database table, starting with the prefix.
+
+    Kept within Postgres' 63 character limit on identifiers.
+    """
+    temp_name = '%s_%s' % (prefix, name)
+    if len(temp_name) > 63:
+        digest = hashlib.md5(name.encode('utf-8')).hexdigest()[:8]
+        temp_name = '%s_%s_%s' % (prefix, name[:53 - len(prefix)], digest)
+    return temp_name
+
+
+def get_index_name(table, columns):
+    """
+    Return the name of an index on the columns of a database table.
+
+    Kept within Postgres' 63 character limit on identifiers.
+    """
+    index_name = '%s_%s_idx' % (table.lower(), '_'.join(columns).lower())
+    if len(index_name) > 63:
+        digest = hashlib.md5(index_name.encode('utf-8')).hexdigest()[:8]
+        index_name = '%s_%s_idx' % (index_name[:50], digest)
+    return index_name
+
+
+def get_query_tables(sql):
+    """
+    Return set of database table names read by the sql.
+    """
+    # strip out comments, which tend to mention table names in passing
+    sql = re.sub(r'--.*$', '', sql, flags=re.MULTILINE)
+    return set(
+        t.strip('"') for t in re.findall(
+            r'\b(?:FROM|JOIN)\s+("?\w+"?)',
+            sql,
+            flags=re.IGNORECASE,
+        )
+    )
+
+
+def _execute_sql_on_own_connection(sql):
+    """
+    Execute the sql statement on the current thread's own database connection.
+    """
+    try:
+        with connection.cursor() as c:
+            c.execute(sql)
+    finally:
+        connection.close()
+
+
+def execute_sql(statements, workers=1):
+    """
+    Execute each of the sql statements, using up to `workers` database connections at once.
+    """
+    if workers > 1 and len(statements) > 1:
+        pool = ThreadPool(processes=min(workers, len(statements)))
+        try:
+            pool.map(_execute_sql_on_own_connection, statements, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        with connection.cursor() as c:
+            for sql in statements:
+                c.execute(sql)
+
+
+def execute_constraint_and_index_sql(statements, workers=1):
+    """
+    Execute sql statements that create constraints and indexes as a batch.
+
+    Indexes (and the unique and primary key constraints they back) are built
+    using up to `workers` database connections at once. Foreign key
+    constraints are then added as NOT VALID, which doesn't scan any rows, and
+    validated afterward, again using up to `workers` connections at once.
+    """
+    foreign_keys = [s for s in statements if ' FOREIGN KEY ' in s]
+    indexes = [s for s in statements if s not in foreign_keys]
+
+    execute_sql(indexes, workers=workers)
+
+    add_foreign_keys = []
+    validate_foreign_keys = []
+    for sql in foreign_keys:
+        match = re.match(
+            r'^\s*ALTER TABLE (\S+) ADD CONSTRAINT (\S+) FOREIGN KEY',
+            sql,
+            flags=re.IGNORECASE,
+        )
+        sql = re.sub(r'(\s+NOT VALID)?\s*;?\s*$', '', sql, flags=re.IGNORECASE)
+        add_foreign_keys.append(sql + ' NOT VALID;')
+        validate_foreign_keys.append(
+            'ALTER TABLE %s VALIDATE CONSTRAINT %s;' % match.groups()
+        )
+    # adding foreign keys locks both tables, so do it one at a time
+    execute_sql(add_foreign_keys)
+    execute_sql(validate_foreign_keys, workers=workers)
 
 
 class ProcessedDataManager(models.Manager):
     """
     Utilities for loading raw CAL-ACCESS data into processed data models.
     """
-    def add_constraints_and_indexes(self):
+    def add_constraints_and_indexes(self, workers=1):
         """
         Re-create constraints and indexes on the model and its fields.
+
+        Uses up to `workers` database connections at once.
         """
-        with connection.schema_editor() as schema_editor:
+        execute_constraint_and_index_sql(
+            self.get_constraint_and_index_sql(),
+            workers=workers,
+        )
+
+    def get_constraint_and_index_sql(self):
+        """
+        Return list of sql statements that re-create constraints and indexes on the model.
+        """
+        with connection.schema_editor(collect_sql=True) as schema_editor:
             schema_editor.alter_unique_together(
                 self.model,
                 (),
@@ -43,6 +173,8 @@ class ProcessedDataManager(models.Manager):
                     self.model, field_copy, field
                 )
 
+        return schema_editor.collected_sql
+
     def drop_constraints_and_indexes(self):
         """
         Temporarily drop constraints and indexes on the model and its fields.
@@ -74,12 +206,55 @@ class ProcessedDataManager(models.Manager):
                     self.model, field, field_copy
                 )
 
-    def load_raw_data(self):
+    def load_raw_data(self, filing_id_condition=None, swap=False,
+                      defer_indexes=False, index_workers=1,
+                      chunk_size=None, checkpoint=None, as_view=False,
+                      query_workers=1):
         """
         Load the model by executing its raw sql load query.
 
-        Temporarily drops any constraints or indexes on the model.
+        Temporarily drops any constraints or indexes on the model, then
+        re-creates them using up to index_workers database connections. If
+        defer_indexes is True, they are left for the caller to re-create.
+
+        If filing_id_condition is provided, only load rows for the filings
+        matching it, leaving the constraints and indexes in place. The
+        condition is a string of sql with a {column} placeholder for the
+        filing_id column, e.g. "{column} IN (SELECT filing_id FROM t)".
+
+        If swap is True, load into a shadow table and swap it in for the
+        model's table (see load_raw_data_with_swap).
+
+        If chunk_size is provided, load chunk_size filing_ids at a time (see
+        load_raw_data_in_chunks).
+
+        If the load query has more than one statement, up to query_workers
+        of them are executed at once, each on its own database connection.
+
+        If as_view is True and the model can be backed by a materialized view,
+        load it as one instead, ignoring the other options (see
+        load_raw_data_as_view).
         """
+        if as_view and self.can_load_as_view:
+            return self.load_raw_data_as_view()
+
+        if swap:
+            return self.load_raw_data_with_swap(index_workers=index_workers)
+
+        if filing_id_condition:
+            with self.filtered_source_tables(filing_id_condition):
+                with connection.cursor() as c:
+                    c.execute(self.raw_data_load_query)
+            return
+
+        if chunk_size:
+            return self.load_raw_data_in_chunks(
+                chunk_size,
+                checkpoint=checkpoint,
+                defer_indexes=defer_indexes,
+                index_workers=index_workers,
+            )
+
         try:
             self.drop_constraints_and_indexes()
         except ValueError as e:
@@ -90,13 +265,478 @@ class ProcessedDataManager(models.Manager):
         else:
             dropped = True
 
-        c = connection.cursor()
         try:
-            c.execute(self.raw_data_load_query)
+            if query_workers > 1:
+                execute_sql(self.raw_data_load_query_statements, workers=query_workers)
+            else:
+                with connection.cursor() as c:
+                    c.execute(self.raw_data_load_query)
         finally:
-            c.close()
-            if dropped:
-                self.add_constraints_and_indexes()
+            if dropped and not defer_indexes:
+                self.add_constraints_and_indexes(workers=index_workers)
+
+    def load_raw_data_in_chunks(self, chunk_size, checkpoint=None,
+                                defer_indexes=False, index_workers=1):
+        """
+        Load the model by executing its raw sql load query over one range of filing_ids at a time.
+
+        Each range of chunk_size filing_ids is loaded and committed in its own
+        transaction.
+
+        If checkpoint is provided, it is an object with a load_checkpoint
+        attribute and a save method, like a ProcessedDataFile instance. The
+        highest filing_id loaded is saved to it along with each chunk, and
+        the load resumes after any filing_id already saved there.
+        """
+        start_after = checkpoint.load_checkpoint if checkpoint else None
+
+        if start_after is None:
+            try:
+                self.drop_constraints_and_indexes()
+            except ValueError as e:
+                print(e)
+                print('Constrained fields: %s' % self.constrained_fields)
+                print('Indexed fields: %s' % self.indexed_fields)
+                dropped = False
+            else:
+                dropped = True
+        else:
+            # dropped when the interrupted load started
+            dropped = True
+
+        min_filing_id, max_filing_id = self.get_filing_id_range()
+        if min_filing_id is None:
+            # nothing to split into chunks
+            if start_after is None:
+                with connection.cursor() as c:
+                    c.execute(self.raw_data_load_query)
+        else:
+            if start_after is None:
+                lower = min_filing_id
+            else:
+                lower = start_after + 1
+            # each chunk reads its range of every source table, which would
+            # take a full scan of each per chunk without a filing_id index
+            created_indexes = self.create_filing_id_indexes()
+            try:
+                while lower <= max_filing_id:
+                    upper = lower + chunk_size - 1
+                    with transaction.atomic():
+                        with self.filtered_source_tables(
+                            '{column} BETWEEN %s AND %s' % (lower, upper)
+                        ):
+                            with connection.cursor() as c:
+                                c.execute(self.raw_data_load_query)
+                        if checkpoint:
+                            checkpoint.load_checkpoint = upper
+                            checkpoint.save()
+                    lower = upper + 1
+            finally:
+                execute_sql(['DROP INDEX IF EXISTS "%s";' % name for name in created_indexes])
+
+        if dropped and not defer_indexes:
+            self.add_constraints_and_indexes(workers=index_workers)
+
+    def load_raw_data_as_view(self):
+        """
+        Load the model as a materialized view of its raw sql load query.
+
+        The first load replaces the model's table with the view. Later loads
+        refresh the view concurrently, so it stays readable throughout.
+        """
+        db_table = self.model._meta.db_table
+        with connection.cursor() as c:
+            if self.is_materialized_view:
+                c.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY "%s";' % db_table)
+            else:
+                with transaction.atomic():
+                    c.execute('DROP TABLE "%s";' % db_table)
+                    c.execute(self.raw_data_view_query)
+                    for sql in self.get_view_index_sql():
+                        c.execute(sql)
+            c.execute('ANALYZE "%s";' % db_table)
+
+    def convert_view_to_table(self, model=None):
+        """
+        Replace the model's materialized view with an empty table.
+
+        The table is created from the provided model, or the manager's own if
+        not. Pass the model's historical version from the migration state to
+        get the table the applied migrations expect.
+        """
+        with transaction.atomic():
+            with connection.cursor() as c:
+                c.execute('DROP MATERIALIZED VIEW "%s";' % self.model._meta.db_table)
+            with connection.schema_editor() as schema_editor:
+                schema_editor.create_model(model or self.model)
+
+    def get_view_index_sql(self):
+        """
+        Return list of sql statements that index the model's materialized view.
+
+        The unique index on the primary key is required to refresh the view
+        concurrently.
+        """
+        db_table = self.model._meta.db_table
+        statements = [
+            'CREATE UNIQUE INDEX "{table}_pk_uniq" ON "{table}" ("{column}");'.format(
+                table=db_table,
+                column=self.model._meta.pk.column,
+            )
+        ]
+        for field in self.indexed_fields:
+            if field.primary_key:
+                continue
+            statements.append(
+                'CREATE INDEX "{table}_{column}_idx" ON "{table}" ("{column}");'.format(
+                    table=db_table,
+                    column=field.column,
+                )
+            )
+        return statements
+
+    def get_filing_id_range(self):
+        """
+        Return the lowest and highest filing_id in the tables read by the loading query.
+
+        Returns (None, None) if none of the tables have a filing_id column or
+        they are all empty.
+        """
+        mins = []
+        maxes = []
+        with connection.cursor() as c:
+            for table in sorted(self.raw_data_load_query_tables):
+                column = self._get_filing_id_column(c, table)
+                if not column:
+                    continue
+                c.execute(
+                    'SELECT MIN("{column}"), MAX("{column}") FROM "{table}";'.format(
+                        column=column,
+                        table=table,
+                    )
+                )
+                table_min, table_max = c.fetchone()
+                if table_min is not None:
+                    mins.append(table_min)
+                    maxes.append(table_max)
+        if not mins:
+            return None, None
+        return min(mins), max(maxes)
+
+    def create_filing_id_indexes(self):
+        """
+        Index the filing_id column of each table read by the loading query that lacks such an index.
+
+        Indexes on the raw data tables are kept, under the names the
+        indexcalaccessrawdata command gives its indexes. Returns a list of
+        the names of the indexes created on other tables, such as processed
+        version tables with their indexes dropped, for the caller to drop.
+        """
+        created_indexes = []
+        with connection.cursor() as c:
+            for table in sorted(self.raw_data_load_query_tables):
+                column = self._get_filing_id_column(c, table)
+                if not column or self._has_filing_id_index(c, table, column):
+                    continue
+                index_name = get_index_name(table, [column])
+                c.execute(
+                    'CREATE INDEX "{name}" ON "{table}" ("{column}");'.format(
+                        name=index_name,
+                        table=table,
+                        column=column,
+                    )
+                )
+                c.execute('ANALYZE "%s";' % table)
+                if table.startswith(self.model._meta.app_label):
+                    created_indexes.append(index_name)
+        return created_indexes
+
+    def _has_filing_id_index(self, cursor, table, column):
+        """
+        Return True if the table has an index that leads with its filing_id column.
+        """
+        cursor.execute(
+            """
+            SELECT 1
+            FROM pg_index i
+            JOIN pg_attribute a
+            ON a.attrelid = i.indrelid
+            AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = %s::regclass
+            AND a.attname = %s;
+            """,
+            ['"%s"' % table, column],
+        )
+        return cursor.fetchone() is not None
+
+    def load_raw_data_with_swap(self, index_workers=1):
+        """
+        Load the model into a shadow table, then swap it in for the model's table.
+
+        The shadow table is loaded, indexed and constrained like the model's
+        table while the latter stays readable, using up to index_workers
+        database connections for the indexes. The swap renames the tables in
+        one short transaction. If anything fails before then, the model's
+        table is left as it was.
+        """
+        db_table = self.model._meta.db_table
+        shadow_table = get_shadow_name(db_table)
+
+        load_query, replaced = re.subn(
+            r'\bINSERT\s+INTO\s+"?%s"?(?=[\s(])' % db_table,
+            'INSERT INTO "%s"' % shadow_table,
+            self.raw_data_load_query,
+            flags=re.IGNORECASE,
+        )
+        if not replaced:
+            raise ValueError(
+                'Load query for %s does not INSERT INTO %s.' % (self.model, db_table)
+            )
+
+        with connection.cursor() as c:
+            indexes = self._get_index_definitions(c, db_table)
+            constraints = self._get_constraint_definitions(c, db_table)
+            referencing_constraints = self._get_referencing_constraint_definitions(
+                c, db_table,
+            )
+            sequence = None
+            if self.model._meta.pk.get_internal_type() == 'AutoField':
+                c.execute(
+                    'SELECT pg_get_serial_sequence(%s, %s);',
+                    [db_table, self.model._meta.pk.column],
+                )
+                sequence = c.fetchone()[0]
+
+            c.execute('DROP TABLE IF EXISTS "%s";' % shadow_table)
+            c.execute(
+                'CREATE TABLE "{shadow}" (LIKE "{table}" INCLUDING DEFAULTS);'.format(
+                    shadow=shadow_table,
+                    table=db_table,
+                )
+            )
+            try:
+                c.execute(load_query)
+                index_sql = [
+                    re.sub(
+                        r'^(CREATE (?:UNIQUE )?INDEX) \S+ ON \S+ ',
+                        r'\1 "%s" ON "%s" ' % (get_shadow_name(name), shadow_table),
+                        definition,
+                    ) for name, definition in indexes
+                ]
+                constraint_sql = [
+                    'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition};'.format(
+                        table=shadow_table,
+                        name=get_shadow_name(name),
+                        definition=definition,
+                    ) for name, definition in constraints
+                ]
+                execute_constraint_and_index_sql(
+                    index_sql + constraint_sql,
+                    workers=index_workers,
+                )
+                c.execute('ANALYZE "%s";' % shadow_table)
+            except Exception:
+                c.execute('DROP TABLE IF EXISTS "%s";' % shadow_table)
+                raise
+
+            with transaction.atomic():
+                c.execute('LOCK TABLE "%s" IN ACCESS EXCLUSIVE MODE;' % db_table)
+                if sequence:
+                    # keep the sequence from being dropped with the old table
+                    c.execute(
+                        'ALTER SEQUENCE {sequence} OWNED BY "{table}"."{column}";'.format(
+                            sequence=sequence,
+                            table=shadow_table,
+                            column=self.model._meta.pk.column,
+                        )
+                    )
+                for table, name, definition in referencing_constraints:
+                    c.execute(
+                        'ALTER TABLE %s DROP CONSTRAINT "%s";' % (table, name)
+                    )
+                c.execute('DROP TABLE "%s";' % db_table)
+                c.execute(
+                    'ALTER TABLE "%s" RENAME TO "%s";' % (shadow_table, db_table)
+                )
+                for name, definition in indexes:
+                    c.execute(
+                        'ALTER INDEX "%s" RENAME TO "%s";' % (get_shadow_name(name), name)
+                    )
+                for name, definition in constraints:
+                    c.execute(
+                        'ALTER TABLE "{table}" RENAME CONSTRAINT "{shadow}" TO "{name}";'.format(
+                            table=db_table,
+                            shadow=get_shadow_name(name),
+                            name=name,
+                        )
+                    )
+                # rows in referencing tables are re-loaded later, so skip checking
+                # them now and validate the constraints afterward
+                # (see get_validate_constraint_sql)
+                for table, name, definition in referencing_constraints:
+                    c.execute(
+                        'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition} NOT VALID;'.format(
+                            table=table,
+                            name=name,
+                            definition=definition,
+                        )
+                    )
+
+    def get_validate_constraint_sql(self):
+        """
+        Return list of sql statements that validate the foreign keys on the model's table added NOT VALID.
+        """
+        db_table = self.model._meta.db_table
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT conname
+                FROM pg_constraint
+                WHERE conrelid = %s::regclass
+                AND contype = 'f'
+                AND NOT convalidated;
+                """,
+                [db_table],
+            )
+            return [
+                'ALTER TABLE "%s" VALIDATE CONSTRAINT "%s";' % (db_table, name)
+                for name, in c.fetchall()
+            ]
+
+    def _get_index_definitions(self, cursor, db_table):
+        """
+        Return list of (name, definition) tuples for indexes on the table.
+
+        Excludes the indexes that back primary key and unique constraints.
+        """
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+            FROM pg_index ix
+            JOIN pg_class i
+            ON i.oid = ix.indexrelid
+            WHERE ix.indrelid = %s::regclass
+            AND NOT EXISTS (
+                SELECT 1
+                FROM pg_constraint con
+                WHERE con.conindid = ix.indexrelid
+            );
+            """,
+            [db_table],
+        )
+        return cursor.fetchall()
+
+    def _get_constraint_definitions(self, cursor, db_table):
+        """
+        Return list of (name, definition) tuples for constraints on the table.
+        """
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass
+            AND contype IN ('p', 'u', 'c', 'f')
+            ORDER BY contype DESC;
+            """,
+            [db_table],
+        )
+        return cursor.fetchall()
+
+    def _get_referencing_constraint_definitions(self, cursor, db_table):
+        """
+        Return list of (table, name, definition) tuples for foreign keys to the table.
+
+        Excludes foreign keys from the table to itself.
+        """
+        cursor.execute(
+            """
+            SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE confrelid = %s::regclass
+            AND conrelid <> confrelid
+            AND contype = 'f';
+            """,
+            [db_table],
+        )
+        return cursor.fetchall()
+
+    def delete_raw_data(self, filing_id_condition):
+        """
+        Delete the model's rows for the filings matching the given condition.
+
+        The condition is a string of sql with a {column} placeholder for the
+        filing_id column.
+        """
+        columns = [f.column for f in self.model._meta.fields]
+        if 'filing_id' in columns:
+            sql = 'DELETE FROM "{table}" WHERE {condition};'.format(
+                table=self.model._meta.db_table,
+                condition=filing_id_condition.format(column='filing_id'),
+            )
+        elif 'filing_version_id' in columns:
+            version_model = self.model._meta.get_field('filing_version').related_model
+            sql = """
+            DELETE FROM "{table}" AS t
+            USING "{version_table}" AS v
+            WHERE t.filing_version_id = v.id
+            AND {condition};
+            """.format(
+                table=self.model._meta.db_table,
+                version_table=version_model._meta.db_table,
+                condition=filing_id_condition.format(column='v.filing_id'),
+            )
+        else:
+            raise ValueError(
+                '%s has no filing_id or filing_version_id column.' % self.model
+            )
+
+        with connection.cursor() as c:
+            c.execute(sql)
+
+    @contextmanager
+    def filtered_source_tables(self, filing_id_condition):
+        """
+        Temporarily shadow each table read by the loading query with a filtered copy.
+
+        Only tables with a filing_id column are shadowed. The copies are
+        temporary tables of the same name, which Postgres resolves ahead of
+        the permanent tables for the rest of the session.
+        """
+        shadowed = []
+        with connection.cursor() as c:
+            try:
+                for table in sorted(self.raw_data_load_query_tables):
+                    column = self._get_filing_id_column(c, table)
+                    if not column:
+                        continue
+                    c.execute(
+                        'CREATE TEMPORARY TABLE "{table}" AS '
+                        'SELECT * FROM "{table}" WHERE {condition};'.format(
+                            table=table,
+                            condition=filing_id_condition.format(
+                                column='"%s"' % column,
+                            ),
+                        )
+                    )
+                    shadowed.append(table)
+                    c.execute('ANALYZE pg_temp."%s";' % table)
+                yield shadowed
+            finally:
+                for table in shadowed:
+                    c.execute('DROP TABLE IF EXISTS pg_temp."%s";' % table)
+
+    def _get_filing_id_column(self, cursor, table):
+        """
+        Return the name of the table's filing_id column, or None if it has none.
+        """
+        columns = [
+            col.name for col in
+            connection.introspection.get_table_description(cursor, table)
+        ]
+        return next(
+            (i for i in ('FILING_ID', 'filing_id') if i in columns),
+            None,
+        )
 
     @property
     def constrained_fields(self):
@@ -127,6 +767,29 @@ class ProcessedDataManager(models.Manager):
         else:
             return False
 
+    @property
+    def is_materialized_view(self):
+        """
+        Return True if the model is currently backed by a materialized view.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'SELECT 1 FROM pg_matviews '
+                'WHERE matviewname = %s AND schemaname = current_schema();',
+                [self.model._meta.db_table],
+            )
+            return c.fetchone() is not None
+
+    @property
+    def can_load_as_view(self):
+        """
+        Return True if the model can be backed by a materialized view.
+
+        Only models that no other model refers to and that are loaded from a
+        single version model qualify.
+        """
+        return not self.model._meta.related_objects and bool(self.raw_data_view_query)
+
     @property
     def db_table(self):
         """
@@ -145,6 +808,74 @@ class ProcessedDataManager(models.Manager):
                 sql = f.read()
         return sql
 
+    @property
+    def raw_data_load_query_statements(self):
+        """
+        Return list of the separate sql statements in the model's loading query.
+        """
+        sql = re.sub(r'--.*$', '', self.raw_data_load_query, flags=re.MULTILINE)
+        return [
+            '%s;' % statement.strip() for statement in re.split(r';\s*$', sql, flags=re.MULTILINE)
+            if statement.strip()
+        ]
+
+    @property
+    def raw_data_view_query(self):
+        """
+        Return string of raw sql creating a materialized view of the model's loading query.
+
+        Rows in the view take their primary key from the version model the
+        model is loaded from. Returns an empty string if the loading query
+        doesn't select from exactly one version model.
+        """
+        db_table = self.model._meta.db_table
+        models_by_table = dict(
+            (m._meta.db_table, m) for m in
+            apps.get_app_config('calaccess_processed').get_models()
+        )
+        version_tables = [
+            t for t in self.raw_data_load_query_tables
+            if t in models_by_table and
+            'filing_version' in [f.name for f in models_by_table[t]._meta.fields]
+        ]
+        if len(version_tables) != 1:
+            return ''
+
+        sql = re.sub(r'--.*$', '', self.raw_data_load_query, flags=re.MULTILINE)
+        insert = re.match(
+            r'^\s*INSERT\s+INTO\s+"?%s"?\s*\((?P<columns>[^)]*)\)\s*SELECT\b(?P<select>.*?)\s*;?\s*$' % db_table,
+            sql,
+            flags=re.IGNORECASE | re.DOTALL,
+        )
+        alias = re.search(
+            r'\b(?:FROM|JOIN)\s+"?%s"?\s+(?:AS\s+)?(\w+)' % version_tables[0],
+            sql,
+            flags=re.IGNORECASE,
+        )
+        if not insert or not alias:
+            return ''
+
+        columns = [
+            c.strip() for c in insert.group('columns').split(',') if c.strip()
+        ]
+        return 'CREATE MATERIALIZED VIEW "{table}" ({columns}) AS\nSELECT {alias}.id,{select};'.format(
+            table=db_table,
+            columns=', '.join([self.model._meta.pk.column] + columns),
+            alias=alias.group(1),
+            select=insert.group('select'),
+        )
+
+    @property
+    def raw_data_load_query_tables(self):
+        """
+        Return set of database table names read by the model's loading query.
+
+        Excludes the model's own database table.
+        """
+        tables = get_query_tables(self.raw_data_load_query)
+        tables.discard(self.model._meta.db_table)
+        return tables
+
     @property
     def raw_data_load_query_path(self):
         """
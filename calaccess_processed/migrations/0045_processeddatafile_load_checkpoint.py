@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2017-07-10 18:32
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0044_form460scheduleesummary_form460scheduleesummaryversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='load_checkpoint',
+            field=models.IntegerField(help_text='Highest filing_id committed so far when the file is loaded in chunks (used to resume an interrupted load)', null=True, verbose_name='load checkpoint'),
+        ),
+    ]
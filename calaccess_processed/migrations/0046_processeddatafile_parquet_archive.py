@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2017-07-12 16:05
+from __future__ import unicode_literals
+
+import calaccess_processed
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0045_processeddatafile_load_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='parquet_archive',
+            field=models.FileField(blank=True, help_text='A Parquet archive of the processed file', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='parquet archive of processed file'),
+        ),
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='parquet_size',
+            field=models.BigIntegerField(default=0, help_text='Size of the Parquet archive of the processed file (in bytes)', verbose_name='size of parquet file (in bytes)'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2017-07-13 11:21
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0046_processeddatafile_parquet_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='content_digest',
+            field=models.CharField(blank=True, default='', help_text='Digest of the rows in the processed file, regardless of their order (used to reuse unchanged archives)', max_length=32, verbose_name='content digest'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2017-07-14 15:47
+from __future__ import unicode_literals
+
+import calaccess_processed
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0047_processeddatafile_content_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedDataFileDiff',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(help_text='Name of the processed data file without extension', max_length=100, verbose_name='processed data file name')),
+                ('process_start_datetime', models.DateTimeField(help_text='Date and time when the processing of the diff started', null=True, verbose_name='date and time processing started')),
+                ('process_finish_datetime', models.DateTimeField(help_text='Date and time when the processing of the diff finished', null=True, verbose_name='date and time processing finished')),
+                ('added_count', models.IntegerField(default=0, help_text='Count of records added to the processed file', verbose_name='added records count')),
+                ('changed_count', models.IntegerField(default=0, help_text='Count of records changed in the processed file', verbose_name='changed records count')),
+                ('removed_count', models.IntegerField(default=0, help_text='Count of records removed from the processed file', verbose_name='removed records count')),
+                ('added_archive', models.FileField(blank=True, help_text='An archive of the records added to the processed file', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='archive of added records')),
+                ('changed_archive', models.FileField(blank=True, help_text='An archive of the new values of the records changed in the processed file', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='archive of changed records')),
+                ('removed_archive', models.FileField(blank=True, help_text='An archive of the records removed from the processed file', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='archive of removed records')),
+                ('from_version', models.ForeignKey(help_text='Foreign key referencing the earlier processed version of CAL-ACCESS', on_delete=django.db.models.deletion.CASCADE, related_name='later_file_diffs', to='calaccess_processed.ProcessedDataVersion', verbose_name='processed data version compared from')),
+                ('to_version', models.ForeignKey(help_text='Foreign key referencing the later processed version of CAL-ACCESS', on_delete=django.db.models.deletion.CASCADE, related_name='file_diffs', to='calaccess_processed.ProcessedDataVersion', verbose_name='processed data version compared to')),
+            ],
+            options={
+                'ordering': ('-to_version_id', '-from_version_id', 'file_name'),
+                'verbose_name': 'TRACKING: processed CAL-ACCESS data file diff',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='processeddatafilediff',
+            unique_together=set([('from_version', 'to_version', 'file_name')]),
+        ),
+    ]
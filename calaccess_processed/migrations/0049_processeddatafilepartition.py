@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.5 on 2017-07-17 10:12
+from __future__ import unicode_literals
+
+import calaccess_processed
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0048_processeddatafilediff'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedDataFilePartition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('election_cycle', models.IntegerField(help_text='Two-year election cycle of the records in the partition, named for its even year (null if not partitioned by cycle or if unknown)', null=True, verbose_name='election cycle')),
+                ('filer_bucket', models.IntegerField(help_text='Bucket of the filer_ids of the records in the partition (null if not partitioned by filer)', null=True, verbose_name='filer bucket')),
+                ('records_count', models.IntegerField(default=0, help_text='Count of records in the partition', verbose_name='records count')),
+                ('file_archive', models.FileField(blank=True, help_text='An archive of the partition', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='archive of partition')),
+                ('file_size', models.BigIntegerField(default=0, help_text='Size of the partition file (in bytes)', verbose_name='size of partition file (in bytes)')),
+                ('sha256', models.CharField(blank=True, help_text='SHA-256 checksum of the partition file', max_length=64, verbose_name='SHA-256 checksum')),
+                ('processed_file', models.ForeignKey(help_text='Foreign key referencing the partitioned processed data file', on_delete=django.db.models.deletion.CASCADE, related_name='partitions', to='calaccess_processed.ProcessedDataFile', verbose_name='processed data file')),
+            ],
+            options={
+                'ordering': ('processed_file', 'election_cycle', 'filer_bucket'),
+                'verbose_name': 'TRACKING: processed CAL-ACCESS data file partition',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='processeddatafilepartition',
+            unique_together=set([('processed_file', 'election_cycle', 'filer_bucket')]),
+        ),
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='partition_manifest',
+            field=models.FileField(blank=True, help_text='A JSON manifest of the partitions of the processed files', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='partitioned files manifest'),
+        ),
+    ]
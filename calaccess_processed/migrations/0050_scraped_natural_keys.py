@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0049_processeddatafilepartition'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='candidatescrapedelection',
+            unique_together=set([('name', 'scraped_id', 'sort_index', 'url')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='incumbentscrapedelection',
+            unique_together=set([('session', 'name', 'date', 'url')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='propositionscrapedelection',
+            unique_together=set([('name', 'url')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedcandidate',
+            unique_together=set([('name', 'scraped_id', 'office_name', 'url', 'election')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedcandidatecommittee',
+            unique_together=set([('name', 'scraped_id', 'status', 'candidate_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedincumbent',
+            unique_together=set([('session', 'category', 'office_name', 'name', 'url', 'scraped_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedproposition',
+            unique_together=set([('name', 'scraped_id', 'url', 'election')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedpropositioncommittee',
+            unique_together=set([('name', 'scraped_id', 'position', 'url', 'proposition')]),
+        ),
+    ]
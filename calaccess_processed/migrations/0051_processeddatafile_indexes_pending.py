@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0050_scraped_natural_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='indexes_pending',
+            field=models.BooleanField(default=False, help_text="Whether the constraints and indexes of the file's model were dropped and are still to be re-created", verbose_name='indexes pending'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+# Scraped models by the fields of their new natural keys, parents before
+# children, along with the (model, foreign key) pairs that refer to them
+SCRAPED_MODEL_KEYS = (
+    ('CandidateScrapedElection', ('name', 'scraped_id'), (('ScrapedCandidate', 'election'),)),
+    ('ScrapedCandidate', ('name', 'scraped_id', 'office_name', 'election'), ()),
+    ('ScrapedCandidateCommittee', ('name', 'scraped_id', 'status', 'candidate_id'), ()),
+    ('PropositionScrapedElection', ('name',), (('ScrapedProposition', 'election'),)),
+    ('ScrapedProposition', ('name', 'scraped_id', 'election'), (('ScrapedPropositionCommittee', 'proposition'),)),
+    ('ScrapedPropositionCommittee', ('name', 'scraped_id', 'position', 'proposition'), ()),
+    ('IncumbentScrapedElection', ('session', 'name', 'date'), ()),
+    ('ScrapedIncumbent', ('session', 'category', 'office_name', 'name', 'scraped_id'), ()),
+)
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Merge the scraped records that share a natural key into the one most recently modified.
+
+    Records that referred to a duplicate are re-pointed at the one kept.
+    Parents are merged first, so the children they gather are merged too.
+    """
+    for model_name, key_fields, children in SCRAPED_MODEL_KEYS:
+        model = apps.get_model('calaccess_processed', model_name)
+        duplicate_keys = model.objects.order_by().values(*key_fields).annotate(
+            records=models.Count('id'),
+        ).filter(records__gt=1)
+        for key in duplicate_keys:
+            key.pop('records')
+            ids = list(
+                model.objects.filter(**key).order_by(
+                    '-last_modified', '-id'
+                ).values_list('id', flat=True)
+            )
+            kept_id, duplicate_ids = ids[0], ids[1:]
+            for child_name, fk_name in children:
+                child_model = apps.get_model('calaccess_processed', child_name)
+                child_model.objects.filter(
+                    **{'%s_id__in' % fk_name: duplicate_ids}
+                ).update(**{'%s_id' % fk_name: kept_id})
+            model.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0051_processeddatafile_indexes_pending'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0052_merge_duplicate_scraped_records'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='candidatescrapedelection',
+            unique_together=set([('name', 'scraped_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='incumbentscrapedelection',
+            unique_together=set([('session', 'name', 'date')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='propositionscrapedelection',
+            unique_together=set([('name',)]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedcandidate',
+            unique_together=set([('name', 'scraped_id', 'office_name', 'election')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedincumbent',
+            unique_together=set([('session', 'category', 'office_name', 'name', 'scraped_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedproposition',
+            unique_together=set([('name', 'scraped_id', 'election')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scrapedpropositioncommittee',
+            unique_together=set([('name', 'scraped_id', 'position', 'proposition')]),
+        ),
+    ]
@@ -96,6 +96,8 @@ from .research import (
 from .tracking import (
     ProcessedDataVersion,
     ProcessedDataFile,
+    ProcessedDataFilePartition,
+    ProcessedDataFileDiff,
 )
 
 __all__ = (
@@ -186,4 +188,6 @@ __all__ = (
     'IncumbentScrapedElection',
     'ProcessedDataVersion',
     'ProcessedDataFile',
+    'ProcessedDataFilePartition',
+    'ProcessedDataFileDiff',
 )
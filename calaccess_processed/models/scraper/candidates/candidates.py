@@ -40,6 +40,17 @@ class ScrapedCandidate(BaseScrapedModel):
         related_name='candidates',
     )
 
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'name',
+            'scraped_id',
+            'office_name',
+            'election',
+        ),)
+
     def __str__(self):
         return self.name
 
@@ -21,5 +21,16 @@ class ScrapedCandidateCommittee(BaseScrapedCommittee):
         max_length=100
     )
 
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'name',
+            'scraped_id',
+            'status',
+            'candidate_id',
+        ),)
+
     def __str__(self):
         return self.name
@@ -26,5 +26,14 @@ class CandidateScrapedElection(BaseScrapedElection):
                   "index corresponds to a more recent election."
     )
 
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'name',
+            'scraped_id',
+        ),)
+
     def __str__(self):
         return self.name
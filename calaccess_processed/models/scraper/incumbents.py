@@ -37,6 +37,18 @@ class ScrapedIncumbent(BaseScrapedModel):
         max_length=7,
     )
 
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'session',
+            'category',
+            'office_name',
+            'name',
+            'scraped_id',
+        ),)
+
     def __str__(self):
         return self.name
 
@@ -53,5 +65,15 @@ class IncumbentScrapedElection(BaseScrapedElection):
         verbose_name="election date",
     )
 
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'session',
+            'name',
+            'date',
+        ),)
+
     def __str__(self):
         return self.name
@@ -20,5 +20,16 @@ class ScrapedPropositionCommittee(BaseScrapedCommittee):
     )
     proposition = models.ForeignKey('ScrapedProposition')
 
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'name',
+            'scraped_id',
+            'position',
+            'proposition',
+        ),)
+
     def __str__(self):
         return self.name
@@ -13,5 +13,13 @@ class PropositionScrapedElection(BaseScrapedElection):
     """
     An election day scraped as part of the `scrapecalaccesspropositions` command.
     """
+    class Meta:
+        """
+        Model options.
+        """
+        unique_together = ((
+            'name',
+        ),)
+
     def __str__(self):
         return self.name
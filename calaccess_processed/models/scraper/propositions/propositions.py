@@ -35,6 +35,11 @@ class ScrapedProposition(BaseScrapedModel):
         Model options.
         """
         ordering = ("-election", "name")
+        unique_together = ((
+            'name',
+            'scraped_id',
+            'election',
+        ),)
 
     def __str__(self):
         return 'Proposition: {}'.format(self.name)
@@ -4,6 +4,7 @@
 Models for tracking processing of CAL-ACCESS snapshots over time.
 """
 from __future__ import unicode_literals
+import os
 from django.db import models
 from hurry.filesize import size as sizeformat
 from django.utils.encoding import python_2_unicode_compatible
@@ -45,6 +46,13 @@ class ProcessedDataVersion(models.Model):
         verbose_name='zip of size (in bytes)',
         help_text='The expected size (in bytes) of the zip of processed files'
     )
+    partition_manifest = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='partitioned files manifest',
+        help_text='A JSON manifest of the partitions of the processed files'
+    )
 
     class Meta:
         """
@@ -143,6 +151,39 @@ class ProcessedDataFile(models.Model):
         verbose_name='size of processed data file (in bytes)',
         help_text='Size of the processed file (in bytes)'
     )
+    load_checkpoint = models.IntegerField(
+        null=True,
+        verbose_name='load checkpoint',
+        help_text='Highest filing_id committed so far when the file is loaded '
+                  'in chunks (used to resume an interrupted load)'
+    )
+    indexes_pending = models.BooleanField(
+        default=False,
+        verbose_name='indexes pending',
+        help_text='Whether the constraints and indexes of the file\'s model were '
+                  'dropped and are still to be re-created'
+    )
+    parquet_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='parquet archive of processed file',
+        help_text='A Parquet archive of the processed file'
+    )
+    parquet_size = models.BigIntegerField(
+        null=False,
+        default=0,
+        verbose_name='size of parquet file (in bytes)',
+        help_text='Size of the Parquet archive of the processed file (in bytes)'
+    )
+    content_digest = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        verbose_name='content digest',
+        help_text='Digest of the rows in the processed file, regardless of '
+                  'their order (used to reuse unchanged archives)'
+    )
 
     class Meta:
         """
@@ -163,3 +204,201 @@ class ProcessedDataFile(models.Model):
         return sizeformat(self.file_size)
     pretty_file_size.short_description = 'processed file size'
     pretty_file_size.admin_order_field = 'processed file size'
+
+    def pretty_parquet_size(self):
+        """
+        Returns a prettified version (e.g., "725M") of the parquet file's size.
+        """
+        return sizeformat(self.parquet_size)
+    pretty_parquet_size.short_description = 'parquet file size'
+    pretty_parquet_size.admin_order_field = 'parquet file size'
+
+    def get_previous_file(self):
+        """
+        Returns the archived file of the same name from the most recent previous version.
+        """
+        return ProcessedDataFile.objects.filter(
+            file_name=self.file_name,
+            version__raw_version__release_datetime__lt=self.version.raw_version.release_datetime,
+        ).exclude(
+            file_archive='',
+        ).order_by(
+            '-version__raw_version__release_datetime',
+        ).first()
+
+    def delete_archive(self, field_name='file_archive'):
+        """
+        Delete the archive in the named FileField, unless another file shares it.
+
+        Unchanged files reuse the archive of the previous version, so the
+        stored file is only removed once no other file refers to it.
+        """
+        field_file = getattr(self, field_name)
+        if not field_file:
+            return
+        is_shared = ProcessedDataFile.objects.exclude(id=self.id).filter(
+            **{field_name: field_file.name}
+        ).exists()
+        if is_shared:
+            setattr(self, field_name, '')
+        else:
+            field_file.delete(save=False)
+
+
+@python_2_unicode_compatible
+class ProcessedDataFilePartition(models.Model):
+    """
+    A partition of a processed data file, by election cycle and filer.
+    """
+    processed_file = models.ForeignKey(
+        'ProcessedDataFile',
+        on_delete=models.CASCADE,
+        related_name='partitions',
+        verbose_name='processed data file',
+        help_text='Foreign key referencing the partitioned processed data file'
+    )
+    election_cycle = models.IntegerField(
+        null=True,
+        verbose_name='election cycle',
+        help_text='Two-year election cycle of the records in the partition, '
+                  'named for its even year (null if not partitioned by cycle '
+                  'or if unknown)'
+    )
+    filer_bucket = models.IntegerField(
+        null=True,
+        verbose_name='filer bucket',
+        help_text='Bucket of the filer_ids of the records in the partition '
+                  '(null if not partitioned by filer)'
+    )
+    records_count = models.IntegerField(
+        null=False,
+        default=0,
+        verbose_name='records count',
+        help_text='Count of records in the partition'
+    )
+    file_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='archive of partition',
+        help_text='An archive of the partition'
+    )
+    file_size = models.BigIntegerField(
+        null=False,
+        default=0,
+        verbose_name='size of partition file (in bytes)',
+        help_text='Size of the partition file (in bytes)'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='SHA-256 checksum',
+        help_text='SHA-256 checksum of the partition file'
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+        app_label = 'calaccess_processed'
+        unique_together = (('processed_file', 'election_cycle', 'filer_bucket'),)
+        verbose_name = 'TRACKING: processed CAL-ACCESS data file partition'
+        ordering = ('processed_file', 'election_cycle', 'filer_bucket',)
+
+    def __str__(self):
+        return os.path.basename(self.file_archive.name)
+
+    def pretty_file_size(self):
+        """
+        Returns a prettified version (e.g., "725M") of the partition file's size.
+        """
+        return sizeformat(self.file_size)
+    pretty_file_size.short_description = 'partition file size'
+    pretty_file_size.admin_order_field = 'partition file size'
+
+
+@python_2_unicode_compatible
+class ProcessedDataFileDiff(models.Model):
+    """
+    The rows added, changed and removed from a processed data file between two versions.
+    """
+    from_version = models.ForeignKey(
+        'ProcessedDataVersion',
+        on_delete=models.CASCADE,
+        related_name='later_file_diffs',
+        verbose_name='processed data version compared from',
+        help_text='Foreign key referencing the earlier processed version of CAL-ACCESS'
+    )
+    to_version = models.ForeignKey(
+        'ProcessedDataVersion',
+        on_delete=models.CASCADE,
+        related_name='file_diffs',
+        verbose_name='processed data version compared to',
+        help_text='Foreign key referencing the later processed version of CAL-ACCESS'
+    )
+    file_name = models.CharField(
+        max_length=100,
+        verbose_name='processed data file name',
+        help_text='Name of the processed data file without extension',
+    )
+    process_start_datetime = models.DateTimeField(
+        null=True,
+        verbose_name='date and time processing started',
+        help_text='Date and time when the processing of the diff started',
+    )
+    process_finish_datetime = models.DateTimeField(
+        null=True,
+        verbose_name='date and time processing finished',
+        help_text='Date and time when the processing of the diff finished',
+    )
+    added_count = models.IntegerField(
+        null=False,
+        default=0,
+        verbose_name='added records count',
+        help_text='Count of records added to the processed file'
+    )
+    changed_count = models.IntegerField(
+        null=False,
+        default=0,
+        verbose_name='changed records count',
+        help_text='Count of records changed in the processed file'
+    )
+    removed_count = models.IntegerField(
+        null=False,
+        default=0,
+        verbose_name='removed records count',
+        help_text='Count of records removed from the processed file'
+    )
+    added_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='archive of added records',
+        help_text='An archive of the records added to the processed file'
+    )
+    changed_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='archive of changed records',
+        help_text='An archive of the new values of the records changed in the processed file'
+    )
+    removed_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='archive of removed records',
+        help_text='An archive of the records removed from the processed file'
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+        app_label = 'calaccess_processed'
+        unique_together = (('from_version', 'to_version', 'file_name'),)
+        verbose_name = 'TRACKING: processed CAL-ACCESS data file diff'
+        ordering = ('-to_version_id', '-from_version_id', 'file_name',)
+
+    def __str__(self):
+        return self.file_name
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for exporting processed data models to Parquet files.
+
+Requires the optional pyarrow package:
+
+    pip install django-calaccess-processed-data[parquet]
+"""
+import os
+from threading import Thread
+from django.core.exceptions import ImproperlyConfigured
+
+# Arrow types for Django fields, by internal type
+# Fields not listed here are exported as strings.
+ARROW_TYPES_BY_FIELD_TYPE = {
+    'AutoField': 'int32',
+    'BigAutoField': 'int64',
+    'BigIntegerField': 'int64',
+    'BooleanField': 'bool_',
+    'DateField': 'date32',
+    'FloatField': 'float64',
+    'IntegerField': 'int32',
+    'NullBooleanField': 'bool_',
+    'PositiveIntegerField': 'int64',
+    'PositiveSmallIntegerField': 'int32',
+    'SmallIntegerField': 'int16',
+}
+
+
+def import_pyarrow():
+    """
+    Return the pyarrow module, once its csv and parquet modules are imported.
+
+    Raises ImproperlyConfigured if pyarrow isn't installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.csv  # noqa
+        import pyarrow.parquet  # noqa
+    except ImportError:
+        raise ImproperlyConfigured(
+            'Exporting Parquet files requires pyarrow. '
+            'Install it with "pip install django-calaccess-processed-data[parquet]".'
+        )
+    return pyarrow
+
+
+def get_arrow_type(field):
+    """
+    Return the Arrow data type for the given Django model field.
+    """
+    pa = import_pyarrow()
+    if field.is_relation:
+        return get_arrow_type(field.target_field)
+
+    internal_type = field.get_internal_type()
+    if internal_type == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    elif internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    elif internal_type == 'TimeField':
+        return pa.time64('us')
+    elif internal_type in ARROW_TYPES_BY_FIELD_TYPE:
+        return getattr(pa, ARROW_TYPES_BY_FIELD_TYPE[internal_type])()
+    return pa.string()
+
+
+def get_arrow_schema(model):
+    """
+    Return the Arrow schema for the given Django model's database table.
+    """
+    pa = import_pyarrow()
+    return pa.schema([
+        pa.field(f.column, get_arrow_type(f), nullable=f.null or f.is_relation)
+        for f in model._meta.concrete_fields
+    ])
+
+
+def copy_to_parquet(cursor, model, path, compression='snappy'):
+    """
+    Export the given model's database table to a Parquet file at the given path.
+
+    Rows are streamed out of the database with COPY ... TO STDOUT and
+    converted to typed, compressed Parquet columns on the fly, one batch at
+    a time, by a second thread. Returns the size of the file in bytes.
+    """
+    pa = import_pyarrow()
+    schema = get_arrow_schema(model)
+
+    select_list = []
+    for f in model._meta.concrete_fields:
+        if f.get_internal_type() == 'DateTimeField':
+            # print timestamps in UTC, without an offset
+            select_list.append('"{0}" AT TIME ZONE \'UTC\' AS "{0}"'.format(f.column))
+        else:
+            select_list.append('"%s"' % f.column)
+    sql = 'COPY (SELECT {columns} FROM "{table}") TO STDOUT CSV HEADER;'.format(
+        columns=', '.join(select_list),
+        table=model._meta.db_table,
+    )
+    # parse timestamps as printed, then label them UTC when cast to the schema
+    column_types = dict(
+        (f.name, pa.timestamp(f.type.unit) if pa.types.is_timestamp(f.type) else f.type)
+        for f in schema
+    )
+    convert_options = pa.csv.ConvertOptions(
+        column_types=column_types,
+        true_values=['t'],
+        false_values=['f'],
+        # COPY writes nulls unquoted and empty strings quoted
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+    )
+
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, 'rb')
+    writer = os.fdopen(write_fd, 'wb')
+
+    # convert from a separate thread, while this one keeps the database connection
+    convert_errors = []
+
+    def convert():
+        try:
+            batches = pa.csv.open_csv(reader, convert_options=convert_options)
+            with pa.parquet.ParquetWriter(path, schema, compression=compression) as parquet_writer:
+                for batch in batches:
+                    parquet_writer.write_table(
+                        pa.Table.from_batches([batch]).cast(schema)
+                    )
+        except Exception as e:
+            convert_errors.append(e)
+        finally:
+            # keep the COPY from blocking on a full pipe
+            while reader.read(1024 * 64):
+                pass
+            reader.close()
+    convert_thread = Thread(target=convert)
+    convert_thread.start()
+
+    try:
+        cursor.copy_expert(sql, writer)
+    finally:
+        writer.close()
+        convert_thread.join()
+
+    if convert_errors:
+        raise convert_errors[0]
+    return os.path.getsize(path)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Includes a mapping of the .sql files in sql/ to the raw data table indexes that support them.
+"""
+# calaccess_raw doesn't index the raw data tables, so every query that joins
+# them on ("FILING_ID", "AMEND_ID") or filters them on "FORM_TYPE" scans them
+# in full. Leading with "FILING_ID" also speeds up loads restricted to a set
+# or range of filing_ids.
+
+# Each entry maps a .sql file name (minus the extension) to a tuple
+# of (table name, (column name, ...)) pairs.
+
+indexes_by_query = (
+    ('stage_smrypivot', (
+        ('SMRY_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460filingversion_model', (
+        ('CVR_CAMPAIGN_DISCLOSURE_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+        ('FILER_XREF_CD', ('XREF_ID',)),
+    )),
+    ('load_form460scheduleaitemversion_model', (
+        ('RCPT_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleb1itemversion_model', (
+        ('LOAN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleb2itemversion_model', (
+        ('LOAN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleb2itemversionold_model', (
+        ('LOAN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460schedulecitemversion_model', (
+        ('RCPT_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleditemversion_model', (
+        ('EXPN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleeitemversion_model', (
+        ('EXPN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleesubitemversion_model', (
+        ('EXPN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460schedulefitemversion_model', (
+        ('DEBT_CD', ('FILING_ID', 'AMEND_ID')),
+    )),
+    ('load_form460schedulegitemversion_model', (
+        ('EXPN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460schedulehitemversion_model', (
+        ('LOAN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleh2itemversionold_model', (
+        ('LOAN_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form460scheduleiitemversion_model', (
+        ('RCPT_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form497filingversion_model', (
+        ('CVR_CAMPAIGN_DISCLOSURE_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+        ('FILER_XREF_CD', ('XREF_ID',)),
+    )),
+    ('load_form497part1itemversion_model', (
+        ('S497_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form497part2itemversion_model', (
+        ('S497_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+    )),
+    ('load_form501filingversion_model', (
+        ('F501_502_CD', ('FILING_ID', 'AMEND_ID', 'FORM_TYPE')),
+        ('LOOKUP_CODES_CD', ('CODE_ID', 'CODE_TYPE')),
+    )),
+)
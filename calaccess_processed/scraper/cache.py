@@ -0,0 +1,490 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Caches of scraped pages, with their HTTP validators.
+"""
+import io
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from six.moves.urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from six.moves.urllib.request import pathname2url, url2pathname
+
+
+class BaseScraperCache(object):
+    """
+    Base class for caches of scraped pages.
+
+    Each page is stored with its ETag and Last-Modified headers, so it can
+    be revalidated with a conditional request, as well as when it was last
+    fetched (or revalidated), a digest of its content and when that content
+    last changed.
+
+    Subclasses implement get_path, exists, get_metadata, read, write, touch,
+    get_entries and delete.
+    """
+    def get_key(self, url):
+        """
+        Return the key the URL's page is stored under.
+        """
+        return url.strip("/")
+
+    def is_fresh(self, url, ttl):
+        """
+        Return True if the URL's page was fetched or revalidated in the last ttl seconds.
+        """
+        fetched = self.get_metadata(url).get('fetched')
+        return bool(ttl and fetched and time.time() - fetched < ttl and self.exists(url))
+
+    def get_conditional_headers(self, url):
+        """
+        Return the headers that make a request for the URL conditional on its cached page.
+        """
+        metadata = self.get_metadata(url)
+        headers = {}
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+        return headers
+
+    def get_changed(self, url):
+        """
+        Return when the content of the URL's page last changed, or None if it isn't cached.
+
+        Pages cached before changes were recorded are taken to have changed
+        when they were last fetched.
+        """
+        metadata = self.get_metadata(url)
+        return metadata.get('changed') or metadata.get('fetched')
+
+    def make_metadata(self, previous, content, headers, fetched):
+        """
+        Return the metadata of a page being cached, given the metadata of its previous version.
+        """
+        headers = headers or {}
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        if previous.get('digest') == digest and previous.get('changed'):
+            changed = previous['changed']
+        else:
+            changed = fetched
+        return {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched': fetched,
+            'digest': digest,
+            'changed': changed,
+        }
+
+    def get_stats(self):
+        """
+        Return a dict with the number and size of the cached pages, and when the oldest and newest were fetched.
+        """
+        pages = 0
+        size = 0
+        fetched = []
+        for key, entry_fetched, entry_size in self.get_entries():
+            pages += 1
+            size += entry_size
+            if entry_fetched:
+                fetched.append(entry_fetched)
+        return {
+            'pages': pages,
+            'size': size,
+            'oldest': min(fetched) if fetched else None,
+            'newest': max(fetched) if fetched else None,
+        }
+
+    def prune(self, max_age=None, max_size=None):
+        """
+        Delete pages fetched over max_age seconds ago, then the oldest pages beyond max_size bytes.
+
+        Returns the number of pages deleted and the bytes they took up.
+        """
+        cutoff = time.time() - max_age if max_age is not None else None
+        # newest first, so the oldest are the ones beyond the limit
+        entries = sorted(self.get_entries(), key=lambda e: e[1] or 0, reverse=True)
+        kept_size = 0
+        pruned = []
+        for key, fetched, size in entries:
+            if cutoff is not None and (fetched or 0) < cutoff:
+                pruned.append((key, size))
+            elif max_size is not None and kept_size + size > max_size:
+                # evict everything older, too, so no page outlives a newer one
+                max_size = kept_size
+                pruned.append((key, size))
+            else:
+                kept_size += size
+        for key, size in pruned:
+            self.delete(key)
+        self.save()
+        return len(pruned), sum(size for key, size in pruned)
+
+    def save(self):
+        """
+        Write any pending changes to disk.
+        """
+        pass
+
+    def close(self):
+        """
+        Write any pending changes to disk and release the cache's resources.
+        """
+        self.save()
+
+
+class ScraperCache(BaseScraperCache):
+    """
+    Caches pages as files in a directory, indexed by URL in index.json.
+    """
+    index_name = 'index.json'
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, self.index_name)
+        self.lock = threading.Lock()
+        self.index = self.load_index()
+        self.changed = False
+
+    def load_index(self):
+        """
+        Return the index from disk, or an empty one if there isn't one.
+        """
+        try:
+            with io.open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def save(self):
+        """
+        Write the index to disk, if it changed.
+
+        It's written to a temporary file first, then renamed, so a partly
+        written index never replaces a complete one.
+        """
+        with self.lock:
+            if not self.changed:
+                return
+            data = json.dumps(self.index, indent=2, sort_keys=True)
+            self.changed = False
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.json')
+        with io.open(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.rename(temp_path, self.index_path)
+
+    def get_path(self, url):
+        """
+        Return the path of the URL's cached file.
+        """
+        return os.path.join(self.cache_dir, url2pathname(self.get_key(url)))
+
+    def exists(self, url):
+        """
+        Return True if the URL's page is cached.
+        """
+        return os.path.exists(self.get_path(url))
+
+    def get_metadata(self, url):
+        """
+        Return the index entry of the URL, or an empty dict if it has none.
+        """
+        with self.lock:
+            return dict(self.index.get(self.get_key(url), {}))
+
+    def read(self, url):
+        """
+        Return the content of the URL's cached page.
+        """
+        with io.open(self.get_path(url), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def write(self, url, content, headers=None):
+        """
+        Cache the content of the URL's page, with the validators in the response headers.
+        """
+        path = self.get_path(url)
+        subdir = os.path.dirname(path)
+        try:
+            os.makedirs(subdir)
+        except OSError:
+            # another worker may have just made it
+            if not os.path.isdir(subdir):
+                raise
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        fetched = time.time()
+        with self.lock:
+            key = self.get_key(url)
+            self.index[key] = self.make_metadata(
+                self.index.get(key, {}),
+                content,
+                headers,
+                fetched,
+            )
+            self.changed = True
+
+    def touch(self, url):
+        """
+        Record that the URL's cached page was just revalidated.
+        """
+        with self.lock:
+            metadata = self.index.setdefault(self.get_key(url), {})
+            metadata['fetched'] = time.time()
+            self.changed = True
+
+    def get_entries(self):
+        """
+        Yield the key, fetch time and size of each cached page.
+
+        Pages cached before the index existed are found by scanning the
+        cache directory, and are taken to have been fetched when their
+        files were last modified.
+        """
+        with self.lock:
+            index = list(self.index.items())
+        indexed_paths = set()
+        for key, metadata in index:
+            path = os.path.normpath(self.get_path(key))
+            indexed_paths.add(path)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            yield key, metadata.get('fetched'), size
+
+        for dir_path, dir_names, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                path = os.path.normpath(os.path.join(dir_path, file_name))
+                if path in indexed_paths or self.is_own_file(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = pathname2url(os.path.relpath(path, self.cache_dir))
+                yield key, stat.st_mtime, stat.st_size
+
+    def is_own_file(self, path):
+        """
+        Return True if the path is of one of the cache's own files, rather than a cached page.
+
+        That's the index, temporary copies of it and any SQLite cache kept
+        in the same directory.
+        """
+        if os.path.dirname(path) != os.path.normpath(self.cache_dir):
+            return False
+        file_name = os.path.basename(path)
+        return file_name.endswith('.json') or file_name.startswith(SQLiteScraperCache.file_name)
+
+    def delete(self, key):
+        """
+        Delete the page stored under the key.
+        """
+        try:
+            os.remove(self.get_path(key))
+        except OSError:
+            pass
+        with self.lock:
+            self.index.pop(key, None)
+            self.changed = True
+
+
+class SQLiteScraperCache(BaseScraperCache):
+    """
+    Caches pages compressed in a single SQLite database, keyed by normalized URL.
+
+    Changes are committed when the cache is saved.
+    """
+    file_name = 'cache.sqlite3'
+
+    def __init__(self, cache_dir, compress_level=6):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, self.file_name)
+        self.compress_level = compress_level
+        self.lock = threading.Lock()
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # shared by the scraper's workers, which take turns with the lock
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL;')
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched REAL,
+                digest TEXT,
+                changed REAL
+            );
+            """
+        )
+        self.connection.commit()
+
+    def get_key(self, url):
+        """
+        Return the key the URL's page is stored under.
+
+        The scheme and host are lowercased, the query string is sorted and
+        any fragment or surrounding slashes are dropped.
+        """
+        parts = urlsplit(url.strip())
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit(
+            (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, '')
+        ).strip('/')
+
+    def get_path(self, url):
+        """
+        Return where the URL's page is stored, for logging.
+        """
+        return '{}:{}'.format(self.path, self.get_key(url))
+
+    def exists(self, url):
+        """
+        Return True if the URL's page is cached.
+        """
+        with self.lock:
+            return self.connection.execute(
+                'SELECT 1 FROM pages WHERE key = ?;',
+                (self.get_key(url),)
+            ).fetchone() is not None
+
+    def get_metadata(self, url):
+        """
+        Return the metadata of the URL's page, or an empty dict if it isn't cached.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT etag, last_modified, fetched, digest, changed FROM pages WHERE key = ?;',
+                (self.get_key(url),)
+            ).fetchone()
+        if not row:
+            return {}
+        return dict(zip(('etag', 'last_modified', 'fetched', 'digest', 'changed'), row))
+
+    def read(self, url):
+        """
+        Return the content of the URL's cached page.
+
+        Raises KeyError if it isn't cached.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT content FROM pages WHERE key = ?;',
+                (self.get_key(url),)
+            ).fetchone()
+        if not row:
+            raise KeyError(url)
+        return zlib.decompress(bytes(row[0])).decode('utf-8')
+
+    def write(self, url, content, headers=None):
+        """
+        Cache the content of the URL's page, with the validators in the response headers.
+        """
+        data = zlib.compress(content.encode('utf-8'), self.compress_level)
+        key = self.get_key(url)
+        fetched = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT digest, changed FROM pages WHERE key = ?;',
+                (key,)
+            ).fetchone()
+            previous = dict(zip(('digest', 'changed'), row)) if row else {}
+            metadata = self.make_metadata(previous, content, headers, fetched)
+            self.connection.execute(
+                """
+                INSERT OR REPLACE INTO pages
+                (key, content, size, etag, last_modified, fetched, digest, changed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+                """,
+                (
+                    key,
+                    sqlite3.Binary(data),
+                    len(data),
+                    metadata['etag'],
+                    metadata['last_modified'],
+                    metadata['fetched'],
+                    metadata['digest'],
+                    metadata['changed'],
+                )
+            )
+
+    def touch(self, url):
+        """
+        Record that the URL's cached page was just revalidated.
+        """
+        with self.lock:
+            self.connection.execute(
+                'UPDATE pages SET fetched = ? WHERE key = ?;',
+                (time.time(), self.get_key(url))
+            )
+
+    def get_entries(self):
+        """
+        Yield the key, fetch time and compressed size of each cached page.
+        """
+        with self.lock:
+            rows = self.connection.execute('SELECT key, fetched, size FROM pages;').fetchall()
+        for row in rows:
+            yield row
+
+    def delete(self, key):
+        """
+        Delete the page stored under the key.
+        """
+        with self.lock:
+            self.connection.execute('DELETE FROM pages WHERE key = ?;', (key,))
+
+    def prune(self, max_age=None, max_size=None):
+        """
+        Delete pages fetched over max_age seconds ago, then the oldest pages beyond max_size bytes.
+
+        The database is then compacted. Returns the number of pages deleted
+        and the bytes they took up.
+        """
+        pruned = super(SQLiteScraperCache, self).prune(max_age=max_age, max_size=max_size)
+        if pruned[0]:
+            with self.lock:
+                self.connection.execute('VACUUM;')
+        return pruned
+
+    def save(self):
+        """
+        Commit any pending changes.
+        """
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        """
+        Commit any pending changes and close the database.
+        """
+        self.save()
+        with self.lock:
+            self.connection.close()
+
+
+# Cache classes by the name of their backend
+CACHE_BACKENDS = {
+    'files': ScraperCache,
+    'sqlite': SQLiteScraperCache,
+}
+
+
+def get_cache(backend, cache_dir):
+    """
+    Return a cache of scraped pages in cache_dir, stored with the named backend.
+    """
+    return CACHE_BACKENDS[backend](cache_dir)
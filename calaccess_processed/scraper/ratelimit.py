@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Token bucket rate limiting for requests made from many threads.
+"""
+import time
+import threading
+from six.moves.urllib.parse import urlparse
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket.
+
+    Tokens are added at `rate` per second, up to `capacity`. Each call to
+    acquire() takes a token, waiting until one is available.
+    """
+    def __init__(self, rate, capacity=1, clock=time.time, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        self.rate = float(rate)
+        self.capacity = float(max(capacity, 1))
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token, and return the number of seconds until it's available.
+
+        The bucket can go into debt, so waiting threads are served in the
+        order they reserved their tokens.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate,
+            )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """
+        Take a token, waiting until it's available.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+
+
+class RateLimiter(object):
+    """
+    Limits the rate of requests to each host with its own TokenBucket.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, url):
+        """
+        Return the TokenBucket for the URL's host.
+        """
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self.buckets[host]
+
+    def wait(self, url):
+        """
+        Wait until a request can be made to the URL's host.
+        """
+        self.get_bucket(url).acquire()
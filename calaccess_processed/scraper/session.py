@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pooled HTTP sessions shared by the scrapers.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# Sessions by pool size
+# Kept for the life of the process, so every scraper run by a
+# command like processcalaccessdata reuses the same connections.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Response statuses worth retrying
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+def get_session(pool_size=10):
+    """
+    Return a requests Session with a keep-alive connection pool.
+
+    The same session is returned for the same pool size. requests.Session
+    is safe to share between the threads of a scraper as long as its
+    settings aren't changed.
+
+    The session doesn't retry failed requests itself. Scrapers retry them
+    in ScrapeCommand.get_url, so every attempt waits on the rate limiter.
+    """
+    with _sessions_lock:
+        if pool_size not in _sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[pool_size] = session
+        return _sessions[pool_size]
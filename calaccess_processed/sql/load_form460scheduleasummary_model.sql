@@ -9,9 +9,7 @@ SELECT
     summary_version.itemized_contributions,
     summary_version.unitemized_contributions,
     summary_version.total_contributions
-FROM calaccess_processed_form460filing filing
-JOIN calaccess_processed_form460filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+FROM calaccess_processed_latestfilingversion filing
 JOIN calaccess_processed_form460scheduleasummaryversion summary_version
-ON filing_version.id = summary_version.filing_version_id;
+ON filing.filing_version_id = summary_version.filing_version_id
+WHERE filing.form = 'F460';
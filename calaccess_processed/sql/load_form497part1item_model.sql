@@ -39,9 +39,7 @@ SELECT
     item_version.contributor_employer,
     item_version.contributor_occupation,
     item_version.contributor_is_self_employed
-FROM calaccess_processed_form497filing filing
-JOIN calaccess_processed_form497filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+FROM calaccess_processed_latestfilingversion filing
 JOIN calaccess_processed_form497part1itemversion item_version
-ON filing_version.id = item_version.filing_version_id;
\ No newline at end of file
+ON filing.filing_version_id = item_version.filing_version_id
+WHERE filing.form = 'F497';
\ No newline at end of file
@@ -31,7 +31,7 @@ INSERT INTO calaccess_processed_form501filing (
 )
 SELECT
     f501.filing_id,
-    latest.amendment_count,
+    latest.amend_id,
     f501.date_filed,
     f501.statement_type,
     f501.filer_id,
@@ -59,12 +59,7 @@ SELECT
     f501.limit_not_exceeded_election_date,
     f501.personal_funds_contrib_date,
     f501.executed_on
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_form501filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_latestfilingversion latest
 JOIN calaccess_processed_form501filingversion f501
-ON latest.filing_id = f501.filing_id
-AND latest.amendment_count = f501.amend_id;
+ON latest.filing_version_id = f501.id
+WHERE latest.form = 'F501';
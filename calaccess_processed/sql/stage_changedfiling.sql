@@ -0,0 +1,15 @@
+DROP TABLE IF EXISTS calaccess_processed_changedfiling;
+
+CREATE UNLOGGED TABLE calaccess_processed_changedfiling AS
+SELECT COALESCE(cur.filing_id, prev.filing_id) AS filing_id
+-- the digest of each filing's raw data rows now
+FROM calaccess_processed_newfilingdigest AS cur
+-- and as of the last load that finished
+FULL OUTER JOIN calaccess_processed_filingdigest AS prev
+ON cur.filing_id = prev.filing_id
+-- added, changed in any table or removed since the last load
+WHERE cur.digest IS DISTINCT FROM prev.digest;
+
+ALTER TABLE calaccess_processed_changedfiling ADD PRIMARY KEY (filing_id);
+
+ANALYZE calaccess_processed_changedfiling;
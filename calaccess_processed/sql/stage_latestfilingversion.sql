@@ -0,0 +1,51 @@
+-- truncate rather than drop, since materialized views may depend on the table
+CREATE UNLOGGED TABLE IF NOT EXISTS calaccess_processed_latestfilingversion (
+    filing_id integer NOT NULL,
+    form text NOT NULL,
+    amend_id integer NOT NULL,
+    filing_version_id integer NOT NULL,
+    PRIMARY KEY (form, filing_id)
+);
+
+-- CREATE INDEX IF NOT EXISTS needs Postgres 9.5
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_indexes
+        WHERE schemaname = current_schema()
+        AND indexname = 'calaccess_processed_latestfilingversion_version_idx'
+    ) THEN
+        CREATE UNIQUE INDEX calaccess_processed_latestfilingversion_version_idx
+        ON calaccess_processed_latestfilingversion (form, filing_version_id);
+    END IF;
+END
+$$;
+
+TRUNCATE calaccess_processed_latestfilingversion;
+
+-- map each filing to the most recent amendment of it, once for all loaders
+INSERT INTO calaccess_processed_latestfilingversion (
+    filing_id,
+    form,
+    amend_id,
+    filing_version_id
+)
+SELECT DISTINCT ON (form, filing_id)
+    filing_id,
+    form,
+    amend_id,
+    filing_version_id
+FROM (
+    SELECT filing_id, 'F460'::text AS form, amend_id, id AS filing_version_id
+    FROM calaccess_processed_form460filingversion
+    UNION ALL
+    SELECT filing_id, 'F497'::text AS form, amend_id, id AS filing_version_id
+    FROM calaccess_processed_form497filingversion
+    UNION ALL
+    SELECT filing_id, 'F501'::text AS form, amend_id, id AS filing_version_id
+    FROM calaccess_processed_form501filingversion
+) AS filing_version
+ORDER BY form, filing_id, amend_id DESC;
+
+ANALYZE calaccess_processed_latestfilingversion;
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Base classes for tests that load the processed data models.
+"""
+import os
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from calaccess_raw import get_test_download_directory
+
+
+def load_raw_test_data():
+    """
+    Load calaccess_raw's test data into the raw data tables.
+    """
+    test_tsv_dir = os.path.join(get_test_download_directory(), 'tsv')
+    os.path.exists(test_tsv_dir) or os.makedirs(test_tsv_dir)
+    call_command("updatecalaccessrawdata", verbosity=0, test_data=True, noinput=True)
+
+
+class SchemaTestMixin(object):
+    """
+    Methods for inspecting the indexes and constraints of database tables.
+    """
+    def get_index_names(self, db_table):
+        """
+        Return the set of names of the indexes on the database table.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'SELECT indexname FROM pg_indexes '
+                'WHERE schemaname = current_schema() AND tablename = %s;',
+                [db_table],
+            )
+            return set(name for name, in c.fetchall())
+
+    def get_constraints(self, db_table):
+        """
+        Return a dict mapping the names of the table's constraints to whether they're validated.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'SELECT conname, convalidated FROM pg_constraint '
+                'WHERE conrelid = %s::regclass;',
+                ['"%s"' % db_table],
+            )
+            return dict(c.fetchall())
+
+    def get_schema(self, model_list):
+        """
+        Return a dict mapping each model's table to its index names and constraints.
+        """
+        return dict(
+            (
+                m._meta.db_table,
+                (self.get_index_names(m._meta.db_table), self.get_constraints(m._meta.db_table)),
+            ) for m in model_list
+        )
+
+
+class RawDataTestCase(SchemaTestMixin, TestCase):
+    """
+    A test case with calaccess_raw's test data loaded into the raw data tables.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Load the raw test data once for all the tests in the case.
+        """
+        load_raw_test_data()
+
+
+class RawDataTransactionTestCase(SchemaTestMixin, TransactionTestCase):
+    """
+    A test case with calaccess_raw's test data committed to the raw data tables.
+
+    For testing code that works on more than one database connection at
+    once, which can't see the uncommitted data of a TestCase.
+    """
+    def setUp(self):
+        """
+        Load the raw test data before each test, since each one's flushed afterward.
+        """
+        load_raw_test_data()
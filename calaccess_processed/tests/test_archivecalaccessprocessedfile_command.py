@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the archivecalaccessprocessedfile management command.
+"""
+import hashlib
+from unittest import skipUnless
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from calaccess_raw.models import RawDataVersion
+from calaccess_processed.management.commands.archivecalaccessprocessedfile import (
+    get_content_digest,
+    write_to_field_file,
+)
+from calaccess_processed.models import FilerIDValue, Form501FilingVersion
+from calaccess_processed.models.tracking import ProcessedDataVersion
+from .base import RawDataTestCase
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ContentDigestTest(TestCase):
+    """
+    Test the digests that decide whether an archived file can be reused.
+    """
+    def create_rows(self):
+        """
+        Create the same pair of FilerIDValue rows.
+        """
+        FilerIDValue.objects.create(
+            table_name='FILERS_CD',
+            column_name='FILER_ID',
+            value='1',
+            occur_count=2,
+        )
+        FilerIDValue.objects.create(
+            table_name='FILERS_CD',
+            column_name='FILER_ID',
+            value='2',
+            occur_count=1,
+        )
+
+    def get_digest(self):
+        """
+        Return the digest of the FilerIDValue table.
+        """
+        with connection.cursor() as c:
+            return get_content_digest(c, FilerIDValue._meta.db_table)
+
+    def test_unchanged_rows(self):
+        """
+        Test that the same rows give the same digest, in any order.
+        """
+        self.create_rows()
+        digest = self.get_digest()
+        self.assertEqual(digest, self.get_digest())
+
+        # re-write the rows in the opposite order, keeping their ids
+        rows = list(FilerIDValue.objects.order_by('-id'))
+        FilerIDValue.objects.all().delete()
+        FilerIDValue.objects.bulk_create(rows)
+        self.assertEqual(digest, self.get_digest())
+
+    def test_sequence_advance(self):
+        """
+        Test that re-loading the same rows under new ids changes the digest.
+
+        Truncating the table doesn't reset its id sequence, so this is what
+        a full load does to unchanged data. An archive written before it
+        can't be reused, since its ids don't match the other files.
+        """
+        self.create_rows()
+        digest = self.get_digest()
+        old_ids = set(FilerIDValue.objects.values_list('id', flat=True))
+
+        with connection.cursor() as c:
+            c.execute('TRUNCATE TABLE "%s";' % FilerIDValue._meta.db_table)
+        self.create_rows()
+
+        self.assertFalse(old_ids & set(FilerIDValue.objects.values_list('id', flat=True)))
+        self.assertNotEqual(digest, self.get_digest())
+
+
+class SeekingFieldFile(object):
+    """
+    A stand-in for a FieldFile whose storage backend seeks to find the size of what it saves.
+    """
+    storage = None
+
+    def save(self, name, content, save=True):
+        """
+        Keep the content, reading it after finding its size.
+        """
+        content.seek(0, 2)
+        self.size = content.tell()
+        content.seek(0)
+        self.data = content.read()
+
+
+class WriteToFieldFileTest(SimpleTestCase):
+    """
+    Test saving written data to storage backends that can't stream.
+    """
+    def test_seeking_storage(self):
+        """
+        Test that a backend that seeks gets all the data written, and the size and hash are right.
+        """
+        field_file = SeekingFieldFile()
+        hasher = hashlib.sha256()
+        size = write_to_field_file(
+            lambda f: f.write(b'a,b\n1,2\n'),
+            field_file,
+            'test.csv',
+            hasher=hasher,
+        )
+        self.assertEqual(field_file.data, b'a,b\n1,2\n')
+        self.assertEqual(field_file.size, size)
+        self.assertEqual(size, 8)
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(b'a,b\n1,2\n').hexdigest())
+
+
+@skipUnless(pyarrow, 'pyarrow is not installed')
+class ParquetArchiveTest(RawDataTestCase):
+    """
+    Archive a .parquet file alongside the .csv file.
+    """
+    model = Form501FilingVersion
+
+    def test_parquet(self):
+        """
+        Test that the .parquet file has every row, typed like the model's fields.
+        """
+        self.model.objects.load_raw_data()
+        version = ProcessedDataVersion.objects.create(
+            raw_version=RawDataVersion.objects.latest('release_datetime'),
+        )
+        call_command(
+            'archivecalaccessprocessedfile',
+            'calaccess_processed',
+            self.model._meta.object_name,
+            parquet=True,
+            verbosity=0,
+        )
+        processed_file = version.files.get(file_name=self.model._meta.object_name)
+        self.assertTrue(processed_file.file_archive)
+        self.assertEqual(processed_file.parquet_size, processed_file.parquet_archive.size)
+
+        table = pyarrow.parquet.read_table(processed_file.parquet_archive.path)
+        self.assertEqual(table.num_rows, self.model.objects.count())
+        self.assertEqual(
+            table.schema.names,
+            [f.column for f in self.model._meta.concrete_fields],
+        )
+        self.assertEqual(str(table.schema.field('amend_id').type), 'int32')
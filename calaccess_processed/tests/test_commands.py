@@ -4,14 +4,17 @@
 Unittests for management commands.
 """
 import os
+import shutil
+import tempfile
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from datetime import date
-from django.test import TestCase, override_settings
+from django.test import SimpleTestCase, TestCase, override_settings
 from calaccess_raw import get_test_download_directory
 from calaccess_processed.management.commands import (
     CalAccessCommand,
     LoadOCDModelsCommand,
+    ScrapeCommand,
 )
 from calaccess_processed.models import (
     ScrapedCandidate,
@@ -126,6 +129,14 @@ class ProcessedDataCommandsTest(TestCase):
         c.failure("")
         c.duration()
 
+    def test_scrape_command_options(self):
+        """
+        Test that scrapers reject options their workers can't run with.
+        """
+        for options in ({'rate': 0}, {'rate': -1}, {'workers': 0}, {'pool_size': 0}):
+            with self.assertRaises(CommandError):
+                call_command('scrapecalaccesscandidates', verbosity=0, **options)
+
     def test_2016_primary_date(self):
         """
         Confirm correct calculation of 2016 primary date.
@@ -165,3 +176,66 @@ class ProcessedDataCommandsTest(TestCase):
             date(2010, 11, 2),
             c.get_regular_election_date(2010, 'GENERAL'),
         )
+
+
+class BatchScrapeCommand(ScrapeCommand):
+    """
+    A scraper that yields the numbers up to five, failing after them if asked.
+    """
+    def __init__(self, cache_dir, fail=False):
+        """
+        Keep the batches saved, and the cache in the given directory.
+        """
+        super(BatchScrapeCommand, self).__init__()
+        self.cache_dir = cache_dir
+        self.fail = fail
+        self.saved = []
+
+    def scrape(self):
+        """
+        Yield the numbers up to five.
+        """
+        for i in range(5):
+            yield i
+        if self.fail:
+            raise RuntimeError('Scrape failed')
+
+    def save(self, results):
+        """
+        Keep each batch of results.
+        """
+        self.saved.append(list(results))
+
+
+class ScrapeCommandTest(SimpleTestCase):
+    """
+    Save what's scraped in batches as it's scraped.
+    """
+    def setUp(self):
+        """
+        Make a temporary cache directory.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Remove the temporary cache directory.
+        """
+        shutil.rmtree(self.cache_dir)
+
+    def test_batches(self):
+        """
+        Test that results are saved a batch at a time, with what's left over saved last.
+        """
+        command = BatchScrapeCommand(self.cache_dir)
+        call_command(command, batch_size=2, verbosity=0)
+        self.assertEqual(command.saved, [[0, 1], [2, 3], [4]])
+
+    def test_failed_scrape(self):
+        """
+        Test that batches saved before a scrape fails are kept.
+        """
+        command = BatchScrapeCommand(self.cache_dir, fail=True)
+        with self.assertRaises(RuntimeError):
+            call_command(command, batch_size=2, verbosity=0)
+        self.assertEqual(command.saved, [[0, 1], [2, 3]])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the diffcalaccessprocessedversions management command.
+"""
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from django.utils.timezone import now
+from calaccess_raw.models import RawDataVersion
+from calaccess_processed.managers import get_temp_name
+from calaccess_processed.management.commands.diffcalaccessprocessedversions import Command
+from calaccess_processed.models import Form501FilingVersion
+from calaccess_processed.models.tracking import ProcessedDataFileDiff, ProcessedDataVersion
+from .base import RawDataTestCase
+
+
+class TempNameTest(SimpleTestCase):
+    """
+    Test the names of the temporary tables of archived rows.
+    """
+    def test_long_table_names(self):
+        """
+        Test that names stay within Postgres' limit, and distinct, however long the table's.
+        """
+        db_table = 'calaccess_processed_form460scheduleesubitemversion'
+        names = set()
+        for suffix in ('', 'one', 'two'):
+            for side in ('from', 'to'):
+                name = get_temp_name(side, db_table + suffix)
+                self.assertTrue(len(name) <= 63, msg=name)
+                self.assertTrue(name.startswith('%s_' % side))
+                names.add(name)
+        self.assertEqual(len(names), 6)
+
+
+class DiffCalAccessProcessedVersionsTest(RawDataTestCase):
+    """
+    Compare a version archived in files with the latest version in the database.
+    """
+    model = Form501FilingVersion
+
+    def setUp(self):
+        """
+        Archive a version of the model, then change, remove and add a row of it.
+        """
+        self.model.objects.load_raw_data()
+        raw_version = RawDataVersion.objects.latest('release_datetime')
+        self.from_version = ProcessedDataVersion.objects.create(
+            raw_version=raw_version,
+            process_start_datetime=now() - timedelta(days=1),
+            process_finish_datetime=now() - timedelta(days=1),
+        )
+        call_command(
+            'archivecalaccessprocessedfile',
+            'calaccess_processed',
+            self.model._meta.object_name,
+            verbosity=0,
+        )
+        self.archived_count = self.model.objects.count()
+
+        changed, removed, added = self.model.objects.order_by('filing_id', 'amend_id')[:3]
+        self.assertTrue(added)
+        changed.last_name = 'CHANGED'
+        changed.save()
+        removed.delete()
+        added.pk = None
+        added.amend_id = 999
+        added.save()
+
+        # a copy of the raw version, released a day later
+        next_raw_version = RawDataVersion.objects.get(pk=raw_version.pk)
+        next_raw_version.pk = None
+        next_raw_version.release_datetime += timedelta(days=1)
+        next_raw_version.save()
+        self.to_version = ProcessedDataVersion.objects.create(
+            raw_version=next_raw_version,
+            process_start_datetime=now(),
+        )
+
+    def test_load_archive(self):
+        """
+        Test that loading the archived version gets back the archived rows.
+        """
+        command = Command()
+        command.verbosity = 0
+        command.temp_tables = []
+        table_name = command.load_archive(
+            self.from_version,
+            self.model,
+            get_temp_name('from', self.model._meta.db_table),
+        )
+        try:
+            self.assertEqual(command.temp_tables, [table_name])
+            with connection.cursor() as c:
+                c.execute('SELECT COUNT(*) FROM "%s";' % table_name)
+                self.assertEqual(c.fetchone()[0], self.archived_count)
+        finally:
+            command.drop_temp_tables(command.temp_tables)
+
+    def test_diff(self):
+        """
+        Test that rows are matched on their natural keys across versions.
+        """
+        call_command('diffcalaccessprocessedversions', self.model._meta.object_name, verbosity=0)
+        diff = ProcessedDataFileDiff.objects.get(
+            from_version=self.from_version,
+            to_version=self.to_version,
+            file_name=self.model._meta.object_name,
+        )
+        self.assertTrue(diff.process_finish_datetime)
+        self.assertEqual(diff.added_count, 1)
+        self.assertEqual(diff.changed_count, 1)
+        self.assertEqual(diff.removed_count, 1)
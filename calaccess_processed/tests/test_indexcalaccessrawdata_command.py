@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the indexcalaccessrawdata management command.
+"""
+from django.core.management import call_command
+from calaccess_processed.management.commands.indexcalaccessrawdata import Command
+from calaccess_processed.models import Form460FilingVersion, Form460ScheduleAItemVersion
+from .base import RawDataTransactionTestCase
+
+
+class IndexCalAccessRawDataTest(RawDataTransactionTestCase):
+    """
+    Index the raw data tables, load processed models from them and drop the indexes again.
+    """
+    model_list = [Form460FilingVersion, Form460ScheduleAItemVersion]
+
+    def load(self):
+        """
+        Load the models from scratch and return a dict mapping each one's name to its number of rows.
+        """
+        call_command('loadcalaccessfilingmodels', verbosity=0, restart=True)
+        return dict((m._meta.object_name, m.objects.count()) for m in self.model_list)
+
+    def get_missing_indexes(self):
+        """
+        Return the list of indexes the command creates that aren't on their tables.
+        """
+        return [
+            name for name, table, columns in Command().get_index_list()
+            if name not in self.get_index_names(table)
+        ]
+
+    def test_create_and_drop(self):
+        """
+        Test that the indexes are created, once, don't change what's loaded and can be dropped.
+        """
+        # indexes outlive the rows flushed after each test, so start without them
+        call_command('indexcalaccessrawdata', verbosity=0, drop=True)
+        expected_counts = self.load()
+        self.assertTrue(all(expected_counts.values()))
+
+        call_command('indexcalaccessrawdata', verbosity=0, workers=2)
+        self.assertEqual(self.get_missing_indexes(), [])
+        # indexes that already exist are skipped
+        call_command('indexcalaccessrawdata', verbosity=0, workers=2)
+        self.assertEqual(self.load(), expected_counts)
+
+        call_command('indexcalaccessrawdata', verbosity=0, drop=True)
+        self.assertEqual(
+            len(self.get_missing_indexes()),
+            len(Command().get_index_list()),
+        )
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the loadcalaccessfilingmodels management command.
+"""
+from unittest import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from calaccess_processed.management.commands.loadcalaccessfilingmodels import (
+    CHANGED_FILING_CONDITION,
+    Command,
+)
+from calaccess_processed.models import (
+    Form460Filing,
+    Form460FilingVersion,
+    Form460ScheduleAItem,
+    Form460ScheduleAItemVersion,
+    Form501FilingVersion,
+    ProcessedDataFile,
+    ProcessedDataVersion,
+)
+from .base import RawDataTestCase, RawDataTransactionTestCase
+
+
+class LoadCalAccessFilingModelsCommandTest(TestCase):
+    """
+    Run and test methods of the loadcalaccessfilingmodels command.
+    """
+    def test_version_model_dependencies(self):
+        """
+        Test .get_model_dependencies() on version models.
+        """
+        dependencies = Command().get_model_dependencies([
+            Form460FilingVersion,
+            Form460ScheduleAItemVersion,
+        ])
+        assert dependencies[Form460FilingVersion] == set()
+        assert dependencies[Form460ScheduleAItemVersion] == set([
+            Form460FilingVersion,
+        ])
+
+    def test_filing_model_dependencies(self):
+        """
+        Test .get_model_dependencies() on filing models.
+        """
+        dependencies = Command().get_model_dependencies([
+            Form460ScheduleAItem,
+            Form460Filing,
+        ])
+        assert dependencies[Form460Filing] == set()
+        assert dependencies[Form460ScheduleAItem] == set([Form460Filing])
+
+    def test_models_loaded_as_views(self):
+        """
+        Test .loads_as_view() on item and filing models.
+        """
+        command = Command()
+        command.views = True
+        assert command.loads_as_view(Form460ScheduleAItem)
+        assert not command.loads_as_view(Form460Filing)
+        assert not command.loads_as_view(Form460ScheduleAItemVersion)
+
+
+class IncrementalLoadTest(RawDataTestCase):
+    """
+    Find and re-load the filings changed in the raw data.
+    """
+    def setUp(self):
+        """
+        Load the Form 460 filing and Schedule A versions, and save their filings' digests.
+        """
+        self.command = Command()
+        self.command.verbosity = 0
+        self.command.incremental = False
+        self.command.load_staging_tables([Form460FilingVersion])
+        Form460FilingVersion.objects.load_raw_data()
+        Form460ScheduleAItemVersion.objects.load_raw_data()
+        self.command.save_filing_digests()
+
+    def get_changed_filing_ids(self):
+        """
+        Return the list of staged changed filing_ids.
+        """
+        self.command.find_changed_filings()
+        with connection.cursor() as c:
+            c.execute('SELECT filing_id FROM calaccess_processed_changedfiling;')
+            return [filing_id for filing_id, in c.fetchall()]
+
+    def test_unchanged_filings(self):
+        """
+        Test that no filing is changed if the raw data isn't.
+        """
+        self.assertEqual(self.get_changed_filing_ids(), [])
+
+    def test_changed_item(self):
+        """
+        Test that changing an item re-loads its filing and no other.
+        """
+        item = Form460ScheduleAItemVersion.objects.filter(
+            amount__isnull=False,
+        ).select_related('filing_version').first()
+        self.assertTrue(item)
+        filing_version = item.filing_version
+        unchanged_ids = set(
+            Form460ScheduleAItemVersion.objects.exclude(
+                filing_version__filing_id=filing_version.filing_id,
+            ).values_list('id', flat=True)
+        )
+
+        # change the item in the raw data, without changing its filing's cover sheet
+        with connection.cursor() as c:
+            c.execute(
+                """
+                UPDATE "RCPT_CD"
+                SET "AMOUNT" = "AMOUNT" + 1
+                WHERE "FILING_ID" = %s
+                AND "AMEND_ID" = %s
+                AND "LINE_ITEM" = %s
+                AND "FORM_TYPE" IN ('A', 'A-1');
+                """,
+                [filing_version.filing_id, filing_version.amend_id, item.line_item],
+            )
+        self.assertEqual(self.get_changed_filing_ids(), [filing_version.filing_id])
+
+        for m in [Form460ScheduleAItemVersion, Form460FilingVersion]:
+            m.objects.delete_raw_data(CHANGED_FILING_CONDITION)
+        for m in [Form460FilingVersion, Form460ScheduleAItemVersion]:
+            m.objects.load_raw_data(filing_id_condition=CHANGED_FILING_CONDITION)
+
+        # the other filings' items were left alone
+        self.assertEqual(
+            set(
+                Form460ScheduleAItemVersion.objects.exclude(
+                    filing_version__filing_id=filing_version.filing_id,
+                ).values_list('id', flat=True)
+            ),
+            unchanged_ids,
+        )
+        # and the changed item was re-loaded
+        self.assertIn(
+            item.amount + 1,
+            Form460ScheduleAItemVersion.objects.filter(
+                filing_version__filing_id=filing_version.filing_id,
+                filing_version__amend_id=filing_version.amend_id,
+                line_item=item.line_item,
+            ).values_list('amount', flat=True),
+        )
+
+
+class StagingTablesTest(RawDataTestCase):
+    """
+    Load the Form 460 filings from the staging tables shared by their loaders.
+    """
+    def setUp(self):
+        """
+        Load the Form 460 filing versions and filings.
+        """
+        command = Command()
+        command.verbosity = 0
+        command.load_staging_tables([Form460FilingVersion])
+        Form460FilingVersion.objects.load_raw_data()
+        command.load_staging_tables([Form460Filing])
+        Form460Filing.objects.load_raw_data()
+
+    def count_rows(self, sql):
+        """
+        Return the number of rows the sql query selects.
+        """
+        with connection.cursor() as c:
+            c.execute('SELECT COUNT(*) FROM (%s) AS q;' % sql)
+            return c.fetchone()[0]
+
+    def test_summary_lines(self):
+        """
+        Test that summary lines read from the pivot of SMRY_CD match the lines in SMRY_CD.
+        """
+        self.assertTrue(Form460FilingVersion.objects.exists())
+        self.assertEqual(
+            self.count_rows(
+                """
+                SELECT v.id
+                FROM calaccess_processed_form460filingversion v
+                WHERE v.total_contributions IS DISTINCT FROM (
+                    SELECT MAX(s."AMOUNT_A")
+                    FROM "SMRY_CD" s
+                    WHERE s."FILING_ID" = v.filing_id
+                    AND s."AMEND_ID" = v.amend_id
+                    AND UPPER(s."FORM_TYPE") = 'F460'
+                    AND s."LINE_ITEM" = '5'
+                )
+                """
+            ),
+            0,
+        )
+
+    def test_latest_versions(self):
+        """
+        Test that each filing is loaded from its most recent version.
+        """
+        self.assertEqual(
+            Form460Filing.objects.count(),
+            Form460FilingVersion.objects.values('filing_id').distinct().count(),
+        )
+        self.assertEqual(
+            self.count_rows(
+                """
+                SELECT f.filing_id
+                FROM calaccess_processed_form460filing f
+                JOIN (
+                    SELECT DISTINCT ON (filing_id) *
+                    FROM calaccess_processed_form460filingversion
+                    ORDER BY filing_id, amend_id DESC
+                ) AS v
+                ON v.filing_id = f.filing_id
+                WHERE v.amend_id <> f.amendment_count
+                OR v.total_contributions IS DISTINCT FROM f.total_contributions
+                """
+            ),
+            0,
+        )
+
+
+class LoadModesTest(RawDataTransactionTestCase):
+    """
+    Load all the filing models in each load mode and compare with a plain load.
+
+    Each mode should load the same rows and leave the same indexes and
+    validated constraints behind.
+    """
+    def setUp(self):
+        """
+        Load all the filing models the plain way, recording the rows loaded and the schema.
+        """
+        super(LoadModesTest, self).setUp()
+        command = Command()
+        self.model_list = command.get_models_of_type('version') + command.get_models_of_type('filing')
+        self.load()
+        self.expected_counts = self.get_counts()
+        self.expected_schema = self.get_schema(self.model_list)
+        self.assertTrue(any(self.expected_counts.values()))
+
+    def load(self, **options):
+        """
+        Run the loadcalaccessfilingmodels command from scratch with the given options.
+        """
+        options.setdefault('restart', True)
+        call_command('loadcalaccessfilingmodels', verbosity=0, **options)
+
+    def get_counts(self):
+        """
+        Return a dict mapping the name of each filing model to the number of rows loaded.
+        """
+        return dict((m._meta.object_name, m.objects.count()) for m in self.model_list)
+
+    def assertLoaded(self):
+        """
+        Assert the filing models have the rows, indexes and validated constraints of a plain load.
+        """
+        self.assertEqual(self.get_counts(), self.expected_counts)
+        self.assertEqual(self.get_schema(self.model_list), self.expected_schema)
+        for db_table, (index_names, constraints) in self.expected_schema.items():
+            self.assertTrue(all(constraints.values()), msg=db_table)
+        self.assertFalse(ProcessedDataFile.objects.filter(indexes_pending=True).exists())
+
+    def test_workers(self):
+        """
+        Test loading the models in parallel, and indexing them on several connections.
+        """
+        self.load(workers=2, index_workers=2)
+        self.assertLoaded()
+
+    def test_defer_indexes(self):
+        """
+        Test indexing all the models of each phase at once.
+        """
+        self.load(defer_indexes=True, index_workers=2)
+        self.assertLoaded()
+
+    def test_resumed_defer_indexes(self):
+        """
+        Test that a run resumed after an interrupted --defer-indexes run re-creates the dropped indexes.
+        """
+        # as if interrupted while loading Form501FilingVersion, after dropping its indexes
+        Form501FilingVersion.objects.drop_constraints_and_indexes()
+        ProcessedDataFile.objects.filter(
+            file_name='Form501FilingVersion',
+        ).update(indexes_pending=True, process_finish_datetime=None)
+        db_table = Form501FilingVersion._meta.db_table
+        self.assertNotEqual(
+            self.get_schema([Form501FilingVersion])[db_table],
+            self.expected_schema[db_table],
+        )
+
+        self.load(defer_indexes=True, restart=False)
+        self.assertLoaded()
+
+    @override_settings(CALACCESS_STORE_ARCHIVE=True)
+    def test_archive_workers(self):
+        """
+        Test archiving the loaded models on several connections at once.
+        """
+        self.load(archive_workers=2)
+        self.assertLoaded()
+        processed_files = ProcessedDataVersion.objects.latest('process_start_datetime').files
+        for m in self.model_list:
+            processed_file = processed_files.get(file_name=m._meta.object_name)
+            self.assertEqual(processed_file.records_count, self.expected_counts[m._meta.object_name])
+            self.assertTrue(processed_file.file_archive)
+            self.assertEqual(processed_file.file_size, processed_file.file_archive.size)
+
+    def test_chunk_size(self):
+        """
+        Test loading each model a range of filing_ids at a time.
+        """
+        self.load(chunk_size=1000)
+        self.assertLoaded()
+        self.assertFalse(
+            ProcessedDataFile.objects.filter(
+                file_name='Form501FilingVersion',
+                load_checkpoint__isnull=True,
+            ).exists()
+        )
+
+    def test_swap(self):
+        """
+        Test loading each model into a shadow table swapped in for its table.
+        """
+        self.load(swap=True, index_workers=2)
+        self.assertLoaded()
+
+    def test_views(self):
+        """
+        Test backing the latest-version models with materialized views.
+        """
+        self.addCleanup(call_command, 'convertcalaccessprocessedviews', verbosity=0)
+        self.load(views=True)
+        self.assertEqual(self.get_counts(), self.expected_counts)
+        self.assertTrue(Form460ScheduleAItem.objects.is_materialized_view)
+        self.assertIn(
+            '%s_pk_uniq' % Form460ScheduleAItem._meta.db_table,
+            self.get_index_names(Form460ScheduleAItem._meta.db_table),
+        )
+
+        # refreshed in place on the next load
+        self.load(views=True)
+        self.assertEqual(self.get_counts(), self.expected_counts)
+
+        # and converted back to tables by a plain load
+        self.load()
+        self.assertFalse(Form460ScheduleAItem.objects.is_materialized_view)
+        self.assertLoaded()
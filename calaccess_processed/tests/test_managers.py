@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the processed data model managers.
+"""
+import re
+from django.db import connection
+from django.db.models import Sum
+from calaccess_processed.managers import get_index_name
+from calaccess_processed.models import FilerIDValue, Form501FilingVersion
+from calaccess_processed.models.tracking import ProcessedDataFile, ProcessedDataVersion
+from calaccess_raw.models import RawDataVersion
+from .base import RawDataTestCase
+
+
+class InterruptedCheckpoint(object):
+    """
+    A load checkpoint that interrupts the load when saved after a number of chunks.
+    """
+    def __init__(self, processed_file, chunks):
+        self.processed_file = processed_file
+        self.chunks = chunks
+
+    @property
+    def load_checkpoint(self):
+        """
+        Return the processed file's checkpoint.
+        """
+        return self.processed_file.load_checkpoint
+
+    @load_checkpoint.setter
+    def load_checkpoint(self, value):
+        self.processed_file.load_checkpoint = value
+
+    def save(self):
+        """
+        Save the processed file, or fail once the chunks are used up.
+        """
+        if not self.chunks:
+            raise RuntimeError('Interrupted')
+        self.chunks -= 1
+        self.processed_file.save()
+
+
+class ChunkedLoadTest(RawDataTestCase):
+    """
+    Load a model in chunks of filing_ids, with and without interruptions.
+    """
+    model = Form501FilingVersion
+
+    def setUp(self):
+        """
+        Load the model in one go, to compare the chunked loads with.
+        """
+        self.model.objects.load_raw_data()
+        self.expected_count = self.model.objects.count()
+        self.assertTrue(self.expected_count)
+        self.model.objects.all().delete()
+
+        min_filing_id, max_filing_id = self.model.objects.get_filing_id_range()
+        # enough for four chunks
+        self.chunk_size = (max_filing_id - min_filing_id) // 4 + 1
+        self.max_filing_id = max_filing_id
+
+        version = ProcessedDataVersion.objects.create(
+            raw_version=RawDataVersion.objects.latest('release_datetime'),
+        )
+        self.processed_file = ProcessedDataFile.objects.create(
+            version=version,
+            file_name=self.model._meta.object_name,
+        )
+
+    def test_chunked_load(self):
+        """
+        Test that a chunked load loads every row and checkpoints the last chunk.
+        """
+        self.model.objects.load_raw_data(
+            chunk_size=self.chunk_size,
+            checkpoint=self.processed_file,
+        )
+        self.assertEqual(self.model.objects.count(), self.expected_count)
+        self.processed_file.refresh_from_db()
+        self.assertTrue(self.processed_file.load_checkpoint >= self.max_filing_id)
+
+    def test_resumed_load(self):
+        """
+        Test that a load interrupted after a chunk resumes without missing or repeating rows.
+        """
+        with self.assertRaises(RuntimeError):
+            self.model.objects.load_raw_data(
+                chunk_size=self.chunk_size,
+                checkpoint=InterruptedCheckpoint(self.processed_file, 1),
+            )
+        processed_file = ProcessedDataFile.objects.get(id=self.processed_file.id)
+        self.assertTrue(processed_file.load_checkpoint < self.max_filing_id)
+        self.assertTrue(self.model.objects.count() < self.expected_count)
+        self.assertFalse(
+            self.model.objects.filter(filing_id__gt=processed_file.load_checkpoint).exists()
+        )
+
+        self.model.objects.load_raw_data(
+            chunk_size=self.chunk_size,
+            checkpoint=processed_file,
+        )
+        self.assertEqual(self.model.objects.count(), self.expected_count)
+
+    def test_source_table_indexed(self):
+        """
+        Test that the chunked load leaves the raw table it reads indexed on filing_id.
+        """
+        self.model.objects.load_raw_data(chunk_size=self.chunk_size)
+        self.assertIn(
+            get_index_name('F501_502_CD', ['FILING_ID']),
+            self.get_index_names('F501_502_CD'),
+        )
+
+
+class FilerIDValueLoadTest(RawDataTestCase):
+    """
+    Load the FilerIDValue research model.
+    """
+    def test_occur_counts(self):
+        """
+        Test that each column's values are counted by that column's own test.
+
+        Some columns count any value that isn't null, empty strings included,
+        and others only values that aren't empty.
+        """
+        FilerIDValue.objects.load_raw_data()
+
+        columns = []
+        for statement in FilerIDValue.objects.raw_data_load_query.split(';'):
+            table = re.search(r'FROM "(\w+)"', statement)
+            if table:
+                columns.extend(
+                    (table.group(1), column, condition) for column, condition in re.findall(
+                        r"\('(\w+)', \"\w+\"::varchar, (.+)\)",
+                        statement,
+                    )
+                )
+        self.assertTrue(columns)
+
+        for table, column, condition in columns:
+            with connection.cursor() as c:
+                c.execute('SELECT COUNT(*) FROM "%s" WHERE %s;' % (table, condition))
+                expected_count = c.fetchone()[0]
+            loaded_count = FilerIDValue.objects.filter(
+                table_name=table,
+                column_name=column,
+            ).aggregate(total=Sum('occur_count'))['total'] or 0
+            self.assertEqual(loaded_count, expected_count, msg='%s.%s' % (table, column))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the partitioncalaccessprocessedfiles management command.
+"""
+import json
+import hashlib
+from django.core.management import call_command
+from django.db.models import Sum
+from calaccess_raw.models import RawDataVersion
+from calaccess_processed.models import Form460FilingVersion
+from calaccess_processed.models.tracking import ProcessedDataVersion
+from .base import RawDataTestCase
+
+
+class PartitionCalAccessProcessedFilesTest(RawDataTestCase):
+    """
+    Partition a loaded filing model by election cycle and filer.
+    """
+    model = Form460FilingVersion
+
+    def setUp(self):
+        """
+        Load the model into a new processed version.
+        """
+        self.model.objects.load_raw_data()
+        self.assertTrue(self.model.objects.exists())
+        self.version = ProcessedDataVersion.objects.create(
+            raw_version=RawDataVersion.objects.latest('release_datetime'),
+        )
+
+    def test_partitions(self):
+        """
+        Test that the partitions hold every row once, and match the manifest.
+        """
+        call_command(
+            'partitioncalaccessprocessedfiles',
+            self.model._meta.object_name,
+            filer_buckets=4,
+            verbosity=0,
+        )
+        processed_file = self.version.files.get(file_name=self.model._meta.object_name)
+        partitions = processed_file.partitions.all()
+        self.assertTrue(partitions.exists())
+        self.assertEqual(
+            partitions.aggregate(total=Sum('records_count'))['total'],
+            self.model.objects.count(),
+        )
+        for p in partitions:
+            # filings without a filer_id are in no bucket
+            self.assertIn(p.filer_bucket, [None, 0, 1, 2, 3])
+            with p.file_archive.storage.open(p.file_archive.name, 'rb') as f:
+                content = f.read()
+            self.assertEqual(p.file_size, len(content))
+            self.assertEqual(p.sha256, hashlib.sha256(content).hexdigest())
+
+        self.version.refresh_from_db()
+        with self.version.partition_manifest.storage.open(self.version.partition_manifest.name, 'rb') as f:
+            manifest = json.loads(f.read().decode('utf-8'))
+        self.assertEqual(
+            sorted(p['path'] for p in manifest['files'][self.model._meta.object_name]),
+            sorted(p.file_archive.name for p in partitions),
+        )
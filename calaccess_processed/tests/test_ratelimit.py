@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the scraper's rate limiter.
+"""
+from unittest import TestCase
+from calaccess_processed.scraper.ratelimit import RateLimiter, TokenBucket
+
+
+class FakeClock(object):
+    """
+    A clock that only moves when something sleeps.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        """
+        Return the current time.
+        """
+        return self.now
+
+    def sleep(self, seconds):
+        """
+        Move the clock forward.
+        """
+        self.now += seconds
+
+
+class TokenBucketTest(TestCase):
+    """
+    Test the TokenBucket.
+    """
+    def test_rate(self):
+        """
+        Test that tokens are handed out at the rate, after the first burst.
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=3, clock=clock.time, sleep=clock.sleep)
+        for i in range(3):
+            bucket.acquire()
+        self.assertEqual(clock.now, 0)
+        for i in range(4):
+            bucket.acquire()
+        self.assertEqual(clock.now, 2)
+
+    def test_reservations_queue(self):
+        """
+        Test that tokens reserved at once are spaced out.
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(4, clock=clock.time, sleep=clock.sleep)
+        waits = [bucket.reserve() for i in range(3)]
+        self.assertEqual(waits, [0, 0.25, 0.5])
+
+    def test_hosts(self):
+        """
+        Test that each host gets its own bucket.
+        """
+        limiter = RateLimiter(1)
+        self.assertIs(
+            limiter.get_bucket('http://cal-access.sos.ca.gov/Campaign/'),
+            limiter.get_bucket('http://CAL-ACCESS.sos.ca.gov/Campaign/Measures/'),
+        )
+        self.assertIsNot(
+            limiter.get_bucket('http://cal-access.sos.ca.gov/'),
+            limiter.get_bucket('http://www.sos.ca.gov/'),
+        )
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the scraper's cache.
+"""
+from __future__ import unicode_literals
+import time
+import shutil
+import tempfile
+from unittest import TestCase
+from calaccess_processed.scraper.cache import ScraperCache, SQLiteScraperCache
+
+
+class ScraperCacheTest(TestCase):
+    """
+    Test the ScraperCache.
+    """
+    url = '/Campaign/Candidates/Detail.aspx?id=1234'
+
+    def setUp(self):
+        """
+        Make a temporary cache directory.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Remove the temporary cache directory.
+        """
+        shutil.rmtree(self.cache_dir)
+
+    def test_write_and_read(self):
+        """
+        Test that pages and their validators are cached and indexed.
+        """
+        cache = ScraperCache(self.cache_dir)
+        self.assertFalse(cache.exists(self.url))
+        cache.write(
+            self.url,
+            '<html>Détail</html>',
+            {'ETag': '"abc"', 'Last-Modified': 'Mon, 10 Jul 2017 18:32:00 GMT'},
+        )
+        self.assertEqual(cache.read(self.url), '<html>Détail</html>')
+        self.assertEqual(
+            cache.get_conditional_headers(self.url),
+            {
+                'If-None-Match': '"abc"',
+                'If-Modified-Since': 'Mon, 10 Jul 2017 18:32:00 GMT',
+            }
+        )
+        self.assertTrue(cache.is_fresh(self.url, 60))
+        self.assertFalse(cache.is_fresh(self.url, 0))
+
+        # the index survives a new cache
+        cache.save()
+        cache = ScraperCache(self.cache_dir)
+        self.assertEqual(cache.get_metadata(self.url)['etag'], '"abc"')
+
+    def test_unindexed_page(self):
+        """
+        Test that a cached page missing from the index is never fresh.
+        """
+        cache = ScraperCache(self.cache_dir)
+        cache.write(self.url, '<html></html>')
+        cache.index = {}
+        self.assertTrue(cache.exists(self.url))
+        self.assertFalse(cache.is_fresh(self.url, 60))
+        self.assertEqual(cache.get_conditional_headers(self.url), {})
+
+    def test_changed(self):
+        """
+        Test that rewriting a page with the same content keeps when it last changed.
+        """
+        cache = ScraperCache(self.cache_dir)
+        self.assertIsNone(cache.get_changed(self.url))
+        cache.write(self.url, '<html>1</html>')
+        changed = cache.get_changed(self.url)
+        cache.index[cache.get_key(self.url)]['changed'] = changed - 60
+        cache.write(self.url, '<html>1</html>')
+        self.assertEqual(cache.get_changed(self.url), changed - 60)
+        cache.write(self.url, '<html>2</html>')
+        self.assertGreaterEqual(cache.get_changed(self.url), changed)
+
+    def test_prune(self):
+        """
+        Test that old pages and the oldest pages beyond the size limit are pruned.
+        """
+        cache = ScraperCache(self.cache_dir)
+        for i in range(4):
+            url = '%s%s' % (self.url, i)
+            cache.write(url, 'x' * 10)
+            cache.index[cache.get_key(url)]['fetched'] = time.time() - i * 3600
+        self.assertEqual(cache.prune(max_age=7200), (2, 20))
+        self.assertEqual(cache.prune(max_size=15), (1, 10))
+        self.assertEqual(cache.get_stats()['pages'], 1)
+        self.assertTrue(cache.exists('%s0' % self.url))
+
+    def test_prune_unindexed(self):
+        """
+        Test that pages cached before the index existed are pruned, too.
+        """
+        cache = ScraperCache(self.cache_dir)
+        cache.write(self.url, 'x' * 10)
+        cache.save()
+        cache.index = {}
+        self.assertEqual(cache.get_stats()['pages'], 1)
+        self.assertEqual(cache.prune(max_size=0), (1, 10))
+        self.assertFalse(cache.exists(self.url))
+
+
+class SQLiteScraperCacheTest(TestCase):
+    """
+    Test the SQLiteScraperCache.
+    """
+    url = 'http://cal-access.sos.ca.gov/Campaign/Candidates/list.aspx?view=certified&electNav=93'
+
+    def setUp(self):
+        """
+        Make a temporary cache directory.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Remove the temporary cache directory.
+        """
+        shutil.rmtree(self.cache_dir)
+
+    def test_write_and_read(self):
+        """
+        Test that pages are stored compressed, keyed by normalized URL.
+        """
+        cache = SQLiteScraperCache(self.cache_dir)
+        content = '<html>%s</html>' % ('Détail' * 100)
+        cache.write(self.url, content, {'ETag': '"abc"'})
+        same_url = 'HTTP://Cal-Access.sos.ca.gov/Campaign/Candidates/list.aspx?electNav=93&view=certified#top'
+        self.assertTrue(cache.exists(same_url))
+        self.assertEqual(cache.read(same_url), content)
+        self.assertEqual(cache.get_conditional_headers(self.url), {'If-None-Match': '"abc"'})
+        self.assertLess(cache.get_stats()['size'], len(content))
+
+        # the pages survive a new cache
+        cache.close()
+        cache = SQLiteScraperCache(self.cache_dir)
+        self.assertEqual(cache.read(self.url), content)
+        size = cache.get_stats()['size']
+        self.assertEqual(cache.prune(max_age=0), (1, size))
+        self.assertFalse(cache.exists(self.url))
+        cache.close()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the streaming zip writer.
+"""
+import io
+import os
+import zipfile
+from unittest import TestCase
+from calaccess_processed.zipstream import (
+    ZIP_DEFLATED,
+    ZIP_STORED,
+    ZipStreamWriter,
+)
+
+
+class NonSeekableFile(io.RawIOBase):
+    """
+    A write-only file object that can't seek or tell.
+    """
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        """
+        Return True.
+        """
+        return True
+
+    def write(self, data):
+        """
+        Write the data to the buffer.
+        """
+        return self.buffer.write(data)
+
+
+class ZipStreamWriterTest(TestCase):
+    """
+    Write zip files with ZipStreamWriter and read them back with zipfile.
+    """
+    members = (
+        ('empty.csv', b''),
+        ('small.csv', b'FILING_ID,AMEND_ID\n1,0\n'),
+        ('repetitive.csv', b'1,2,3,4\n' * 200000),
+        ('random.csv', os.urandom(1024 * 512)),
+    )
+
+    def write_zip(self, **kwargs):
+        """
+        Return a zipfile.ZipFile of the test members, written with the keyword arguments.
+        """
+        f = NonSeekableFile()
+        with ZipStreamWriter(f, **kwargs) as zf:
+            zf.write_members(
+                (name, lambda data=data: io.BytesIO(data)) for name, data in self.members
+            )
+        return zipfile.ZipFile(io.BytesIO(f.buffer.getvalue()))
+
+    def assert_members(self, zf, compression):
+        """
+        Assert the zip file has the test members, intact and in order.
+        """
+        self.assertIsNone(zf.testzip())
+        self.assertEqual(zf.namelist(), [name for name, data in self.members])
+        for name, data in self.members:
+            self.assertEqual(zf.read(name), data)
+            self.assertEqual(zf.getinfo(name).compress_type, compression)
+
+    def test_deflated(self):
+        """
+        Test writing deflated members.
+        """
+        zf = self.write_zip(compression=ZIP_DEFLATED)
+        self.assert_members(zf, ZIP_DEFLATED)
+        self.assertLess(
+            zf.getinfo('repetitive.csv').compress_size,
+            zf.getinfo('repetitive.csv').file_size,
+        )
+
+    def test_stored(self):
+        """
+        Test writing stored members.
+        """
+        self.assert_members(self.write_zip(compression=ZIP_STORED), ZIP_STORED)
+
+    def test_parallel(self):
+        """
+        Test compressing several members at once, through small queues.
+        """
+        zf = self.write_zip(workers=3, chunk_size=1024, queue_size=2)
+        self.assert_members(zf, ZIP_DEFLATED)
+
+    def test_read_error(self):
+        """
+        Test that errors reading a member are raised by the writer.
+        """
+        def open_file():
+            raise IOError("Can't open file")
+
+        zf = ZipStreamWriter(io.BytesIO(), workers=2)
+        with self.assertRaises(IOError):
+            zf.write_members([
+                ('first.csv', lambda: io.BytesIO(b'1' * 1024 * 1024)),
+                ('second.csv', open_file),
+            ])
@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Write zip files to a stream, compressing members in parallel.
+
+Unlike the standard library's zipfile, the output doesn't have to be seekable
+and no member has to be on local disk: each member is read from a file object,
+compressed in its own thread and written out in order, with its sizes and CRC
+following its data in a (zip64) data descriptor.
+
+Members can be stored, deflated or compressed with Zstandard (method 93), which
+requires the optional zstandard package.
+"""
+import time
+import zlib
+import struct
+import threading
+from collections import deque
+from six.moves import queue
+from django.core.exceptions import ImproperlyConfigured
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP_ZSTANDARD = 93
+
+COMPRESSION_BY_NAME = {
+    'store': ZIP_STORED,
+    'deflate': ZIP_DEFLATED,
+    'zstd': ZIP_ZSTANDARD,
+}
+
+# Version needed to extract, by compression method
+# zip64 needs at least 4.5, Zstandard 6.3
+VERSIONS_BY_COMPRESSION = {
+    ZIP_STORED: 45,
+    ZIP_DEFLATED: 45,
+    ZIP_ZSTANDARD: 63,
+}
+
+# General purpose flags: sizes and CRC in a data descriptor, UTF-8 names
+FLAGS = 0x08 | 0x800
+
+# Unix host, zip spec version 6.3
+VERSION_MADE_BY = (3 << 8) | 63
+
+# -rw-r--r-- regular file
+EXTERNAL_ATTR = (0o100644 & 0xFFFF) << 16
+
+MAX_UINT16 = 0xFFFF
+MAX_UINT32 = 0xFFFFFFFF
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_QUEUE_SIZE = 8
+
+
+def import_zstandard():
+    """
+    Return the zstandard module.
+
+    Raises ImproperlyConfigured if zstandard isn't installed.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ImproperlyConfigured(
+            'Zstandard compression requires the zstandard package. '
+            'Install it with "pip install django-calaccess-processed-data[zstd]".'
+        )
+    return zstandard
+
+
+def get_compressor(compression, level=None):
+    """
+    Return an object with compress() and flush() methods for the compression method.
+    """
+    if compression == ZIP_STORED:
+        return StoredCompressor()
+    elif compression == ZIP_DEFLATED:
+        # raw deflate stream, no zlib header or trailer
+        return zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+            zlib.DEFLATED,
+            -15,
+        )
+    elif compression == ZIP_ZSTANDARD:
+        zstandard = import_zstandard()
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    raise ValueError("Unsupported compression method: %s" % compression)
+
+
+def get_dos_date_time(timestamp=None):
+    """
+    Return the (date, time) of the timestamp in MS-DOS format.
+    """
+    t = time.localtime(timestamp)
+    year = max(t.tm_year, 1980)
+    dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    return dos_date, dos_time
+
+
+class StoredCompressor(object):
+    """
+    A compressor that passes data through unchanged.
+    """
+    def compress(self, data):
+        """
+        Return the data.
+        """
+        return data
+
+    def flush(self):
+        """
+        Return nothing left over.
+        """
+        return b''
+
+
+class ZipMember(object):
+    """
+    A member of the zip file, compressed in a separate thread.
+
+    Compressed chunks are passed to the writing thread through a bounded
+    queue, so the compressing thread waits once queue_size chunks are
+    pending.
+    """
+    def __init__(
+        self,
+        name,
+        open_file,
+        compression,
+        level=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        queue_size=DEFAULT_QUEUE_SIZE
+    ):
+        self.name = name
+        self.open_file = open_file
+        self.compression = compression
+        self.level = level
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.compress)
+        self.thread.daemon = True
+        self.crc = 0
+        self.file_size = 0
+        self.compress_size = 0
+        self.error = None
+
+    def start(self):
+        """
+        Start compressing the member.
+        """
+        self.thread.start()
+
+    def cancel(self):
+        """
+        Stop compressing the member and wait for its thread to exit.
+        """
+        self.cancelled.set()
+        self.thread.join()
+
+    def put(self, item):
+        """
+        Add an item to the queue, unless the member is cancelled first.
+        """
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def compress(self):
+        """
+        Read the member's file object and queue its compressed data.
+        """
+        try:
+            compressor = get_compressor(self.compression, self.level)
+            f = self.open_file()
+            try:
+                while not self.cancelled.is_set():
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        break
+                    self.crc = zlib.crc32(data, self.crc) & MAX_UINT32
+                    self.file_size += len(data)
+                    compressed = compressor.compress(data)
+                    if compressed:
+                        self.put(compressed)
+                self.put(compressor.flush())
+            finally:
+                f.close()
+        except Exception as e:
+            self.error = e
+        # a None marks the end of the data
+        self.put(None)
+
+    def chunks(self):
+        """
+        Yield the compressed data, as it becomes available.
+        """
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            self.compress_size += len(chunk)
+            yield chunk
+        self.thread.join()
+        if self.error:
+            raise self.error
+
+
+class ZipStreamWriter(object):
+    """
+    Write a zip file to a file object that only has to support write().
+    """
+    def __init__(
+        self,
+        fileobj,
+        compression=ZIP_DEFLATED,
+        level=None,
+        workers=1,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        queue_size=DEFAULT_QUEUE_SIZE
+    ):
+        if compression not in VERSIONS_BY_COMPRESSION:
+            raise ValueError("Unsupported compression method: %s" % compression)
+        if compression == ZIP_ZSTANDARD:
+            import_zstandard()
+        self.fileobj = fileobj
+        self.compression = compression
+        self.level = level
+        self.workers = max(workers, 1)
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.offset = 0
+        self.central_directory = []
+        self.names = set()
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write(self, data):
+        """
+        Write bytes to the file object, keeping track of the offset.
+        """
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def write_members(self, members, on_written=None):
+        """
+        Add each (name, open_file) pair in members to the zip file.
+
+        open_file is called with no arguments, from the member's compressing
+        thread, and must return a readable file object, which is closed once
+        read. Up to self.workers members are compressed at once, and members
+        are written in order. If given, on_written is called with the member's
+        name, uncompressed and compressed size once it's written.
+        """
+        members = iter(members)
+        pending = deque()
+
+        def start_next():
+            try:
+                name, open_file = next(members)
+            except StopIteration:
+                return
+            member = ZipMember(
+                name,
+                open_file,
+                self.compression,
+                level=self.level,
+                chunk_size=self.chunk_size,
+                queue_size=self.queue_size,
+            )
+            member.start()
+            pending.append(member)
+
+        try:
+            for i in range(self.workers):
+                start_next()
+            while pending:
+                member = pending[0]
+                self.write_member(member)
+                pending.popleft()
+                start_next()
+                if on_written:
+                    on_written(member.name, member.file_size, member.compress_size)
+        except BaseException:
+            for member in pending:
+                member.cancel()
+            raise
+
+    def write_member(self, member):
+        """
+        Write the local header, data and data descriptor of a member.
+        """
+        if self.closed:
+            raise ValueError("Can't write to a closed zip file.")
+        if member.name in self.names:
+            raise ValueError("Duplicate name in zip file: %s" % member.name)
+        self.names.add(member.name)
+
+        name = member.name.encode('utf-8')
+        header_offset = self.offset
+        dos_date, dos_time = get_dos_date_time()
+        version = VERSIONS_BY_COMPRESSION[member.compression]
+
+        # sizes aren't known yet, so they're marked as zip64 and left at zero
+        extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0)
+        self.write(struct.pack(
+            '<IHHHHHIIIHH',
+            0x04034b50,
+            version,
+            FLAGS,
+            member.compression,
+            dos_time,
+            dos_date,
+            0,
+            MAX_UINT32,
+            MAX_UINT32,
+            len(name),
+            len(extra),
+        ))
+        self.write(name)
+        self.write(extra)
+
+        for chunk in member.chunks():
+            self.write(chunk)
+
+        self.write(struct.pack(
+            '<IIQQ',
+            0x08074b50,
+            member.crc,
+            member.compress_size,
+            member.file_size,
+        ))
+
+        self.central_directory.append((
+            name,
+            version,
+            member.compression,
+            dos_time,
+            dos_date,
+            member.crc,
+            member.compress_size,
+            member.file_size,
+            header_offset,
+        ))
+
+    def close(self):
+        """
+        Write the central directory and end records.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        directory_offset = self.offset
+        for (
+            name,
+            version,
+            compression,
+            dos_time,
+            dos_date,
+            crc,
+            compress_size,
+            file_size,
+            header_offset,
+        ) in self.central_directory:
+            extra = struct.pack('<HHQQQ', 0x0001, 24, file_size, compress_size, header_offset)
+            self.write(struct.pack(
+                '<IHHHHHHIIIHHHHHII',
+                0x02014b50,
+                VERSION_MADE_BY,
+                version,
+                FLAGS,
+                compression,
+                dos_time,
+                dos_date,
+                crc,
+                MAX_UINT32,
+                MAX_UINT32,
+                len(name),
+                len(extra),
+                0,
+                0,
+                0,
+                EXTERNAL_ATTR,
+                MAX_UINT32,
+            ))
+            self.write(name)
+            self.write(extra)
+        directory_size = self.offset - directory_offset
+        entries = len(self.central_directory)
+
+        # zip64 end of central directory record
+        zip64_end_offset = self.offset
+        self.write(struct.pack(
+            '<IQHHIIQQQQ',
+            0x06064b50,
+            44,
+            VERSION_MADE_BY,
+            45,
+            0,
+            0,
+            entries,
+            entries,
+            directory_size,
+            directory_offset,
+        ))
+        # zip64 end of central directory locator
+        self.write(struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1))
+        # end of central directory record
+        self.write(struct.pack(
+            '<IHHHHIIH',
+            0x06054b50,
+            0,
+            0,
+            min(entries, MAX_UINT16),
+            min(entries, MAX_UINT16),
+            min(directory_size, MAX_UINT32),
+            MAX_UINT32,
+            0,
+        ))
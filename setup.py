@@ -49,5 +49,10 @@ from the California Secretary of State’s CAL-ACCESS database',
         'csvkit>=1.0',
         'beautifulsoup4>=4.3.2',
     ),
+    extras_require={
+        'parquet': ['pyarrow>=1.0'],
+        'zstd': ['zstandard'],
+        'lxml': ['lxml'],
+    },
     cmdclass={'test': TestCommand,}
 )